@@ -10,14 +10,20 @@ reverse-reference index over them.
 Pure stdlib — nothing in this package may import `indigo`.
 """
 
+from .incremental import parse_indidb_incremental
 from .parser import ParsedDb, parse_indidb
-from .reverse_index import ReverseIndex, build_reverse_index
+from .reverse_index import ReverseIndex, build_reverse_index, update_reverse_index
+from .snapshot import load_snapshot, save_snapshot
 from .store import IndiDbStructureStore
 
 __all__ = [
     "ParsedDb",
     "parse_indidb",
+    "parse_indidb_incremental",
     "ReverseIndex",
     "build_reverse_index",
+    "update_reverse_index",
+    "load_snapshot",
+    "save_snapshot",
     "IndiDbStructureStore",
 ]
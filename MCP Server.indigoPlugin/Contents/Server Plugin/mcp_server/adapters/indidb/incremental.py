@@ -0,0 +1,218 @@
+"""
+Incremental re-parse of the .indiDb file.
+
+Indigo rewrites the whole database file after any edit, but usually only a
+handful of triggers, schedules or action groups actually change. Rather than
+re-decoding every element, this walks the file's bytes to find each list
+item's byte span (a C-level search for the matching close tag, not a Python
+event per element), fingerprints the span, and decodes only the items whose
+fingerprint is new. Unchanged items are carried over from the previous
+ParsedDb by reference.
+
+Produces the same ParsedDb contents as parse_indidb. Raises ValueError on a
+torn or unexpectedly shaped file so the caller can fall back to the full
+parser (which raises on a genuinely malformed file, keeping the last good
+cache).
+"""
+
+import contextlib
+import functools
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Set, Tuple
+
+from .parser import _NAME_LISTS, _STRUCTURE_LISTS, ParsedDb, _gc_paused, decode_element
+
+# ParsedDb structure attribute -> container kind used by the reverse index.
+_CONTAINER_KINDS = {
+    "triggers": "trigger",
+    "schedules": "schedule",
+    "action_groups": "action_group",
+}
+
+_OPEN_TAG = re.compile(rb"<([^\s/>!?]+)[^>]*?(/?)>")
+
+# (container_kind, container_id)
+ContainerKey = Tuple[str, int]
+
+
+@functools.lru_cache(maxsize=64)
+def _same_name_opener(tag: bytes) -> "re.Pattern[bytes]":
+    """Opening tags with exactly this name (group 1 is "/" when self-closing)."""
+    return re.compile(rb"<" + re.escape(tag) + rb"(?=[\s/>])[^>]*?(/?)>")
+
+
+def _next_child(data: bytes, pos: int) -> Optional[int]:
+    """
+    Offset of the next child element's opening tag at or after `pos`, or None
+    when the parent's closing tag comes first. Skips text, comments and
+    processing instructions.
+    """
+    while True:
+        lt = data.find(b"<", pos)
+        if lt < 0:
+            raise ValueError("unexpected end of file")
+        if data.startswith(b"</", lt):
+            return None
+        if data.startswith(b"<!--", lt):
+            end = data.find(b"-->", lt)
+            if end < 0:
+                raise ValueError("unterminated comment")
+            pos = end + 3
+            continue
+        if data.startswith(b"<?", lt) or data.startswith(b"<!", lt):
+            end = data.find(b">", lt)
+            if end < 0:
+                raise ValueError("unterminated declaration")
+            pos = end + 1
+            continue
+        return lt
+
+
+def _element_span(data: bytes, start: int) -> Tuple[bytes, int, int]:
+    """
+    Locate the element whose opening tag starts at `start`.
+
+    Returns (tag, content_start, end) where end is just past its closing tag
+    (content_start == end for a self-closing element).
+    """
+    match = _OPEN_TAG.match(data, start)
+    if match is None:
+        raise ValueError(f"expected an element at offset {start}")
+    tag = match.group(1)
+    if match.group(2):
+        return tag, match.end(), match.end()
+
+    close = b"</" + tag + b">"
+    opener = _same_name_opener(tag)
+    depth = 1
+    pos = match.end()
+    while depth:
+        close_at = data.find(close, pos)
+        if close_at < 0:
+            raise ValueError(f"unterminated <{tag.decode(errors='replace')}>")
+        # Same-named descendants (e.g. an ActionGroup embedded in an
+        # ActionGroup) nest; count them so we stop at our own close tag.
+        for nested in opener.finditer(data, pos, close_at):
+            if not nested.group(1):
+                depth += 1
+        depth -= 1
+        pos = close_at + len(close)
+    return tag, match.end(), pos
+
+
+def _iter_children(data: bytes, content_start: int) -> List[Tuple[bytes, int, int, int]]:
+    """
+    (tag, start, content_start, end) of each direct child of the element
+    whose content begins at `content_start`.
+    """
+    children = []
+    pos = content_start
+    while True:
+        start = _next_child(data, pos)
+        if start is None:
+            return children
+        tag, child_content, end = _element_span(data, start)
+        children.append((tag, start, child_content, end))
+        pos = end
+
+
+def _fingerprint(span: bytes) -> bytes:
+    return hashlib.blake2b(span, digest_size=16).digest()
+
+
+def parse_indidb_incremental(
+    path: str, previous: Optional[ParsedDb] = None
+) -> Tuple[ParsedDb, Set[ContainerKey]]:
+    """
+    Parse the database file at `path`, reusing unchanged items from `previous`.
+
+    Args:
+        path: Database file path
+        previous: The last good parse; None (or one without fingerprints)
+            decodes everything
+
+    Returns:
+        (parsed, changed) — `changed` holds the (container_kind, id) of every
+        trigger/schedule/action group that was added, edited or removed
+        relative to `previous`
+
+    Raises:
+        ValueError: the file is torn or not shaped like a database file
+        ET.ParseError: a changed item is malformed XML
+    """
+    with open(path, "rb") as db_file:
+        data = db_file.read()
+
+    # A warm re-parse decodes only a handful of items, so only the cold
+    # (decode-everything) parse is worth pausing the collector for.
+    cold = previous is None or not previous.fingerprints
+    with _gc_paused() if cold else contextlib.nullcontext():
+        return _parse_bytes(data, previous)
+
+
+def _parse_bytes(
+    data: bytes, previous: Optional[ParsedDb]
+) -> Tuple[ParsedDb, Set[ContainerKey]]:
+    root_start = _next_child(data, 0)
+    if root_start is None:
+        raise ValueError("no root element")
+    _, root_content, root_end = _element_span(data, root_start)
+    if data[root_end:].strip():
+        raise ValueError("trailing data after the root element")
+
+    parsed = ParsedDb()
+    changed: Set[ContainerKey] = set()
+    previous_fingerprints = previous.fingerprints if previous is not None else {}
+
+    for list_tag, _, list_content, _ in _iter_children(data, root_content):
+        tag = list_tag.decode("utf-8", errors="replace")
+        attr = _STRUCTURE_LISTS.get(tag) or _NAME_LISTS.get(tag)
+        if attr is None:
+            continue
+
+        old_ids = previous_fingerprints.get(attr, {})
+        old_values = getattr(previous, attr) if previous is not None else {}
+        fingerprints: Dict[bytes, int] = {}
+        values = getattr(parsed, attr)
+        is_structure = tag in _STRUCTURE_LISTS
+
+        for _, item_start, _, item_end in _iter_children(data, list_content):
+            digest = _fingerprint(data[item_start:item_end])
+            reused_id = old_ids.get(digest)
+            if reused_id is not None and reused_id in old_values:
+                values[reused_id] = old_values[reused_id]
+                fingerprints[digest] = reused_id
+                continue
+
+            elem = ET.fromstring(data[item_start:item_end])
+            if is_structure:
+                item = decode_element(elem)
+                elem_id = item.get("ID") if isinstance(item, dict) else None
+                if not isinstance(elem_id, int):
+                    continue
+                values[elem_id] = item
+                changed.add((_CONTAINER_KINDS[attr], elem_id))
+            else:
+                try:
+                    elem_id = int(elem.findtext("ID"))
+                except (TypeError, ValueError):
+                    continue
+                name = elem.findtext("Name")
+                if name is None:
+                    continue
+                values[elem_id] = name
+            fingerprints[digest] = elem_id
+
+        parsed.fingerprints[attr] = fingerprints
+
+    # Containers that disappeared count as changes too.
+    if previous is not None:
+        for attr, kind in _CONTAINER_KINDS.items():
+            current = getattr(parsed, attr)
+            for elem_id in getattr(previous, attr):
+                if elem_id not in current:
+                    changed.add((kind, elem_id))
+
+    return parsed, changed
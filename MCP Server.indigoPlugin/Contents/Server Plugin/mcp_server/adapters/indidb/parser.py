@@ -10,11 +10,28 @@ Only trigger/schedule/action-group structures are kept in full. Devices and
 variables contribute just id→name maps (used for fallback name resolution
 and for the reverse index's plugin-config heuristic). Everything is cleared
 as parsing proceeds so the ~5MB tree is never held in memory.
+
+Two backends produce identical output: the stdlib ElementTree streaming
+parser, and lxml when it is installed. A full parse runs with the cyclic
+garbage collector paused, since it allocates millions of container objects
+and none of them form cycles worth collecting mid-parse. The pause is
+process-wide, so it is reserved for full parses (startup, or a fallback
+after a failed incremental parse) and is reference-counted so overlapping
+parses on different threads do not re-enable collection under each other.
+tests/benchmark_indidb_parser.py compares them on synthetic databases.
 """
 
+import contextlib
+import gc
+import threading
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
 
 
 @dataclass
@@ -29,6 +46,9 @@ class ParsedDb:
     device_names: Dict[int, str] = field(default_factory=dict)
     variable_names: Dict[int, str] = field(default_factory=dict)
     reverse_index: Optional[Any] = None  # ReverseIndex, attached by the store
+    # list attribute -> {digest of the item's byte span: item id}; filled by
+    # the incremental parser only, so the next parse can skip unchanged items
+    fingerprints: Dict[str, Dict[bytes, int]] = field(default_factory=dict)
 
     def counts(self) -> Dict[str, int]:
         return {
@@ -82,13 +102,92 @@ _NAME_LISTS = {
 }
 
 
-def parse_indidb(path: str) -> ParsedDb:
+# Backend used when parse_indidb is not given one. ElementTree measured as
+# fast as lxml in the benchmark (decoding dominates, and walking lxml's
+# elements from Python costs more), so lxml stays opt-in.
+DEFAULT_BACKEND = "etree"
+
+
+def available_backends() -> List[str]:
+    """Parser backends usable in this environment, the default first."""
+    backends = ["etree"]
+    if lxml_etree is not None:
+        backends.append("lxml")
+    return backends
+
+
+# Outstanding _gc_paused() holders, and whether collection was on when the
+# first of them arrived. Guarded by _gc_pause_lock.
+_gc_pause_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Disable the cyclic collector for the duration, process-wide.
+
+    Nested or overlapping pauses share one disable: collection comes back
+    only when the last of them exits, and only if it was enabled before the
+    first one started.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_pause_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def _harvest_item(parsed: ParsedDb, list_tag: str, elem: Any) -> None:
+    """Record one direct child of a top-level list (ET or lxml element)."""
+    if list_tag in _STRUCTURE_LISTS:
+        item = decode_element(elem)
+        elem_id = item.get("ID") if isinstance(item, dict) else None
+        if isinstance(elem_id, int):
+            getattr(parsed, _STRUCTURE_LISTS[list_tag])[elem_id] = item
+    else:
+        # Pull ID/Name without decoding the whole entry.
+        elem_id_text = elem.findtext("ID")
+        name = elem.findtext("Name")
+        try:
+            elem_id = int(elem_id_text)
+        except (TypeError, ValueError):
+            elem_id = None
+        if elem_id is not None and name is not None:
+            getattr(parsed, _NAME_LISTS[list_tag])[elem_id] = name
+
+
+def parse_indidb(path: str, backend: Optional[str] = None) -> ParsedDb:
     """
     Parse the database file at `path`.
 
     Raises on unreadable/malformed XML (the store retains its previous good
     parse in that case). Elements without a usable integer ID are skipped.
+
+    Args:
+        path: Database file path
+        backend: "etree" or "lxml"; None uses DEFAULT_BACKEND. Asking for
+            lxml when it is not installed falls back to etree.
     """
+    backend = backend or DEFAULT_BACKEND
+    with _gc_paused():
+        if backend == "lxml" and lxml_etree is not None:
+            return _parse_lxml(path)
+        if backend not in ("etree", "lxml"):
+            raise ValueError(f"unknown indiDb parser backend: {backend}")
+        return _parse_etree(path)
+
+
+def _parse_etree(path: str) -> ParsedDb:
     parsed = ParsedDb()
 
     # Track which top-level list we are inside; harvest and clear each of
@@ -106,24 +205,31 @@ def parse_indidb(path: str) -> ParsedDb:
         # end event
         depth -= 1
         if depth == 2:
-            if current_list in _STRUCTURE_LISTS:
-                item = decode_element(elem)
-                elem_id = item.get("ID") if isinstance(item, dict) else None
-                if isinstance(elem_id, int):
-                    getattr(parsed, _STRUCTURE_LISTS[current_list])[elem_id] = item
-            elif current_list in _NAME_LISTS:
-                # Pull ID/Name without decoding the whole entry.
-                elem_id_text = elem.findtext("ID")
-                name = elem.findtext("Name")
-                try:
-                    elem_id = int(elem_id_text)
-                except (TypeError, ValueError):
-                    elem_id = None
-                if elem_id is not None and name is not None:
-                    getattr(parsed, _NAME_LISTS[current_list])[elem_id] = name
+            if current_list is not None:
+                _harvest_item(parsed, current_list, elem)
             elem.clear()
         elif depth == 1:
             current_list = None
             elem.clear()
 
     return parsed
+
+
+def _parse_lxml(path: str) -> ParsedDb:
+    """
+    lxml backend: the tag filter keeps per-element events in C, so Python
+    only sees each top-level list once it is complete. Unlike the etree
+    backend, that holds one whole list in (lxml's compact) memory at a time.
+    """
+    parsed = ParsedDb()
+    list_tags = list(_STRUCTURE_LISTS) + list(_NAME_LISTS)
+    for _, list_elem in lxml_etree.iterparse(
+        path, events=("end",), tag=list_tags, remove_comments=True, remove_pis=True
+    ):
+        parent = list_elem.getparent()
+        if parent is None or parent.getparent() is not None:
+            continue  # a same-named list nested inside some item
+        for elem in list_elem:
+            _harvest_item(parsed, list_elem.tag, elem)
+        list_elem.clear()
+    return parsed
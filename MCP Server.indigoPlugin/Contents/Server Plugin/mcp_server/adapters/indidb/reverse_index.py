@@ -16,7 +16,7 @@ Roles:
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from . import schema
 
@@ -26,6 +26,10 @@ MAX_CHAIN_DEPTH = 5
 # (entity_kind, entity_id) — entity_kind is "device" | "variable" | "action_group"
 TargetKey = Tuple[str, int]
 
+# (container_kind, container_id, chain of action-group ids ending at the
+# action group the walk started from)
+ExecParent = Tuple[str, int, Tuple[int, ...]]
+
 
 @dataclass
 class Reference:
@@ -52,28 +56,189 @@ class Reference:
 
 @dataclass
 class ReverseIndex:
-    """Direct references plus the AG→AG execution graph for chain expansion."""
+    """
+    Direct references plus the AG→AG execution graph for chain expansion.
+
+    Once built (or patched) the index is not mutated again, so the transitive
+    exec-parent walk of every action group is precomputed by freeze() and
+    each target's expanded references are memoized on first lookup. Any
+    mutation drops the memoized lookups; a change to the execution graph
+    marks the action groups whose closures it can reach, and the next
+    freeze() recomputes only those.
+
+    copy() shares every bucket (reference list, parent list, target set) with
+    its source and copies a bucket only on the first write to it, so patching
+    a copy costs the size of the patch rather than the size of the index.
+    """
 
     direct: Dict[TargetKey, List[Reference]] = field(default_factory=dict)
     # action_group_id -> containers with an execute step for it
     exec_parents: Dict[int, List[Tuple[str, int]]] = field(default_factory=dict)
+    # (container_kind, container_id) -> targets it references, so one
+    # container's references can be removed without scanning the index
+    container_targets: Dict[Tuple[str, int], Set[TargetKey]] = field(default_factory=dict)
+    # action_group_id -> _walk_exec_parents() result, filled by freeze()
+    _exec_closure: Optional[Dict[int, Tuple[ExecParent, ...]]] = field(
+        default=None, repr=False, compare=False
+    )
+    # action groups whose exec_parents changed since the last freeze()
+    _dirty_exec: Set[int] = field(default_factory=set, repr=False, compare=False)
+    # target -> references_to() result, filled on first lookup
+    _results: Dict[TargetKey, Tuple[Dict[str, Any], ...]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    # True once buckets are shared with another index; only the
+    # (table, key) pairs in _owned may then be mutated in place
+    _shared: bool = field(default=False, repr=False, compare=False)
+    _owned: Set[Tuple[str, Any]] = field(default_factory=set, repr=False, compare=False)
+
+    def freeze(self) -> None:
+        """
+        Precompute the exec-parent closure of every executed action group.
+
+        After the first freeze only the closures reachable from action groups
+        whose parents changed are recomputed.
+        """
+        if self._exec_closure is None:
+            self._exec_closure = {
+                ag_id: self._walk_exec_parents(ag_id) for ag_id in self.exec_parents
+            }
+        else:
+            for ag_id in self._exec_descendants(self._dirty_exec):
+                if ag_id in self.exec_parents:
+                    self._exec_closure[ag_id] = self._walk_exec_parents(ag_id)
+                else:
+                    self._exec_closure.pop(ag_id, None)
+        self._dirty_exec = set()
+        self._results = {}
 
     def add(self, target: TargetKey, ref: Reference) -> None:
-        self.direct.setdefault(target, []).append(ref)
+        self._results = {}
+        self._bucket("direct", target, list).append(ref)
+        self._bucket(
+            "container_targets", (ref.container_kind, ref.container_id), set
+        ).add(target)
+
+    def copy(self) -> "ReverseIndex":
+        """
+        Copy that can be patched while this index stays untouched.
+
+        The tables are copied shallowly and their buckets shared; both
+        indexes copy a shared bucket before writing to it.
+        """
+        self._shared = True
+        self._owned = set()
+        closure = self._exec_closure
+        return ReverseIndex(
+            direct=dict(self.direct),
+            exec_parents=dict(self.exec_parents),
+            container_targets=dict(self.container_targets),
+            _exec_closure=dict(closure) if closure is not None else None,
+            _dirty_exec=set(self._dirty_exec),
+            _shared=True,
+        )
+
+    def add_exec_parent(self, action_group_id: int, container_kind: str, container_id: int) -> None:
+        self._results = {}
+        self._dirty_exec.add(action_group_id)
+        self._bucket("exec_parents", action_group_id, list).append(
+            (container_kind, container_id)
+        )
+
+    def remove_container(self, container_kind: str, container_id: int) -> None:
+        """Drop every reference made by one container."""
+        self._results = {}
+        key = (container_kind, container_id)
+        for target in self.container_targets.pop(key, ()):
+            refs = [
+                ref for ref in self.direct.get(target, [])
+                if (ref.container_kind, ref.container_id) != key
+            ]
+            if refs:
+                self.direct[target] = refs
+                self._owned.add(("direct", target))
+            else:
+                self.direct.pop(target, None)
+
+            if target[0] == "action_group":
+                ag_id = target[1]
+                self._dirty_exec.add(ag_id)
+                parents = [p for p in self.exec_parents.get(ag_id, []) if p != key]
+                if parents:
+                    self.exec_parents[ag_id] = parents
+                    self._owned.add(("exec_parents", ag_id))
+                else:
+                    self.exec_parents.pop(ag_id, None)
+
+    def _bucket(self, table: str, key: Any, empty: type) -> Any:
+        """The bucket `key` of `table`, safe to mutate in place."""
+        mapping = getattr(self, table)
+        bucket = mapping.get(key)
+        if bucket is None:
+            bucket = mapping[key] = empty()
+        elif self._shared and (table, key) not in self._owned:
+            bucket = mapping[key] = empty(bucket)
+        else:
+            return bucket
+        if self._shared:
+            self._owned.add((table, key))
+        return bucket
+
+    def _exec_descendants(self, action_group_ids: Iterable[int]) -> Set[int]:
+        """
+        `action_group_ids` plus the action groups they execute, transitively
+        to MAX_CHAIN_DEPTH — every closure a change to their parents can reach.
+        Plugin-config references to action groups are followed too, which
+        only ever recomputes a few closures more than needed.
+        """
+        found = set(action_group_ids)
+        frontier = list(found)
+        for _ in range(MAX_CHAIN_DEPTH):
+            next_frontier = []
+            for ag_id in frontier:
+                for kind, child_id in self.container_targets.get(("action_group", ag_id), ()):
+                    if kind == "action_group" and child_id not in found:
+                        found.add(child_id)
+                        next_frontier.append(child_id)
+            frontier = next_frontier
+        return found
 
     def references_to(self, entity_kind: str, entity_id: int) -> List[Dict[str, Any]]:
         """
         All references to (entity_kind, entity_id), including containers that
         reach it transitively through action-group execution chains.
+
+        Served from the memoized result, so the cost is proportional to the
+        number of references. The dicts are fresh copies callers may modify.
         """
-        results = [ref.as_dict() for ref in self.direct.get((entity_kind, entity_id), [])]
+        target = (entity_kind, entity_id)
+        cached = self._results.get(target)
+        if cached is None:
+            cached = self._expand(target)
+            self._results[target] = cached
+        return [
+            {**ref, "via_action_groups": list(ref["via_action_groups"])}
+            if "via_action_groups" in ref
+            else dict(ref)
+            for ref in cached
+        ]
+
+    def _expand(self, target: TargetKey) -> Tuple[Dict[str, Any], ...]:
+        direct = self.direct.get(target, [])
+        results = [ref.as_dict() for ref in direct]
 
         # Chain expansion: if action group A references the target, anything
         # that executes A (directly or through more AGs) also affects it.
-        for ref in self.direct.get((entity_kind, entity_id), []):
+        # Closures are stale while graph changes await the next freeze().
+        closure = None if self._dirty_exec else self._exec_closure
+        for ref in direct:
             if ref.container_kind != "action_group":
                 continue
-            for parent_kind, parent_id, chain in self._walk_exec_parents(ref.container_id):
+            if closure is not None:
+                parents = closure.get(ref.container_id, ())
+            else:
+                parents = self._walk_exec_parents(ref.container_id)
+            for parent_kind, parent_id, chain in parents:
                 results.append(
                     {
                         "entity_type": parent_kind,
@@ -84,11 +249,9 @@ class ReverseIndex:
                         "confidence": ref.confidence,
                     }
                 )
-        return results
+        return tuple(results)
 
-    def _walk_exec_parents(
-        self, action_group_id: int
-    ) -> List[Tuple[str, int, List[int]]]:
+    def _walk_exec_parents(self, action_group_id: int) -> Tuple[ExecParent, ...]:
         """
         Containers that (transitively) execute `action_group_id`.
 
@@ -96,13 +259,13 @@ class ReverseIndex:
         intermediate action-group ids ending at `action_group_id`. Cycle-safe
         and bounded at MAX_CHAIN_DEPTH.
         """
-        found: List[Tuple[str, int, List[int]]] = []
+        found: List[ExecParent] = []
         seen: Set[Tuple[str, int]] = set()
-        frontier: List[Tuple[int, List[int]]] = [(action_group_id, [action_group_id])]
+        frontier: List[Tuple[int, Tuple[int, ...]]] = [(action_group_id, (action_group_id,))]
         depth = 0
 
         while frontier and depth < MAX_CHAIN_DEPTH:
-            next_frontier: List[Tuple[int, List[int]]] = []
+            next_frontier: List[Tuple[int, Tuple[int, ...]]] = []
             for ag_id, chain in frontier:
                 for parent_kind, parent_id in self.exec_parents.get(ag_id, []):
                     key = (parent_kind, parent_id)
@@ -111,11 +274,11 @@ class ReverseIndex:
                     seen.add(key)
                     found.append((parent_kind, parent_id, chain))
                     if parent_kind == "action_group":
-                        next_frontier.append((parent_id, [parent_id] + chain))
+                        next_frontier.append((parent_id, (parent_id,) + chain))
             frontier = next_frontier
             depth += 1
 
-        return found
+        return tuple(found)
 
 
 def build_reverse_index(parsed) -> ReverseIndex:
@@ -124,19 +287,83 @@ def build_reverse_index(parsed) -> ReverseIndex:
     known_ids = _known_entity_ids(parsed)
 
     for trigger_id, trigger in parsed.triggers.items():
-        _index_trigger_event(index, trigger_id, trigger)
-        _index_container(index, "trigger", trigger_id, trigger, known_ids)
+        _index_one(index, "trigger", trigger_id, trigger, known_ids)
 
     for schedule_id, sched in parsed.schedules.items():
-        _index_container(index, "schedule", schedule_id, sched, known_ids)
+        _index_one(index, "schedule", schedule_id, sched, known_ids)
 
     for ag_id, action_group in parsed.action_groups.items():
-        steps = action_group.get("ActionSteps") or []
-        _index_action_steps(index, "action_group", ag_id, steps, known_ids)
+        _index_one(index, "action_group", ag_id, action_group, known_ids)
+
+    index.freeze()
+    return index
+
 
+def update_reverse_index(
+    previous, parsed, changed: Iterable[Tuple[str, int]]
+) -> ReverseIndex:
+    """
+    Patch a copy of `previous.reverse_index` for the containers in `changed`.
+
+    The previous index stays untouched because readers may still hold the
+    snapshot it belongs to. The copy shares its buckets and closures, so
+    only the buckets and exec-parent closures the diff reaches are rebuilt.
+    Falls back to a full build when there is no previous index, or when the
+    set of known entity ids moved — the plugin-config heuristic of every
+    unchanged container depends on it.
+
+    Args:
+        previous: The ParsedDb the existing index was built from
+        parsed: The new ParsedDb
+        changed: (container_kind, container_id) added, edited or removed
+
+    Returns:
+        The patched (or rebuilt) index
+    """
+    if previous is None or previous.reverse_index is None:
+        return build_reverse_index(parsed)
+
+    known_ids = _known_entity_ids(parsed)
+    if known_ids != _known_entity_ids(previous):
+        return build_reverse_index(parsed)
+
+    index = previous.reverse_index.copy()
+
+    changed = list(changed)
+    for container_kind, container_id in changed:
+        index.remove_container(container_kind, container_id)
+
+    containers = {
+        "trigger": parsed.triggers,
+        "schedule": parsed.schedules,
+        "action_group": parsed.action_groups,
+    }
+    for container_kind, container_id in changed:
+        container = containers.get(container_kind, {}).get(container_id)
+        if container is not None:
+            _index_one(index, container_kind, container_id, container, known_ids)
+
+    index.freeze()
     return index
 
 
+def _index_one(
+    index: ReverseIndex,
+    container_kind: str,
+    container_id: int,
+    container: dict,
+    known_ids: Dict[int, str],
+) -> None:
+    """Every reference made by one trigger, schedule or action group."""
+    if container_kind == "action_group":
+        steps = container.get("ActionSteps") or []
+        _index_action_steps(index, "action_group", container_id, steps, known_ids)
+        return
+    if container_kind == "trigger":
+        _index_trigger_event(index, container_id, container)
+    _index_container(index, container_kind, container_id, container, known_ids)
+
+
 def _known_entity_ids(parsed) -> Dict[int, str]:
     """id -> entity kind, for the plugin-config heuristic."""
     known: Dict[int, str] = {}
@@ -251,7 +478,7 @@ def _index_action_steps(
                 ("action_group", ag_id),
                 Reference(container_kind, container_id, "executes"),
             )
-            index.exec_parents.setdefault(ag_id, []).append((container_kind, container_id))
+            index.add_exec_parent(ag_id, container_kind, container_id)
         elif step_class == schema.ACTION_CLASS_PLUGIN:
             # Class 999 steps can also command a device directly (DeviceID at
             # the step level) in addition to their MetaProps config.
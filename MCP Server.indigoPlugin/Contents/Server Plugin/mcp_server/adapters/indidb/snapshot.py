@@ -0,0 +1,97 @@
+"""
+On-disk snapshot of a parsed database file, so a plugin restart can skip the
+first parse.
+
+The snapshot is two consecutive pickles: a small header (schema version and
+the source file's mtime, size and content digest) followed by the ParsedDb
+with its reverse index attached. The header is checked before the payload is
+unpickled, so a stale snapshot costs one stat and, when mtime and size still
+match, one hash of the database file.
+
+The snapshot lives in the plugin's own preferences folder and is only ever
+written by this module. Anything unexpected — a missing or truncated file, a
+schema bump, a class that no longer unpickles — reads as "no snapshot".
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from .parser import ParsedDb
+
+# Bump whenever ParsedDb or ReverseIndex change shape.
+SNAPSHOT_SCHEMA_VERSION = 2
+
+
+def file_digest(path: str) -> str:
+    """Content digest of the database file the snapshot was taken from."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as db_file:
+        for chunk in iter(lambda: db_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_snapshot(snapshot_path: str, parsed: ParsedDb, digest: str) -> None:
+    """
+    Atomically write `parsed` (reverse index included) to `snapshot_path`.
+
+    Args:
+        snapshot_path: Where to write the snapshot
+        parsed: A complete parse; its mtime and size identify the source file
+        digest: file_digest() of the source file
+    """
+    directory = os.path.dirname(snapshot_path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    header = {
+        "version": SNAPSHOT_SCHEMA_VERSION,
+        "mtime": parsed.mtime,
+        "size": parsed.size,
+        "digest": digest,
+    }
+    fd, tmp_path = tempfile.mkstemp(prefix=".indidb-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(snapshot_path: str, db_path: str, mtime: float, size: int) -> Optional[ParsedDb]:
+    """
+    Load the snapshot if it was taken from the database file as it is now.
+
+    Args:
+        snapshot_path: Snapshot written by save_snapshot()
+        db_path: The database file, hashed only when mtime and size match
+        mtime: The database file's current mtime
+        size: The database file's current size
+
+    Returns:
+        The snapshot's ParsedDb, or None when it is missing, stale or unreadable
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+            if not isinstance(header, dict) or header.get("version") != SNAPSHOT_SCHEMA_VERSION:
+                return None
+            if (header.get("mtime"), header.get("size")) != (mtime, size):
+                return None
+            if header.get("digest") != file_digest(db_path):
+                return None
+            parsed = pickle.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(parsed, ParsedDb) or parsed.reverse_index is None:
+        return None
+    return parsed
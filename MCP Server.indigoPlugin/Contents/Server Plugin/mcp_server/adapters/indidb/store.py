@@ -5,17 +5,42 @@ The Indigo server rewrites the database file within minutes of changes, so
 the parse is cached on (mtime, size) and refreshed lazily on access. A parse
 failure (e.g. reading mid-rewrite) retains the last good cache; the next
 access retries.
+
+Refreshes are incremental by default: only the triggers, schedules and action
+groups whose bytes changed are re-decoded, and a copy of the reverse index is
+patched for just those containers (see incremental.py).
+
+Each parse produces a fresh ParsedDb that is swapped in with one reference
+assignment, so readers never lock: they get the last good snapshot. Once
+start() is called a background thread watches the file and does the parsing
+off the request path; without it, the first caller to notice a change parses
+while concurrent callers keep using the previous snapshot. The watcher polls
+at the stat throttle while readers are active and backs off once nobody has
+read the store for a while; the next reader wakes it.
+
+The database path is resolved once (in production an IPC round trip to the
+Indigo server) and re-resolved only when stat-ing the cached path fails.
+
+Given a snapshot_path, every parse is also persisted (see snapshot.py) and
+the first load after a restart reads it back instead of parsing, as long as
+the database file has not changed since.
 """
 
 import datetime
 import logging
 import os
+import stat as stat_module
 import threading
 import time
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from .incremental import parse_indidb_incremental
 from .parser import ParsedDb, parse_indidb
-from .reverse_index import build_reverse_index
+from .reverse_index import build_reverse_index, update_reverse_index
+from .snapshot import file_digest, load_snapshot, save_snapshot
+
+# Longest the background watcher sleeps between checks while idle.
+MAX_IDLE_POLL_SECONDS = 60.0
 
 _KIND_ATTRS = {
     "trigger": "triggers",
@@ -32,6 +57,9 @@ class IndiDbStructureStore:
         db_path_supplier: Callable[[], Optional[str]],
         logger: Optional[logging.Logger] = None,
         stat_throttle_seconds: float = 2.0,
+        incremental: bool = True,
+        snapshot_path: Optional[str] = None,
+        idle_after_seconds: float = 300.0,
     ):
         """
         Args:
@@ -41,13 +69,79 @@ class IndiDbStructureStore:
             logger: Optional logger instance.
             stat_throttle_seconds: Minimum interval between os.stat checks,
                 so bursts of tool calls don't stat the file repeatedly.
+            incremental: Re-decode only the items that changed since the
+                last parse (falls back to a full parse on any surprise).
+            snapshot_path: Optional file to persist parses to, so the first
+                load after a restart can skip parsing.
+            idle_after_seconds: With no reads for this long, the background
+                watcher doubles its poll interval up to MAX_IDLE_POLL_SECONDS.
         """
         self._db_path_supplier = db_path_supplier
         self.logger = logger or logging.getLogger("Plugin")
         self._stat_throttle_seconds = stat_throttle_seconds
+        self._incremental = incremental
+        self._snapshot_path = snapshot_path
+        self._idle_after_seconds = idle_after_seconds
+        # Serializes parsing only; readers take self._cache without it.
         self._lock = threading.Lock()
         self._cache: Optional[ParsedDb] = None
         self._last_stat_time = 0.0
+        # Resolved database path, kept until a stat of it fails
+        self._db_path: Optional[str] = None
+        # When a reader last asked for the snapshot (monotonic)
+        self._last_read = time.monotonic()
+        # (mtime, size) from the most recent stat, and when the current
+        # snapshot was swapped in (wall clock), for freshness()
+        self._observed: Optional[Tuple[float, int]] = None
+        self._refreshed_at = 0.0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Cuts the watcher's sleep short (stop, or a reader after idling)
+        self._wake = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Watch the file on a background thread, which also loads the first snapshot."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._wake.clear()
+        self._last_read = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._watch_loop, daemon=True, name="IndiDb-Refresh-Thread"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background watcher; the last snapshot stays readable."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _watch_loop(self) -> None:
+        interval = 0.0
+        while not self._stop_event.is_set():
+            try:
+                with self._lock:
+                    self._refresh_if_changed(throttle=False)
+            except Exception as e:
+                self.logger.debug(f"indiDb background refresh failed: {e}")
+            self._wake.clear()
+            interval = self._next_poll_interval(interval)
+            self._wake.wait(interval)
+
+    def _next_poll_interval(self, interval: float) -> float:
+        """The stat throttle while readers are active, doubling once they go quiet."""
+        base = max(self._stat_throttle_seconds, 0.05)
+        if time.monotonic() - self._last_read < self._idle_after_seconds:
+            return base
+        return min(max(interval, base) * 2, max(base, MAX_IDLE_POLL_SECONDS))
 
     # ------------------------------------------------------------------
     # Public accessors — all degrade to None/empty rather than raising.
@@ -96,13 +190,24 @@ class IndiDbStructureStore:
         return None
 
     def freshness(self) -> Dict[str, Any]:
-        """Metadata for tool responses about where structure data came from."""
+        """
+        Metadata for tool responses about where structure data came from.
+
+        `lag_seconds` is how long the file on disk has held changes the
+        snapshot does not reflect yet (0 when it is current).
+        """
         parsed = self._ensure_fresh()
         if parsed is None:
             return {"available": False}
+        observed = self._observed
+        lag = 0.0
+        if observed is not None and observed != (parsed.mtime, parsed.size):
+            lag = max(0.0, time.time() - observed[0])
         return {
             "available": True,
             "file_modified": datetime.datetime.fromtimestamp(parsed.mtime).isoformat(),
+            "snapshot_loaded": datetime.datetime.fromtimestamp(self._refreshed_at).isoformat(),
+            "lag_seconds": round(lag, 1),
             "counts": parsed.counts(),
             "note": (
                 "Action steps and conditions come from Indigo's database file, "
@@ -116,44 +221,142 @@ class IndiDbStructureStore:
     # ------------------------------------------------------------------
 
     def _ensure_fresh(self) -> Optional[ParsedDb]:
-        with self._lock:
-            now = time.monotonic()
-            if self._cache is not None and (now - self._last_stat_time) < self._stat_throttle_seconds:
-                return self._cache
+        now = time.monotonic()
+        if now - self._last_read >= self._idle_after_seconds:
+            # The watcher may be in a long idle sleep; have it check now.
+            self._wake.set()
+        self._last_read = now
 
-            path = None
-            try:
-                path = self._db_path_supplier()
-            except Exception as e:
-                self.logger.debug(f"indiDb path lookup failed: {e}")
-            if not path or not os.path.isfile(path):
+        cache = self._cache
+        if cache is None:
+            # Nothing to serve yet: everyone waits for the one first parse.
+            with self._lock:
+                if self._cache is None:
+                    self._refresh_if_changed(throttle=False)
                 return self._cache
 
-            self._last_stat_time = now
+        if self._thread is not None and self._thread.is_alive():
+            return cache
+
+        # On-access mode: one caller refreshes, the rest keep the snapshot.
+        if self._lock.acquire(blocking=False):
             try:
-                stat = os.stat(path)
-            except OSError as e:
-                self.logger.debug(f"indiDb stat failed: {e}")
-                return self._cache
+                self._refresh_if_changed(throttle=True)
+            finally:
+                self._lock.release()
+        return self._cache
 
-            if self._cache is not None and (
-                stat.st_mtime == self._cache.mtime and stat.st_size == self._cache.size
-            ):
-                return self._cache
+    def _refresh_if_changed(self, throttle: bool) -> None:
+        """Stat the file and swap in a new snapshot if it changed. Caller holds self._lock."""
+        now = time.monotonic()
+        if (
+            throttle
+            and self._cache is not None
+            and (now - self._last_stat_time) < self._stat_throttle_seconds
+        ):
+            return
 
-            try:
-                started = time.monotonic()
-                parsed = parse_indidb(path)
-                parsed.mtime = stat.st_mtime
-                parsed.size = stat.st_size
-                parsed.reverse_index = build_reverse_index(parsed)
+        self._last_stat_time = now
+        path, stat = self._stat_db_file()
+        if stat is None:
+            return
+        self._observed = (stat.st_mtime, stat.st_size)
+
+        cache = self._cache
+        if cache is not None and (stat.st_mtime, stat.st_size) == (cache.mtime, cache.size):
+            return
+
+        started = time.monotonic()
+        if cache is None and self._snapshot_path:
+            parsed = load_snapshot(self._snapshot_path, path, stat.st_mtime, stat.st_size)
+            if parsed is not None:
                 self._cache = parsed
+                self._refreshed_at = time.time()
                 elapsed_ms = (time.monotonic() - started) * 1000
                 self.logger.debug(
-                    f"indiDb parsed in {elapsed_ms:.0f}ms: {parsed.counts()}"
+                    f"indiDb loaded from snapshot in {elapsed_ms:.0f}ms: {parsed.counts()}"
                 )
+                return
+
+        try:
+            parsed, how = self._parse(path)
+            parsed.mtime = stat.st_mtime
+            parsed.size = stat.st_size
+            self._cache = parsed
+            self._refreshed_at = time.time()
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.logger.debug(
+                f"indiDb parsed in {elapsed_ms:.0f}ms ({how}): {parsed.counts()}"
+            )
+        except Exception as e:
+            # Mid-rewrite reads can hand us a torn file; keep the last
+            # good parse and retry on the next check.
+            self.logger.debug(f"indiDb parse failed (mid-rewrite?): {e}")
+            return
+
+        if self._snapshot_path:
+            self._save_snapshot(path, parsed)
+
+    def _stat_db_file(self) -> Tuple[Optional[str], Optional[os.stat_result]]:
+        """
+        (path, stat) of the database file, or (None, None) when unavailable.
+
+        Stats the cached path first and asks the supplier again only when
+        that fails, e.g. after the database was moved or renamed.
+        """
+        if self._db_path is not None:
+            try:
+                stat = os.stat(self._db_path)
+                if stat_module.S_ISREG(stat.st_mode):
+                    return self._db_path, stat
+            except OSError:
+                pass
+            self._db_path = None
+
+        path = None
+        try:
+            path = self._db_path_supplier()
+        except Exception as e:
+            self.logger.debug(f"indiDb path lookup failed: {e}")
+        if not path:
+            return None, None
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            self.logger.debug(f"indiDb stat failed: {e}")
+            return None, None
+        if not stat_module.S_ISREG(stat.st_mode):
+            return None, None
+        self._db_path = path
+        return path, stat
+
+    def _save_snapshot(self, path: str, parsed: ParsedDb) -> None:
+        """Persist `parsed`, unless the file moved on while it was being parsed."""
+        try:
+            digest = file_digest(path)
+            stat = os.stat(path)
+            if (stat.st_mtime, stat.st_size) != (parsed.mtime, parsed.size):
+                return
+            save_snapshot(self._snapshot_path, parsed, digest)
+        except Exception as e:
+            self.logger.debug(f"indiDb snapshot save failed: {e}")
+
+    def _parse(self, path: str) -> Tuple[ParsedDb, str]:
+        """
+        Parse `path` with its reverse index attached. Caller holds self._lock.
+
+        Returns:
+            (parsed, description of what was re-decoded, for the debug log)
+        """
+        previous = self._cache
+        if self._incremental:
+            try:
+                parsed, changed = parse_indidb_incremental(path, previous)
+                parsed.reverse_index = update_reverse_index(previous, parsed, changed)
+                return parsed, f"incremental, {len(changed)} containers changed"
             except Exception as e:
-                # Mid-rewrite reads can hand us a torn file; keep the last
-                # good parse and retry on the next access.
-                self.logger.debug(f"indiDb parse failed (mid-rewrite?): {e}")
-            return self._cache
+                self.logger.debug(f"indiDb incremental parse failed, doing a full parse: {e}")
+
+        parsed = parse_indidb(path)
+        parsed.reverse_index = build_reverse_index(parsed)
+        return parsed, "full"
@@ -4,7 +4,7 @@ InfluxDB query builder and utilities.
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, Union
+from typing import List, Optional, Sequence, Union
 from .time_utils import TimeFormatter
 
 
@@ -123,22 +123,24 @@ class InfluxDBQueryBuilder:
         self,
         device_name: str,
         device_property: str,
-        aggregation: str,
+        aggregation: Union[str, Sequence[str]],
         time_range_days: int = 7,
         group_by_time: str = "1d",
         measurement: str = "device_changes"
     ) -> str:
         """
         Build an aggregation query for device data.
-        
+
         Args:
             device_name: Name of the device
             device_property: Property to aggregate
-            aggregation: Aggregation function (MEAN, SUM, COUNT, etc.)
+            aggregation: Aggregation function (MEAN, SUM, COUNT, etc.), or a
+                sequence of them, each returned in a column named after the
+                lower-cased function (e.g. "min", "max")
             time_range_days: Number of days to look back
             group_by_time: Time grouping interval (1h, 1d, etc.)
             measurement: InfluxDB measurement name
-            
+
         Returns:
             InfluxQL query string
         """
@@ -146,9 +148,17 @@ class InfluxDBQueryBuilder:
         now = datetime.now()
         start_time = now - timedelta(days=time_range_days)
         start_time_ms = int(start_time.timestamp() * 1000)
-        
+
+        if isinstance(aggregation, str):
+            select = f'{aggregation}("{device_property}")'
+        else:
+            select = ", ".join(
+                f'{func}("{device_property}") AS "{func.lower()}"'
+                for func in aggregation
+            )
+
         query = (
-            f'SELECT {aggregation}("{device_property}") FROM "{measurement}" '
+            f'SELECT {select} FROM "{measurement}" '
             f"WHERE \"name\" = '{device_name}' "
             f"AND time >= {start_time_ms}ms "
             f"GROUP BY time({group_by_time}), \"name\" "
@@ -2,9 +2,13 @@
 State filtering utilities for Indigo entities.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
+from operator import ge, gt, le, lt
 import re
 
+# Complex-condition operators that compare numerically
+_NUMERIC_OPERATORS = {"gt": gt, "gte": ge, "lt": lt, "lte": le}
+
 
 class StateFilter:
     """Shared state filtering logic for Indigo entities."""
@@ -30,104 +34,131 @@ class StateFilter:
         """
         if not state_conditions:
             return entities
-            
-        filtered = []
-        for entity in entities:
-            if StateFilter.matches_state(entity, state_conditions):
-                filtered.append(entity)
-                
-        return filtered
-    
+
+        matches = StateFilter.compile(state_conditions)
+        return [entity for entity in entities if matches(entity)]
+
     @staticmethod
     def matches_state(entity: Dict[str, Any], conditions: Dict[str, Any]) -> bool:
         """
         Check if an entity matches state conditions.
-        
+
+        Compiles the conditions on every call; callers that test the same
+        conditions repeatedly should keep the predicate from compile().
+
         Args:
             entity: Entity dictionary with state information
             conditions: State conditions to match
-            
+
         Returns:
             True if entity matches all conditions
         """
-        # Check direct entity properties (like onState)
-        for key, expected_value in conditions.items():
-            # Handle nested state conditions
-            if isinstance(expected_value, dict):
-                if not StateFilter._matches_complex_condition(entity, key, expected_value):
-                    return False
-            else:
-                # Simple equality check
-                # First check direct property
-                if key in entity:
-                    if not StateFilter._values_equal(entity[key], expected_value):
-                        return False
-                # Then check in states dictionary if present
-                elif "states" in entity and key in entity["states"]:
-                    if not StateFilter._values_equal(entity["states"][key], expected_value):
-                        return False
-                else:
-                    # State not found, condition fails
-                    return False
+        return StateFilter.compile(conditions)(entity)
 
-        return True
-    
     @staticmethod
-    def _matches_complex_condition(
-        entity: Dict[str, Any], 
-        key: str, 
-        condition: Dict[str, str]
-    ) -> bool:
+    def compile(conditions: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
         """
-        Handle complex conditions like greater than, less than, etc.
-        
+        Compile state conditions into a predicate over entity dictionaries.
+
+        Expected values are coerced and regexes compiled once, here, rather
+        than on every entity tested.
+
         Args:
-            entity: Entity dictionary
-            key: State key to check
-            condition: Complex condition dict like {"gt": 50}
-            
+            conditions: State conditions, as accepted by matches_state
+
         Returns:
-            True if condition is met
+            A function returning True if an entity matches all conditions
         """
-        # Get the value from entity or states
-        value = None
-        if key in entity:
-            value = entity[key]
-        elif "states" in entity and key in entity["states"]:
-            value = entity["states"][key]
-        else:
-            return False
-            
-        # Handle different operators
-        for operator, expected in condition.items():
-            if operator in ("gt", "gte", "lt", "lte"):
-                # Numeric comparison. Indigo variable values are always strings,
-                # so coerce both sides to a number; if either is uncoercible,
-                # the condition cannot be met (no crash, no lexicographic string
-                # comparison surprises).
-                actual_num = StateFilter._to_number(value)
-                expected_num = StateFilter._to_number(expected)
-                if actual_num is None or expected_num is None:
-                    return False
-                if operator == "gt" and not (actual_num > expected_num):
-                    return False
-                elif operator == "gte" and not (actual_num >= expected_num):
-                    return False
-                elif operator == "lt" and not (actual_num < expected_num):
-                    return False
-                elif operator == "lte" and not (actual_num <= expected_num):
+        checks = [
+            (key, StateFilter._compile_condition(expected))
+            for key, expected in conditions.items()
+        ]
+
+        def matches(entity: Dict[str, Any]) -> bool:
+            for key, check in checks:
+                # Direct entity properties (like onState) first, then the
+                # states dictionary; a state that isn't found fails
+                if key in entity:
+                    value = entity[key]
+                elif "states" in entity and key in entity["states"]:
+                    value = entity["states"][key]
+                else:
                     return False
-            elif operator == "ne" and StateFilter._values_equal(value, expected):
-                return False
-            elif operator == "eq" and not StateFilter._values_equal(value, expected):
-                return False
-            elif operator == "contains" and expected not in str(value):
-                return False
-            elif operator == "regex":
-                if not re.match(expected, str(value)):
+                if not check(value):
                     return False
+            return True
+
+        return matches
+
+    @staticmethod
+    def _compile_condition(expected: Any) -> Callable[[Any], bool]:
+        """Predicate for one condition value: equality, or a dict like {"gt": 50}."""
+        if not isinstance(expected, dict):
+            return StateFilter._compile_equals(expected)
+        operators = [
+            StateFilter._compile_operator(operator, operand)
+            for operator, operand in expected.items()
+        ]
+        return lambda value: all(check(value) for check in operators)
+
+    @staticmethod
+    def _compile_operator(operator: str, expected: Any) -> Callable[[Any], bool]:
+        """Predicate for one operator of a complex condition."""
+        if operator in _NUMERIC_OPERATORS:
+            # Numeric comparison. Indigo variable values are always strings,
+            # so coerce both sides to a number; if either is uncoercible,
+            # the condition cannot be met (no crash, no lexicographic string
+            # comparison surprises).
+            expected_num = StateFilter._to_number(expected)
+            if expected_num is None:
+                return lambda value: False
+            compare = _NUMERIC_OPERATORS[operator]
+
+            def check_number(value: Any) -> bool:
+                actual_num = StateFilter._to_number(value)
+                return actual_num is not None and compare(actual_num, expected_num)
+
+            return check_number
+        if operator == "eq":
+            return StateFilter._compile_equals(expected)
+        if operator == "ne":
+            equals = StateFilter._compile_equals(expected)
+            return lambda value: not equals(value)
+        if operator == "contains":
+            return lambda value: expected in str(value)
+        if operator == "regex":
+            try:
+                pattern = re.compile(expected)
+            except (re.error, TypeError):
+                # Keep failing where it always has: when the condition is tested
+                return lambda value: re.match(expected, str(value)) is not None
+            return lambda value: pattern.match(str(value)) is not None
+        # Unknown operators don't constrain the match
+        return lambda value: True
+
+    @staticmethod
+    def _compile_equals(expected: Any) -> Callable[[Any], bool]:
+        """_values_equal(value, expected) with the expected side coerced once."""
+        expected_type = type(expected)
+        if isinstance(expected, bool):
+            return lambda actual: StateFilter._to_bool(actual) == expected
+        if isinstance(expected, (int, float)):
+            expected_num = float(expected)
+
+            def equals_number(actual: Any) -> bool:
+                if type(actual) is expected_type:
+                    return actual == expected
+                return StateFilter._to_number(actual) == expected_num
+
+            return equals_number
+        expected_text = str(expected)
+
+        def equals_text(actual: Any) -> bool:
+            if type(actual) is expected_type:
+                return actual == expected
+            return str(actual) == expected_text
 
-        return True
+        return equals_text
 
     # ------------------------------------------------------------------
     # Type-coercion helpers
@@ -1,16 +1,42 @@
 """
-Lightweight timer queue for duration-based (dwell-time) subscription conditions.
+Timer queue for duration-based (dwell-time) subscription conditions.
 
 When a subscription has duration_seconds set, the condition must remain matched
 for that duration before the webhook fires. If the condition reverts before the
 timer expires, the pending webhook is cancelled.
 
-Uses threading.Timer (stdlib). Timers are lost on plugin restart (acceptable).
+All pending dwells share one scheduler thread and a heap ordered by deadline,
+so a wildcard subscription over many sensors costs heap entries, not threads.
+Deadlines are scheduled on the monotonic clock, so a wall-clock jump (NTP
+correction, DST-less clock change) neither fires dwells early nor holds them
+back. persist() and restore() convert to and from wall-clock timestamps,
+which lets pending dwells be written out on shutdown and re-armed on the
+next start.
 """
 
+import heapq
+import json
 import logging
+import os
+import tempfile
 import threading
-from typing import Any, Callable, Dict, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .event_model import Event
+
+
+class _PendingDwell:
+    """One armed dwell: what to dispatch, and when."""
+
+    __slots__ = ("key", "subscription", "event", "entity_id", "deadline")
+
+    def __init__(self, key: str, subscription: Any, event: Any, entity_id: Any, deadline: float):
+        self.key = key
+        self.subscription = subscription
+        self.event = event
+        self.entity_id = entity_id
+        self.deadline = deadline  # time.monotonic()
 
 
 class DwellTimerQueue:
@@ -18,28 +44,51 @@ class DwellTimerQueue:
     Manages pending dwell timers for subscriptions with duration_seconds.
 
     Each pending dwell is keyed by "{subscription_id}:{entity_id}" to allow
-    per-entity timers within a single subscription.
+    per-entity timers within a single subscription. Arming pushes onto the
+    heap; cancelling drops the key and leaves the heap entry to be skipped
+    when it surfaces.
     """
 
     def __init__(
         self,
         callback: Callable[[Any, Any], None],
         logger: Optional[logging.Logger] = None,
+        state_path: Optional[str] = None,
     ):
         """
         Args:
             callback: Called when timer fires — callback(subscription, event).
             logger: Optional logger instance.
+            state_path: Optional JSON file pending dwells are saved to by
+                        persist() and re-armed from by restore().
         """
         self._callback = callback
         self._logger = logger or logging.getLogger(__name__)
-        self._timers: Dict[str, threading.Timer] = {}
-        self._lock = threading.Lock()
+        self._state_path = state_path
+
+        self._pending: Dict[str, _PendingDwell] = {}
+        # (deadline, sequence, dwell); the sequence keeps equal deadlines in
+        # arming order, and the dwell identity tells live entries from stale ones
+        self._heap: List[Tuple[float, int, _PendingDwell]] = []
+        self._sequence = 0
+        self._wakeup = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Metrics
+        self._fired = 0
+        self._cancelled = 0
+        self._last_lateness = 0.0
+        self._max_lateness = 0.0
 
     def _make_key(self, subscription_id: str, entity_id: Any) -> str:
         """Build a unique key for a pending dwell timer."""
         return f"{subscription_id}:{entity_id}"
 
+    # ------------------------------------------------------------------
+    # Arming and cancelling
+    # ------------------------------------------------------------------
+
     def start_dwell(
         self,
         subscription: Any,
@@ -60,35 +109,28 @@ class DwellTimerQueue:
             duration_seconds: How long the condition must hold.
             entity_id: The entity ID (for per-entity timer tracking).
         """
-        key = self._make_key(subscription.subscription_id, entity_id)
+        if self._arm(subscription, event, entity_id, time.monotonic() + duration_seconds):
+            self._logger.debug(
+                f"Dwell timer started: "
+                f"{self._make_key(subscription.subscription_id, entity_id)} ({duration_seconds}s)"
+            )
 
-        with self._lock:
+    def _arm(self, subscription: Any, event: Any, entity_id: Any, deadline: float) -> bool:
+        """Push a dwell onto the heap unless one is pending for the key."""
+        key = self._make_key(subscription.subscription_id, entity_id)
+        with self._wakeup:
             # If timer already pending for this key, don't restart — condition
             # was already matching, let the existing timer continue.
-            if key in self._timers:
-                return
-
-            def _on_expire():
-                with self._lock:
-                    self._timers.pop(key, None)
-                self._logger.debug(
-                    f"Dwell timer expired for {key}, dispatching webhook"
-                )
-                try:
-                    self._callback(subscription, event)
-                except Exception:
-                    self._logger.exception(
-                        f"Dwell timer callback failed for {key}"
-                    )
-
-            timer = threading.Timer(duration_seconds, _on_expire)
-            timer.daemon = True
-            self._timers[key] = timer
-            timer.start()
-
-            self._logger.debug(
-                f"Dwell timer started: {key} ({duration_seconds}s)"
-            )
+            if key in self._pending:
+                return False
+            dwell = _PendingDwell(key, subscription, event, entity_id, deadline)
+            self._pending[key] = dwell
+            self._sequence += 1
+            heapq.heappush(self._heap, (deadline, self._sequence, dwell))
+            self._ensure_thread()
+            if self._heap[0][2] is dwell:
+                self._wakeup.notify()
+        return True
 
     def cancel_dwell(self, subscription_id: str, entity_id: Any) -> None:
         """
@@ -100,26 +142,191 @@ class DwellTimerQueue:
         """
         key = self._make_key(subscription_id, entity_id)
 
-        with self._lock:
-            timer = self._timers.pop(key, None)
+        with self._wakeup:
+            dwell = self._pending.pop(key, None)
+            if dwell is not None:
+                self._cancelled += 1
+                # Long dwells on chatty sensors would otherwise leave stale
+                # entries piling up until their deadlines surface
+                if len(self._heap) > 2 * len(self._pending) + 64:
+                    self._heap = [
+                        entry for entry in self._heap if self._pending.get(entry[2].key) is entry[2]
+                    ]
+                    heapq.heapify(self._heap)
 
-        if timer is not None:
-            timer.cancel()
+        if dwell is not None:
             self._logger.debug(f"Dwell timer cancelled: {key}")
 
     def cancel_all(self) -> None:
-        """Cancel all pending timers. Called on shutdown."""
-        with self._lock:
-            timers = list(self._timers.values())
-            self._timers.clear()
+        """Cancel all pending timers and stop the scheduler. Called on shutdown."""
+        with self._wakeup:
+            count = len(self._pending)
+            self._pending.clear()
+            self._heap.clear()
+            self._cancelled += count
+            self._running = False
+            self._wakeup.notify()
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+
+        if count:
+            self._logger.debug(f"Cancelled {count} pending dwell timers")
+
+    # ------------------------------------------------------------------
+    # Scheduler
+    # ------------------------------------------------------------------
 
-        for timer in timers:
-            timer.cancel()
+    def _ensure_thread(self) -> None:
+        """Start the scheduler thread on first use. Caller holds self._wakeup."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="DwellTimer-Thread"
+        )
+        self._thread.start()
 
-        if timers:
-            self._logger.debug(f"Cancelled {len(timers)} pending dwell timers")
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                due = self._next_due()
+                if due is None:
+                    if not self._running:
+                        return
+                    continue
+            self._fire(due)
+
+    def _next_due(self) -> Optional[_PendingDwell]:
+        """Wait for the earliest live dwell to come due and pop it, or return
+        None when woken for another reason. Caller holds self._wakeup."""
+        while self._heap and self._pending.get(self._heap[0][2].key) is not self._heap[0][2]:
+            heapq.heappop(self._heap)  # cancelled or re-armed since
+        if not self._running:
+            return None
+        if not self._heap:
+            self._wakeup.wait()
+            return None
+        deadline, _, dwell = self._heap[0]
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            self._wakeup.wait(remaining)
+            return None
+        heapq.heappop(self._heap)
+        del self._pending[dwell.key]
+        lateness = -remaining
+        self._fired += 1
+        self._last_lateness = lateness
+        self._max_lateness = max(self._max_lateness, lateness)
+        return dwell
+
+    def _fire(self, dwell: _PendingDwell) -> None:
+        self._logger.debug(f"Dwell timer expired for {dwell.key}, dispatching webhook")
+        try:
+            self._callback(dwell.subscription, dwell.event)
+        except Exception:
+            self._logger.exception(f"Dwell timer callback failed for {dwell.key}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def persist(self) -> int:
+        """
+        Write the pending dwells to state_path (atomic replace).
+
+        Returns:
+            Number of dwells written
+        """
+        if not self._state_path:
+            return 0
+        to_wall_clock = time.time() - time.monotonic()
+        with self._wakeup:
+            records = [
+                {
+                    "subscription_id": dwell.subscription.subscription_id,
+                    "entity_id": dwell.entity_id,
+                    "deadline": dwell.deadline + to_wall_clock,
+                    "event": dwell.event.to_dict(),
+                }
+                for dwell in self._pending.values()
+            ]
+
+        directory = os.path.dirname(self._state_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".dwells-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"dwells": records}, f)
+            os.replace(tmp_path, self._state_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return len(records)
+
+    def restore(self, resolve: Callable[[str, Any], Optional[Any]]) -> int:
+        """
+        Re-arm the dwells saved by persist() at their original deadlines;
+        those that came due while the plugin was down fire right away.
+
+        The file is consumed, so a crash after restoring can't replay it.
+
+        Args:
+            resolve: resolve(subscription_id, entity_id) returns the live
+                     Subscription to re-arm for, or None to drop the dwell
+                     (subscription deleted, condition no longer holding).
+
+        Returns:
+            Number of dwells re-armed
+        """
+        if not self._state_path or not os.path.exists(self._state_path):
+            return 0
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                records = json.load(f).get("dwells", [])
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"⚠️ Pending dwell timers could not be read ({e}) — they won't fire")
+            records = []
+        try:
+            os.remove(self._state_path)
+        except OSError:
+            pass
+
+        to_monotonic = time.monotonic() - time.time()
+        restored = 0
+        for record in records:
+            try:
+                subscription = resolve(record["subscription_id"], record["entity_id"])
+                if subscription is None:
+                    continue
+                if self._arm(subscription, Event(**record["event"]), record["entity_id"],
+                             float(record["deadline"]) + to_monotonic):
+                    restored += 1
+            except Exception as e:
+                self._logger.debug(f"Skipping an unreadable pending dwell record: {e}")
+        return restored
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
 
     def get_pending_count(self) -> int:
         """Return the number of pending dwell timers."""
-        with self._lock:
-            return len(self._timers)
+        with self._wakeup:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pending count, outcomes, and how late timers fired (seconds)."""
+        with self._wakeup:
+            return {
+                "pending": len(self._pending),
+                "fired": self._fired,
+                "cancelled": self._cancelled,
+                "last_lateness_seconds": round(self._last_lateness, 3),
+                "max_lateness_seconds": round(self._max_lateness, 3),
+            }
@@ -0,0 +1,128 @@
+"""
+Circuit breaking and rate limiting for webhook delivery.
+
+A receiver that is down would otherwise cost every queued event its full
+retry cycle — worker time, network calls and an error log line each. The
+dispatcher keeps a CircuitBreaker per destination instead: after a few
+consecutive failures it opens, deliveries to that destination wait without
+any network call, and once the cooldown has passed a single probe attempt
+decides whether it closes again.
+
+TokenBucket caps how fast one subscription's deliveries go out.
+
+Neither class locks; the dispatcher only touches them under its own lock.
+Times are time.monotonic() values passed in by the caller.
+"""
+
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """Closed / open / half-open state of one webhook destination."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failed attempts that open the circuit.
+            cooldown: Seconds the circuit stays open before a probe attempt.
+            max_cooldown: Cap for the cooldown, which doubles each time a
+                          probe fails.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._cooldown = cooldown
+        self._retry_at = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds before an attempt may be made; 0 if it may go now. An open
+        circuit whose cooldown is up turns half-open and lets the caller's
+        attempt through as the probe.
+        """
+        if self.state != self.OPEN:
+            return 0.0
+        remaining = self._retry_at - now
+        if remaining > 0:
+            return remaining
+        self.state = self.HALF_OPEN
+        return 0.0
+
+    def is_open(self, now: float) -> bool:
+        """Whether attempts are currently being held back (no state change)."""
+        return self.state == self.OPEN and self._retry_at > now
+
+    def record_success(self) -> bool:
+        """
+        The destination answered. Returns True if this closed an open or
+        half-open circuit.
+        """
+        recovered = self.state != self.CLOSED
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._cooldown = self.base_cooldown
+        return recovered
+
+    def record_failure(self, now: float) -> bool:
+        """
+        An attempt failed (network error or 5xx). Returns True if the
+        circuit is open afterwards.
+        """
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            # The probe failed: back off for longer
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            self._open(now)
+        elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open(now)
+        return self.state == self.OPEN
+
+    def _open(self, now: float) -> None:
+        self.state = self.OPEN
+        self.times_opened += 1
+        self._retry_at = now + self._cooldown
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+        if self.state == self.OPEN:
+            result["retry_in_seconds"] = round(max(0.0, self._retry_at - now), 1)
+        return result
+
+
+class TokenBucket:
+    """Allows `rate` attempts per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Take a token if one is available. Returns 0 if taken, otherwise the
+        seconds until one will be.
+        """
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
@@ -0,0 +1,211 @@
+"""
+Keep-alive HTTP connections for webhook delivery.
+
+Opening a connection per event costs a TCP handshake, plus a TLS handshake
+and a freshly built SSL context for https receivers. This pool keeps idle
+http.client connections per (scheme, host, port, verify_ssl) and hands them
+back out, with SSL contexts built once per verification mode.
+
+Idle connections are closed after idle_timeout seconds, and at most
+max_idle_per_destination / max_idle of them are kept. Stdlib only.
+"""
+
+import http.client
+import ssl
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# (scheme, host, port, verify_ssl)
+PoolKey = Tuple[str, str, int, bool]
+
+# Errors meaning a kept-alive connection was closed by the other end while
+# idle. Requests on a reused connection that fail this way are retried once
+# on a new connection.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per destination, shared by delivery threads."""
+
+    def __init__(
+        self,
+        idle_timeout: float = 30.0,
+        max_idle_per_destination: int = 2,
+        max_idle: int = 16,
+    ):
+        """
+        Args:
+            idle_timeout: Seconds an unused connection is kept open.
+            max_idle_per_destination: Idle connections kept per destination.
+            max_idle: Idle connections kept in total.
+        """
+        self.idle_timeout = idle_timeout
+        self.max_idle_per_destination = max_idle_per_destination
+        self.max_idle = max_idle
+
+        self._lock = threading.Lock()
+        # key -> [(connection, returned at)], most recently returned last
+        self._idle: Dict[PoolKey, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._ssl_contexts: Dict[bool, ssl.SSLContext] = {}
+
+        # Stats
+        self._opened = 0
+        self._reused = 0
+
+    def post(
+        self,
+        url: str,
+        body: bytes,
+        headers: Dict[str, str],
+        verify_ssl: bool = True,
+        timeout: float = 10,
+    ) -> int:
+        """
+        POST `body` to `url` over a pooled connection.
+
+        Returns:
+            The HTTP status code
+
+        Raises:
+            OSError / http.client.HTTPException: the request could not be made
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported webhook URL: {url}")
+        key: PoolKey = (
+            scheme,
+            parts.hostname,
+            parts.port or (443 if scheme == "https" else 80),
+            bool(verify_ssl) if scheme == "https" else True,
+        )
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        conn = self._acquire(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._connect(key, timeout)
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # The receiver dropped the idle connection; try a fresh one
+                conn, reused = None, False
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return response.status
+
+    def close_all(self) -> None:
+        """Close every idle connection (e.g. on shutdown)."""
+        with self._lock:
+            idle = [conn for entries in self._idle.values() for conn, _ in entries]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Connections opened, requests served on a reused one, and idle now."""
+        with self._lock:
+            return {
+                "connections_opened": self._opened,
+                "connections_reused": self._reused,
+                "idle_connections": sum(len(entries) for entries in self._idle.values()),
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self, key: PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port, verify_ssl = key
+        with self._lock:
+            self._opened += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context(verify_ssl)
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _ssl_context(self, verify_ssl: bool) -> ssl.SSLContext:
+        with self._lock:
+            context = self._ssl_contexts.get(verify_ssl)
+            if context is None:
+                if verify_ssl:
+                    context = ssl.create_default_context()
+                else:
+                    context = ssl._create_unverified_context()
+                self._ssl_contexts[verify_ssl] = context
+            return context
+
+    def _acquire(self, key: PoolKey) -> Optional[http.client.HTTPConnection]:
+        """Most recently returned idle connection for `key` that hasn't expired."""
+        expired = []
+        conn = None
+        with self._lock:
+            entries = self._idle.get(key)
+            cutoff = time.monotonic() - self.idle_timeout
+            while entries:
+                candidate, returned_at = entries.pop()
+                if returned_at >= cutoff:
+                    conn = candidate
+                    self._reused += 1
+                    break
+                expired.append(candidate)
+            if entries is not None and not entries:
+                del self._idle[key]
+        for stale in expired:
+            stale.close()
+        return conn
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        """Return a connection for reuse, closing whatever exceeds the caps."""
+        evicted = []
+        now = time.monotonic()
+        with self._lock:
+            entries = self._idle.setdefault(key, [])
+            entries.append((conn, now))
+            while len(entries) > self.max_idle_per_destination:
+                evicted.append(entries.pop(0)[0])
+
+            # Expire idle connections everywhere, then trim the oldest overall
+            cutoff = now - self.idle_timeout
+            for pool_key in list(self._idle):
+                fresh = [entry for entry in self._idle[pool_key] if entry[1] >= cutoff]
+                evicted.extend(entry[0] for entry in self._idle[pool_key] if entry[1] < cutoff)
+                if fresh:
+                    self._idle[pool_key] = fresh
+                else:
+                    del self._idle[pool_key]
+            total = sum(len(entries) for entries in self._idle.values())
+            while total > self.max_idle:
+                oldest_key = min(self._idle, key=lambda k: self._idle[k][0][1])
+                evicted.append(self._idle[oldest_key].pop(0)[0])
+                if not self._idle[oldest_key]:
+                    del self._idle[oldest_key]
+                total -= 1
+        for stale in evicted:
+            stale.close()
@@ -0,0 +1,350 @@
+"""
+Durable outbox for queued webhook deliveries.
+
+Without it the dispatcher's queues live only in memory: a crash loses every
+undelivered event, and a clean shutdown has to sit out the retry schedule to
+drain them. The outbox mirrors each queued delivery into a SQLite side file
+(WAL mode) until it is acknowledged, so shutdown can simply stop and the
+next start replays whatever was still pending.
+
+Writes are group-committed: add(), ack() and dead_letter() only record the
+change in memory, and a background thread commits everything recorded every
+commit_interval seconds in one transaction. A delivery acknowledged before
+its row was ever committed never touches the disk. Deliveries that exhaust
+their retries move to a dead-letter table. Both tables are capped, oldest
+rows dropped first.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    subscription_id TEXT NOT NULL,
+    events TEXT NOT NULL,
+    batched INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_letter (
+    id INTEGER PRIMARY KEY,
+    subscription_id TEXT NOT NULL,
+    events TEXT NOT NULL,
+    batched INTEGER NOT NULL,
+    created REAL NOT NULL,
+    failed_at REAL NOT NULL,
+    error TEXT
+);
+"""
+
+# (id, subscription_id, events JSON, batched, created)
+_Row = Tuple[int, str, str, int, float]
+
+DEFAULT_MAX_PENDING = 10_000
+DEFAULT_MAX_DEAD_LETTERS = 1_000
+
+
+class OutboxRecord:
+    """A delivery read back from the outbox for replay."""
+
+    __slots__ = ("outbox_id", "subscription_id", "events", "batched", "created")
+
+    def __init__(
+        self,
+        outbox_id: int,
+        subscription_id: str,
+        events: List[Dict[str, Any]],
+        batched: bool,
+        created: float,
+    ):
+        self.outbox_id = outbox_id
+        self.subscription_id = subscription_id
+        self.events = events
+        self.batched = batched
+        self.created = created  # wall-clock time it was queued
+
+
+class WebhookOutbox:
+    """SQLite write-ahead log of undelivered webhook deliveries."""
+
+    def __init__(
+        self,
+        db_path: str,
+        logger: Optional[logging.Logger] = None,
+        commit_interval: float = 0.2,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_dead_letters: int = DEFAULT_MAX_DEAD_LETTERS,
+    ):
+        """
+        Args:
+            db_path: Path of the SQLite side file (created on first use)
+            logger: Optional logger instance
+            commit_interval: Seconds between group commits
+            max_pending: Undelivered deliveries kept; the oldest are dropped beyond it
+            max_dead_letters: Dead-lettered deliveries kept
+        """
+        self.db_path = db_path
+        self.logger = logger or logging.getLogger("Plugin")
+        self.commit_interval = commit_interval
+        self.max_pending = max_pending
+        self.max_dead_letters = max_dead_letters
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._next_id = 1
+        self._pending = 0
+        self._dead_letters = 0
+        # Changes recorded since the last commit
+        self._unflushed: Dict[int, _Row] = {}
+        # IDs in _unflushed whose earlier version may already be committed
+        self._rewritten: Set[int] = set()
+        self._acked: List[int] = []
+        self._dead: List[Tuple[int, Optional[_Row], float, str]] = []
+        # Deliveries the caller holds in memory (see hold()), and those of
+        # them dropped by the pending cap, already out of the count, whose
+        # later ack() / dead_letter() are no-ops
+        self._held: Set[int] = set()
+        self._evicted: Set[int] = set()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Open the side file and start the group-commit thread."""
+        with self._lock:
+            self._connection()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._commit_loop, daemon=True, name="WebhookOutbox-Thread"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Commit what is recorded, stop the commit thread and close the file."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+        self.flush()
+        with self._lock:
+            self._held.clear()
+            self._evicted.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (and migrate) the side file lazily. Caller holds self._lock."""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            last_id = max(
+                conn.execute("SELECT COALESCE(MAX(id), 0) FROM outbox").fetchone()[0],
+                conn.execute("SELECT COALESCE(MAX(id), 0) FROM dead_letter").fetchone()[0],
+            )
+            self._next_id = last_id + 1
+            self._pending = conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+            self._dead_letters = conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def add(self, subscription_id: str, events: List[Dict[str, Any]], batched: bool) -> int:
+        """
+        Record a queued delivery (committed with the next group commit).
+
+        Returns:
+            The delivery's outbox ID, for ack() / dead_letter()
+        """
+        payload = json.dumps(events)
+        with self._lock:
+            self._connection()  # IDs continue from those already on disk
+            outbox_id = self._next_id
+            self._next_id += 1
+            self._unflushed[outbox_id] = (
+                outbox_id, subscription_id, payload, int(batched), time.time()
+            )
+            self._pending += 1
+        return outbox_id
+
+    def hold(self, outbox_id: int) -> None:
+        """The caller keeps this delivery in memory and will ack() or
+        dead_letter() it (deliveries left only on disk aren't held)."""
+        with self._lock:
+            self._held.add(outbox_id)
+
+    def replace(
+        self, outbox_id: int, subscription_id: str, events: List[Dict[str, Any]], batched: bool
+    ) -> None:
+        """Swap the events of a recorded delivery, keeping its outbox ID (and
+        so its place in the order)."""
+        payload = json.dumps(events)
+        with self._lock:
+            if outbox_id in self._evicted:
+                return
+            if outbox_id not in self._unflushed:
+                self._rewritten.add(outbox_id)
+            self._unflushed[outbox_id] = (
+                outbox_id, subscription_id, payload, int(batched), time.time()
+            )
+
+    def ack(self, outbox_id: int) -> None:
+        """The delivery is done with (delivered, or rejected by the receiver)."""
+        with self._lock:
+            self._held.discard(outbox_id)
+            if outbox_id in self._evicted:
+                self._evicted.discard(outbox_id)
+                return
+            if self._unflushed.pop(outbox_id, None) is None or outbox_id in self._rewritten:
+                self._acked.append(outbox_id)
+                self._rewritten.discard(outbox_id)
+            self._pending -= 1
+
+    def dead_letter(self, outbox_id: int, error: str) -> None:
+        """Move a delivery that exhausted its retries to the dead-letter table."""
+        with self._lock:
+            self._held.discard(outbox_id)
+            if outbox_id in self._evicted:
+                self._evicted.discard(outbox_id)
+                return
+            row = self._unflushed.pop(outbox_id, None)
+            self._dead.append((outbox_id, row, time.time(), error))
+            if outbox_id in self._rewritten:
+                # The committed version has to go too
+                self._rewritten.discard(outbox_id)
+                self._acked.append(outbox_id)
+            self._pending -= 1
+            self._dead_letters += 1
+
+    # ------------------------------------------------------------------
+    # Commit
+    # ------------------------------------------------------------------
+
+    def _commit_loop(self) -> None:
+        while not self._stop_event.wait(self.commit_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.debug(f"Webhook outbox: commit failed: {e}")
+
+    def flush(self) -> None:
+        """Commit every change recorded so far in one transaction."""
+        with self._lock:
+            if not (self._unflushed or self._acked or self._dead):
+                return
+            conn = self._connection()
+            rows = list(self._unflushed.values())
+            acked, dead = self._acked, self._dead
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO outbox (id, subscription_id, events, batched, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                for outbox_id, row, failed_at, error in dead:
+                    if row is not None:
+                        conn.execute(
+                            "INSERT INTO dead_letter "
+                            "(id, subscription_id, events, batched, created, failed_at, error) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            row + (failed_at, error),
+                        )
+                    else:
+                        conn.execute(
+                            "INSERT INTO dead_letter "
+                            "(id, subscription_id, events, batched, created, failed_at, error) "
+                            "SELECT id, subscription_id, events, batched, created, ?, ? "
+                            "FROM outbox WHERE id = ?",
+                            (failed_at, error, outbox_id),
+                        )
+                        acked.append(outbox_id)
+                conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in acked])
+                self._enforce_caps(conn)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            self._unflushed.clear()
+            self._rewritten.clear()
+            self._acked = []
+            self._dead = []
+
+    def _enforce_caps(self, conn: sqlite3.Connection) -> None:
+        """Drop the oldest rows beyond the caps. Caller holds self._lock."""
+        excess = self._pending - self.max_pending
+        if excess > 0:
+            evicted = [
+                row[0]
+                for row in conn.execute("SELECT id FROM outbox ORDER BY id LIMIT ?", (excess,))
+            ]
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in evicted])
+            # Only held deliveries will be acked later
+            self._evicted.update(self._held.intersection(evicted))
+            self._pending -= len(evicted)
+            self.logger.warning(
+                f"⚠️ Webhook outbox is full — dropped the {excess} oldest undelivered event(s)"
+            )
+        if self._dead_letters > self.max_dead_letters:
+            conn.execute(
+                "DELETE FROM dead_letter WHERE id NOT IN "
+                "(SELECT id FROM dead_letter ORDER BY id DESC LIMIT ?)",
+                (self.max_dead_letters,),
+            )
+            self._dead_letters = self.max_dead_letters
+
+    # ------------------------------------------------------------------
+    # Replay and inspection
+    # ------------------------------------------------------------------
+
+    def pending(self) -> List[OutboxRecord]:
+        """Undelivered deliveries on disk, oldest first (for replay at startup)."""
+        return self._select("", ())
+
+    def pending_for(self, subscription_id: str, after_id: int, limit: int) -> List[OutboxRecord]:
+        """A subscription's undelivered deliveries with IDs above `after_id`,
+        oldest first (for reading spilled deliveries back)."""
+        return self._select(
+            "WHERE subscription_id = ? AND id > ? ", (subscription_id, after_id), limit
+        )
+
+    def _select(self, where: str, params: Tuple, limit: int = -1) -> List[OutboxRecord]:
+        self.flush()
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, subscription_id, events, batched, created FROM outbox "
+                f"{where}ORDER BY id LIMIT ?",
+                params + (limit,),
+            ).fetchall()
+        records = []
+        for outbox_id, subscription_id, payload, batched, created in rows:
+            try:
+                records.append(
+                    OutboxRecord(outbox_id, subscription_id, json.loads(payload), bool(batched), created)
+                )
+            except ValueError as e:
+                self.logger.debug(f"Webhook outbox: skipping unreadable record {outbox_id}: {e}")
+        return records
+
+    def get_stats(self) -> Dict[str, int]:
+        """Undelivered and dead-lettered delivery counts."""
+        with self._lock:
+            return {"outbox_pending": self._pending, "dead_letters": self._dead_letters}
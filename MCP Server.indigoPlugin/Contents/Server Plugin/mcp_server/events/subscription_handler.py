@@ -11,11 +11,14 @@ from urllib.parse import urlparse
 
 from ..tools.base_handler import BaseToolHandler
 from .subscription_manager import SubscriptionManager
+from .subscription_model import OVERFLOW_POLICIES, Subscription
 from .webhook_dispatcher import WebhookDispatcher
 
 
 VALID_AUTH_MODES = ("none", "bearer", "hmac")
 VALID_ENTITY_TYPES = ("device", "variable")
+# Longest a batching subscription may hold events back
+MAX_BATCH_WINDOW_MS = 60_000
 
 
 class SubscriptionHandler(BaseToolHandler):
@@ -40,7 +43,7 @@ class SubscriptionHandler(BaseToolHandler):
         Create a new event subscription.
 
         Required: webhook_url, entity_type, conditions
-        Optional: auth, entity_id, duration_seconds, description
+        Optional: auth, entity_id, duration_seconds, max_fires, batch, queue, description
         """
         try:
             # Validate required params
@@ -133,6 +136,87 @@ class SubscriptionHandler(BaseToolHandler):
                         "success": False,
                     }
 
+            # Batching config
+            batch = kwargs.get("batch") or {}
+            if not isinstance(batch, dict):
+                return {
+                    "error": "batch must be an object with window_ms (and optionally max_events, coalesce)",
+                    "success": False,
+                }
+            batch_window_ms = batch.get("window_ms")
+            batch_max_events = batch.get("max_events")
+            batch_coalesce = bool(batch.get("coalesce", False))
+            if batch:
+                if batch_window_ms is None:
+                    return {
+                        "error": "batch requires window_ms",
+                        "success": False,
+                    }
+                batch_window_ms = int(batch_window_ms)
+                if not 1 <= batch_window_ms <= MAX_BATCH_WINDOW_MS:
+                    return {
+                        "error": f"batch window_ms must be between 1 and {MAX_BATCH_WINDOW_MS}",
+                        "success": False,
+                    }
+                if batch_max_events is not None:
+                    batch_max_events = int(batch_max_events)
+                    if batch_max_events < 1:
+                        return {
+                            "error": "batch max_events must be at least 1",
+                            "success": False,
+                        }
+
+            # Queue bound
+            queue = kwargs.get("queue") or {}
+            if not isinstance(queue, dict):
+                return {
+                    "error": "queue must be an object with max_events and/or overflow",
+                    "success": False,
+                }
+            queue_max_events = queue.get("max_events")
+            if queue_max_events is not None:
+                queue_max_events = int(queue_max_events)
+                if queue_max_events < 1:
+                    return {
+                        "error": "queue max_events must be at least 1",
+                        "success": False,
+                    }
+            queue_overflow = queue.get("overflow", "drop_oldest")
+            if queue_overflow not in OVERFLOW_POLICIES:
+                return {
+                    "error": f"queue overflow must be one of {', '.join(OVERFLOW_POLICIES)}",
+                    "success": False,
+                }
+
+            # Rate limit
+            rate_limit = kwargs.get("rate_limit") or {}
+            if not isinstance(rate_limit, dict):
+                return {
+                    "error": "rate_limit must be an object with per_minute (and optionally burst)",
+                    "success": False,
+                }
+            rate_limit_per_minute = rate_limit.get("per_minute")
+            rate_limit_burst = rate_limit.get("burst")
+            if rate_limit:
+                if rate_limit_per_minute is None:
+                    return {
+                        "error": "rate_limit requires per_minute",
+                        "success": False,
+                    }
+                rate_limit_per_minute = int(rate_limit_per_minute)
+                if rate_limit_per_minute < 1:
+                    return {
+                        "error": "rate_limit per_minute must be at least 1",
+                        "success": False,
+                    }
+                if rate_limit_burst is not None:
+                    rate_limit_burst = int(rate_limit_burst)
+                    if rate_limit_burst < 1:
+                        return {
+                            "error": "rate_limit burst must be at least 1",
+                            "success": False,
+                        }
+
             description = kwargs.get("description", "")
 
             # Create the subscription
@@ -147,6 +231,13 @@ class SubscriptionHandler(BaseToolHandler):
                 duration_seconds=duration_seconds,
                 max_fires=max_fires,
                 description=description,
+                batch_window_ms=batch_window_ms,
+                batch_max_events=batch_max_events,
+                batch_coalesce=batch_coalesce,
+                queue_max_events=queue_max_events,
+                queue_overflow=queue_overflow,
+                rate_limit_per_minute=rate_limit_per_minute,
+                rate_limit_burst=rate_limit_burst,
             )
 
             return self.create_success_response(
@@ -178,7 +269,7 @@ class SubscriptionHandler(BaseToolHandler):
                         "success": False,
                     }
                 return self.create_success_response(
-                    data=sub.to_dict(),
+                    data=self._with_circuit(sub),
                     message=f"Subscription {subscription_id}",
                 )
 
@@ -188,9 +279,10 @@ class SubscriptionHandler(BaseToolHandler):
 
             return self.create_success_response(
                 data={
-                    "subscriptions": [s.to_dict() for s in subs],
+                    "subscriptions": [self._with_circuit(s) for s in subs],
                     "count": len(subs),
                     "dispatcher": dispatcher_stats,
+                    "dwell_timers": self.subscription_manager.get_dwell_stats(),
                 },
                 message=f"{len(subs)} active subscription(s)",
             )
@@ -198,6 +290,12 @@ class SubscriptionHandler(BaseToolHandler):
         except Exception as e:
             return self.handle_exception(e, "list_subscriptions")
 
+    def _with_circuit(self, sub: Subscription) -> Dict[str, Any]:
+        """A subscription's dict plus its destination's circuit breaker state."""
+        result = sub.to_dict()
+        result["circuit"] = self.webhook_dispatcher.circuit_state(sub.webhook_url)
+        return result
+
     # ------------------------------------------------------------------
     # delete_event_subscription
     # ------------------------------------------------------------------
@@ -2,21 +2,60 @@
 Subscription manager — stores active subscriptions and evaluates
 Indigo state changes against subscription conditions.
 
-Reuses StateFilter from mcp_server/common/state_filter.py for condition
-matching (eq, ne, gt, gte, lt, lte, contains, regex operators).
+Conditions are matched with StateFilter from mcp_server/common/state_filter.py
+(eq, ne, gt, gte, lt, lte, contains, regex operators), compiled once per
+subscription.
 """
 
 import logging
 import threading
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..common.state_filter import StateFilter
 from .event_model import Event
 from ..common.log_style import host_only
 from .subscription_model import Subscription
-from .subscription_store import SubscriptionStore
+from .subscription_store import SubscriptionStore, WriteBehind
 from .dwell_timer import DwellTimerQueue
 
+# Stands in for a condition key the entity doesn't have.
+_MISSING = object()
+
+
+class _Routes:
+    """Subscriptions indexed for evaluation. Never mutated once published."""
+
+    __slots__ = ("device", "variable", "order")
+
+    def __init__(self):
+        # entity_id (None = any device) -> condition key -> subscriptions
+        self.device: Dict[Optional[int], Dict[str, List[Subscription]]] = {}
+        # entity_id (None = any variable) -> subscriptions
+        self.variable: Dict[Optional[int], List[Subscription]] = {}
+        # subscription_id -> creation position, to keep match order
+        self.order: Dict[str, int] = {}
+
+
+def _watched_value(entity: Dict[str, Any], key: str) -> Any:
+    """The value StateFilter reads for condition `key`: top-level first, then states."""
+    if key in entity:
+        return entity[key]
+    states = entity.get("states")
+    if isinstance(states, dict) and key in states:
+        return states[key]
+    return _MISSING
+
+
+def _attribute_value(device: Any, key: str) -> Any:
+    """_watched_value read straight off an Indigo device object, without dict()."""
+    try:
+        return getattr(device, key)
+    except AttributeError:
+        pass
+    states = getattr(device, "states", None)
+    if states is not None and key in states:
+        return states[key]
+    return _MISSING
+
 
 class SubscriptionManager:
     """
@@ -30,6 +69,9 @@ class SubscriptionManager:
         dispatch_callback: Optional[Callable[[Subscription, Event], None]] = None,
         logger: Optional[logging.Logger] = None,
         store: Optional[SubscriptionStore] = None,
+        dwell_state_path: Optional[str] = None,
+        save_interval: float = 0.0,
+        stats_save_interval: float = 0.0,
     ):
         """
         Args:
@@ -39,24 +81,46 @@ class SubscriptionManager:
             store: Optional persistence store. When set, subscriptions are saved
                    on every structural change and can be restored via
                    load_from_store(). When None, behaviour is purely in-memory.
+            dwell_state_path: Optional file pending dwell timers are saved to on
+                   shutdown and re-armed from by restore_dwells().
+            save_interval: Minimum seconds between subscription file writes;
+                   changes in between are coalesced into one write. 0 writes
+                   on every change.
+            stats_save_interval: The same for the stats file, written when
+                   stats_changed() is called.
         """
         self._logger = logger or logging.getLogger(__name__)
         self._subscriptions: Dict[str, Subscription] = {}
         self._lock = threading.Lock()
         self._store = store
+        self._dwell_state_path = dwell_state_path
+        self._definitions_writer = WriteBehind(
+            self._write_store, save_interval, name="SubscriptionStore-Writer", logger=self._logger
+        )
+        self._stats_writer = WriteBehind(
+            self._write_stats, stats_save_interval, name="SubscriptionStats-Writer", logger=self._logger
+        )
+
+        # Routing index, rebuilt under the lock on every structural change and
+        # swapped in whole, so evaluation reads it without locking.
+        self._routes = _Routes()
 
         # Dwell timer queue — callback set to dispatch_callback
         self._dwell_timer: Optional[DwellTimerQueue] = None
         if dispatch_callback:
             self._dwell_timer = DwellTimerQueue(
-                callback=dispatch_callback, logger=self._logger
+                callback=dispatch_callback,
+                logger=self._logger,
+                state_path=dwell_state_path,
             )
 
     def set_dispatch_callback(
         self, callback: Callable[[Subscription, Event], None]
     ) -> None:
         """Set the dispatch callback (for deferred initialization)."""
-        self._dwell_timer = DwellTimerQueue(callback=callback, logger=self._logger)
+        self._dwell_timer = DwellTimerQueue(
+            callback=callback, logger=self._logger, state_path=self._dwell_state_path
+        )
 
     # ------------------------------------------------------------------
     # CRUD
@@ -74,6 +138,13 @@ class SubscriptionManager:
         duration_seconds: Optional[int] = None,
         max_fires: Optional[int] = None,
         description: str = "",
+        batch_window_ms: Optional[int] = None,
+        batch_max_events: Optional[int] = None,
+        batch_coalesce: bool = False,
+        queue_max_events: Optional[int] = None,
+        queue_overflow: str = "drop_oldest",
+        rate_limit_per_minute: Optional[int] = None,
+        rate_limit_burst: Optional[int] = None,
     ) -> Subscription:
         """Create a new subscription. Returns the created Subscription."""
         sub = Subscription(
@@ -86,11 +157,19 @@ class SubscriptionManager:
             conditions=conditions,
             duration_seconds=duration_seconds,
             max_fires=max_fires,
+            batch_window_ms=batch_window_ms,
+            batch_max_events=batch_max_events,
+            batch_coalesce=batch_coalesce,
+            queue_max_events=queue_max_events,
+            queue_overflow=queue_overflow,
+            rate_limit_per_minute=rate_limit_per_minute,
+            rate_limit_burst=rate_limit_burst,
             description=description,
         )
 
         with self._lock:
             self._subscriptions[sub.subscription_id] = sub
+            self._rebuild_routes()
 
         self._save()
         label = sub.description or (
@@ -114,6 +193,8 @@ class SubscriptionManager:
         """Delete a subscription by ID. Returns True if found and deleted."""
         with self._lock:
             sub = self._subscriptions.pop(subscription_id, None)
+            if sub is not None:
+                self._rebuild_routes()
 
         if sub is None:
             return False
@@ -154,7 +235,7 @@ class SubscriptionManager:
         Repopulate subscriptions from the persistence store, if one is set.
 
         Pure restore: does NOT dispatch webhooks or re-arm dwell timers
-        (those are transient and re-arm on the next matching transition).
+        (call restore_dwells() afterwards for the ones pending at shutdown).
         Returns the number of subscriptions loaded.
         """
         if self._store is None:
@@ -163,16 +244,66 @@ class SubscriptionManager:
         with self._lock:
             for sub in subs:
                 self._subscriptions[sub.subscription_id] = sub
+            self._rebuild_routes()
         return len(subs)
 
+    def restore_dwells(
+        self,
+        current_state: Optional[Callable[[str, Any], Optional[Dict[str, Any]]]] = None,
+    ) -> int:
+        """
+        Re-arm the dwell timers pending at the last shutdown. Call after
+        load_from_store(); dwells of deleted subscriptions are dropped.
+
+        Args:
+            current_state: Optional current_state(entity_type, entity_id)
+                returning the entity's dict now. When given, dwells whose
+                condition stopped holding while the plugin was down are dropped.
+
+        Returns:
+            Number of dwell timers re-armed
+        """
+        if self._dwell_timer is None:
+            return 0
+
+        def resolve(subscription_id: str, entity_id: Any) -> Optional[Subscription]:
+            sub = self.get(subscription_id)
+            if sub is None or not sub.duration_seconds:
+                return None
+            if current_state is not None:
+                entity = current_state(sub.entity_type, entity_id)
+                if entity is None or not sub.matches(entity):
+                    return None
+            return sub
+
+        return self._dwell_timer.restore(resolve)
+
+    def get_dwell_stats(self) -> Dict[str, Any]:
+        """Dwell timer metrics: pending count, outcomes and firing lateness."""
+        if self._dwell_timer is None:
+            return {"pending": 0}
+        return self._dwell_timer.get_stats()
+
     def save(self) -> None:
-        """Persist the current subscriptions (e.g. on shutdown, to flush stats)."""
-        self._save()
+        """Persist the current subscriptions and stats now (e.g. on shutdown)."""
+        if self._store is None:
+            return
+        self._definitions_writer.mark_dirty()
+        self._definitions_writer.flush()
+        self._stats_writer.flush()
+
+    def stats_changed(self) -> None:
+        """Note that delivery stats changed; they are saved with the next stats write."""
+        if self._store is not None:
+            self._stats_writer.mark_dirty()
 
     def _save(self) -> None:
+        """Schedule a write of the subscriptions (coalesced per save_interval)."""
+        if self._store is not None:
+            self._definitions_writer.mark_dirty()
+
+    def _write_store(self) -> None:
         """Snapshot under the lock, then write outside it. Never raises to callers."""
-        if self._store is None:
-            return
         with self._lock:
             snapshot = list(self._subscriptions.values())
         try:
@@ -180,6 +311,14 @@ class SubscriptionManager:
         except Exception as e:
             self._logger.error(f"❌ Saving event subscriptions to disk failed: {e} — subscriptions may not survive a restart")
 
+    def _write_stats(self) -> None:
+        with self._lock:
+            snapshot = list(self._subscriptions.values())
+        try:
+            self._store.save_stats(snapshot)
+        except Exception as e:
+            self._logger.warning(f"⚠️ Saving event subscription stats failed: {e}")
+
     # ------------------------------------------------------------------
     # State change evaluation
     # ------------------------------------------------------------------
@@ -204,20 +343,10 @@ class SubscriptionManager:
         device_id = new_dev.get("id")
         matches = []
 
-        with self._lock:
-            device_subs = [
-                s for s in self._subscriptions.values()
-                if s.entity_type == "device"
-            ]
-
-        for sub in device_subs:
-            # Skip if subscription targets a different entity
-            if sub.entity_id is not None and sub.entity_id != device_id:
-                continue
-
+        for sub in self._route_device_change(orig_dev, new_dev, device_id):
             # Transition detection: new state matches, old state did NOT
-            new_matches = StateFilter.matches_state(new_dev, sub.conditions)
-            old_matches = StateFilter.matches_state(orig_dev, sub.conditions)
+            new_matches = sub.matches(new_dev)
+            old_matches = sub.matches(orig_dev)
 
             if new_matches and not old_matches:
                 event = self._build_device_event(orig_dev, new_dev, sub)
@@ -239,6 +368,20 @@ class SubscriptionManager:
 
         return matches
 
+    def evaluate_device_update(
+        self, orig_dev: Any, new_dev: Any
+    ) -> List[Tuple[Subscription, Event]]:
+        """
+        evaluate_device_change for Indigo device objects (deviceUpdated).
+
+        Converting a whole device to a dict is the expensive part of the
+        callback, so both are only converted when some subscription for this
+        device reads a value that changed, compared by attribute access.
+        """
+        if not self._device_update_is_routed(orig_dev, new_dev):
+            return []
+        return self.evaluate_device_change(dict(orig_dev), dict(new_dev))
+
     def evaluate_variable_change(
         self,
         orig_var: Dict[str, Any],
@@ -261,25 +404,16 @@ class SubscriptionManager:
         variable_id = new_var.get("id")
         matches = []
 
-        with self._lock:
-            var_subs = [
-                s for s in self._subscriptions.values()
-                if s.entity_type == "variable"
-            ]
-
-        for sub in var_subs:
-            if sub.entity_id is not None and sub.entity_id != variable_id:
-                continue
-
+        for sub in self._route_variable_change(variable_id):
             # "any change" subscriptions fire on every value change. The
             # quick-reject above guarantees the value actually changed, so there
-            # is no transition/StateFilter evaluation to do here.
+            # is no transition/condition evaluation to do here.
             if sub.conditions.get("any_change"):
                 matches.append((sub, self._build_variable_event(orig_var, new_var, sub)))
                 continue
 
-            new_matches = StateFilter.matches_state(new_var, sub.conditions)
-            old_matches = StateFilter.matches_state(orig_var, sub.conditions)
+            new_matches = sub.matches(new_var)
+            old_matches = sub.matches(orig_var)
 
             if new_matches and not old_matches:
                 event = self._build_variable_event(orig_var, new_var, sub)
@@ -304,10 +438,78 @@ class SubscriptionManager:
     # ------------------------------------------------------------------
 
     def shutdown(self) -> None:
-        """Cancel all pending dwell timers."""
+        """Write pending saves, save pending dwell timers (if a state path is
+        set), then cancel them."""
+        if self._store is not None:
+            self._definitions_writer.stop()
+            self._stats_writer.stop()
         if self._dwell_timer:
+            try:
+                saved = self._dwell_timer.persist()
+                if saved:
+                    self._logger.debug(f"Saved {saved} pending dwell timer(s)")
+            except Exception as e:
+                self._logger.error(f"❌ Saving pending dwell timers failed: {e} — they won't fire after the restart")
             self._dwell_timer.cancel_all()
 
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def _rebuild_routes(self) -> None:
+        """Rebuild the routing index from _subscriptions. Caller holds self._lock."""
+        routes = _Routes()
+        for position, sub in enumerate(self._subscriptions.values()):
+            routes.order[sub.subscription_id] = position
+            if sub.entity_type == "device":
+                # A subscription can only change between matching and not
+                # matching when a value its conditions read changes; one
+                # without conditions matches always and never transitions.
+                bucket = routes.device.setdefault(sub.entity_id, {})
+                for key in sub.conditions:
+                    bucket.setdefault(key, []).append(sub)
+            elif sub.entity_type == "variable":
+                routes.variable.setdefault(sub.entity_id, []).append(sub)
+        self._routes = routes
+
+    def _route_device_change(
+        self,
+        orig_dev: Dict[str, Any],
+        new_dev: Dict[str, Any],
+        device_id: Optional[int],
+    ) -> List[Subscription]:
+        """
+        Device subscriptions that could transition on this change: those for
+        this device or any device whose condition keys read a changed value.
+        Costs one comparison per distinct watched key, not per subscription.
+        """
+        routes = self._routes
+        selected: Dict[str, Subscription] = {}
+        for entity_id in {device_id, None}:
+            for key, subs in routes.device.get(entity_id, {}).items():
+                if _watched_value(orig_dev, key) != _watched_value(new_dev, key):
+                    for sub in subs:
+                        selected[sub.subscription_id] = sub
+        return sorted(selected.values(), key=lambda sub: routes.order[sub.subscription_id])
+
+    def _device_update_is_routed(self, orig_dev: Any, new_dev: Any) -> bool:
+        """Whether a routed condition key reads different values on the two objects."""
+        routes = self._routes
+        device_id = getattr(new_dev, "id", None)
+        for entity_id in {device_id, None}:
+            for key in routes.device.get(entity_id, ()):
+                if _attribute_value(orig_dev, key) != _attribute_value(new_dev, key):
+                    return True
+        return False
+
+    def _route_variable_change(self, variable_id: Optional[int]) -> List[Subscription]:
+        """Variable subscriptions for this variable or any variable, in creation order."""
+        routes = self._routes
+        subs = routes.variable.get(variable_id, [])
+        if variable_id is not None:
+            subs = subs + routes.variable.get(None, [])
+        return sorted(subs, key=lambda sub: routes.order[sub.subscription_id])
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
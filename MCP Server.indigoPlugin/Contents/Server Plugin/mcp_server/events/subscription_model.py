@@ -7,10 +7,14 @@ where to notify (webhook URL + auth), and tracks delivery health.
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
+from ..common.state_filter import StateFilter
 from .event_model import generate_ulid
 
+# What the dispatcher does with a new event when a subscription's queue is full
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "coalesce", "spill")
+
 
 def _default_stats() -> Dict[str, Any]:
     """Default delivery health stats for a new subscription."""
@@ -23,6 +27,7 @@ def _default_stats() -> Dict[str, Any]:
         "consecutive_failures": 0,
         "errors": 0,
         "last_error": None,
+        "dropped": 0,
     }
 
 
@@ -54,6 +59,19 @@ class Subscription:
     # Auto-expiry (optional)
     max_fires: Optional[int] = None  # If set, auto-delete after this many successful deliveries
 
+    # Batching (optional)
+    batch_window_ms: Optional[int] = None  # If set, buffer events this long and POST them as one array
+    batch_max_events: Optional[int] = None  # Send a batch early once it holds this many events
+    batch_coalesce: bool = False  # Keep only the latest event per dedupe_key within a batch
+
+    # Queue bound (optional)
+    queue_max_events: Optional[int] = None  # Events queued for delivery at most (None = dispatcher default)
+    queue_overflow: str = "drop_oldest"  # One of OVERFLOW_POLICIES
+
+    # Rate limit (optional)
+    rate_limit_per_minute: Optional[int] = None  # Deliveries per minute at most, on average
+    rate_limit_burst: Optional[int] = None  # Deliveries allowed back to back (default 1)
+
     # Metadata
     description: str = ""
     created_at: str = field(
@@ -63,6 +81,18 @@ class Subscription:
     # Delivery health
     stats: Dict[str, Any] = field(default_factory=_default_stats)
 
+    # `conditions` compiled by StateFilter.compile, built with the subscription
+    _matcher: Callable[[Dict[str, Any]], bool] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._matcher = StateFilter.compile(self.conditions)
+
+    def matches(self, entity: Dict[str, Any]) -> bool:
+        """Whether an entity dict meets this subscription's conditions."""
+        return self._matcher(entity)
+
     def to_dict(self, include_token: bool = False) -> Dict[str, Any]:
         """
         Serialize to a plain dict.
@@ -88,6 +118,13 @@ class Subscription:
             "conditions": self.conditions,
             "duration_seconds": self.duration_seconds,
             "max_fires": self.max_fires,
+            "batch_window_ms": self.batch_window_ms,
+            "batch_max_events": self.batch_max_events,
+            "batch_coalesce": self.batch_coalesce,
+            "queue_max_events": self.queue_max_events,
+            "queue_overflow": self.queue_overflow,
+            "rate_limit_per_minute": self.rate_limit_per_minute,
+            "rate_limit_burst": self.rate_limit_burst,
             "description": self.description,
             "created_at": self.created_at,
             "stats": dict(self.stats),
@@ -115,6 +152,13 @@ class Subscription:
             conditions=d.get("conditions") or {},
             duration_seconds=d.get("duration_seconds"),
             max_fires=d.get("max_fires"),
+            batch_window_ms=d.get("batch_window_ms"),
+            batch_max_events=d.get("batch_max_events"),
+            batch_coalesce=bool(d.get("batch_coalesce", False)),
+            queue_max_events=d.get("queue_max_events"),
+            queue_overflow=d.get("queue_overflow") or "drop_oldest",
+            rate_limit_per_minute=d.get("rate_limit_per_minute"),
+            rate_limit_burst=d.get("rate_limit_burst"),
             description=d.get("description", ""),
         )
         if d.get("created_at"):
@@ -124,10 +168,10 @@ class Subscription:
             sub.stats.update(stats)
         return sub
 
-    def record_success(self, http_status: int) -> None:
-        """Record a successful webhook delivery."""
+    def record_success(self, http_status: int, events: int = 1) -> None:
+        """Record a successful webhook delivery (of `events` events, when batched)."""
         now = datetime.now(timezone.utc).isoformat()
-        self.stats["fires"] += 1
+        self.stats["fires"] += events
         self.stats["last_fired_at"] = now
         self.stats["last_success_at"] = now
         self.stats["last_http_status"] = http_status
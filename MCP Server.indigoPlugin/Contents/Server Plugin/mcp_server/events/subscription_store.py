@@ -9,13 +9,19 @@ Pure, stdlib-only (`json`/`os`/`tempfile`) — no Indigo imports — so it is
 unit-testable in isolation. The file contains webhook auth tokens (it must, or
 authenticated webhooks could not re-authenticate after a restart), so it is
 written with `0600` permissions inside Indigo's protected app-support directory.
+
+Delivery stats change on every webhook, so they are kept in a small separate
+file (save_stats()) that can be rewritten often without touching the
+definitions and tokens. WriteBehind coalesces bursts of saves into one write.
 """
 
 import json
 import logging
 import os
 import tempfile
-from typing import List, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 from .subscription_model import Subscription
 
@@ -24,11 +30,27 @@ SCHEMA_VERSION = 1
 
 
 class SubscriptionStore:
-    """Loads/saves subscriptions to a single JSON file (atomic, 0600)."""
-
-    def __init__(self, path: str, logger: Optional[logging.Logger] = None):
+    """Loads/saves subscriptions to a JSON file plus a stats file (atomic, 0600)."""
+
+    def __init__(
+        self,
+        path: str,
+        logger: Optional[logging.Logger] = None,
+        stats_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            path: Subscription definitions file (tokens included).
+            logger: Optional logger instance.
+            stats_path: Delivery stats file; defaults to ``<path>_stats.json``
+                        (e.g. subscriptions_stats.json).
+        """
         self._path = path
         self._logger = logger or logging.getLogger(__name__)
+        if stats_path is None:
+            base, ext = os.path.splitext(path)
+            stats_path = f"{base}_stats{ext or '.json'}"
+        self._stats_path = stats_path
 
     def load(self) -> List[Subscription]:
         """
@@ -59,37 +81,74 @@ class SubscriptionStore:
                 f"({version!r} vs {SCHEMA_VERSION}) — loading best-effort"
             )
 
+        stats = self._load_stats()
         subscriptions = []
         for record in payload.get("subscriptions", []):
             try:
-                subscriptions.append(Subscription.from_dict(record))
+                sub = Subscription.from_dict(record)
             except Exception as e:
                 self._logger.error(f"❌ Skipping an unreadable event subscription record: {e}")
+                continue
+            # Files from before the split carry their stats inline; the stats
+            # file, when it has an entry, is newer
+            saved = stats.get(sub.subscription_id)
+            if isinstance(saved, dict):
+                sub.stats.update(saved)
+            subscriptions.append(sub)
         return subscriptions
 
+    def _load_stats(self) -> Dict[str, Any]:
+        """Subscription ID -> saved stats. Stats are only counters, so an
+        unreadable file is logged and ignored rather than backed up."""
+        if not os.path.exists(self._stats_path):
+            return {}
+        try:
+            with open(self._stats_path, "r", encoding="utf-8") as f:
+                stats = json.load(f).get("stats", {})
+        except (OSError, ValueError, AttributeError) as e:
+            self._logger.warning(f"⚠️ Event subscription stats file is unreadable ({e}) — counters start over")
+            return {}
+        return stats if isinstance(stats, dict) else {}
+
     def save(self, subscriptions: List[Subscription]) -> None:
         """
-        Atomically persist the given subscriptions (tokens included).
+        Atomically persist the given subscriptions (tokens included), then
+        their stats.
 
         Writes to a temp file in the same directory, chmods it 0600, then
         os.replace()s it into place so a reader never sees a partial file.
         """
-        directory = os.path.dirname(self._path) or "."
-        os.makedirs(directory, exist_ok=True)
+        records = []
+        for sub in subscriptions:
+            record = sub.to_dict(include_token=True)
+            record.pop("stats", None)
+            records.append(record)
+        self._write(self._path, {"version": SCHEMA_VERSION, "subscriptions": records}, indent=2)
+        self.save_stats(subscriptions)
+
+    def save_stats(self, subscriptions: List[Subscription]) -> None:
+        """Atomically persist only the delivery stats of the given subscriptions."""
+        self._write(
+            self._stats_path,
+            {
+                "version": SCHEMA_VERSION,
+                "stats": {s.subscription_id: dict(s.stats) for s in subscriptions},
+            },
+        )
 
-        payload = {
-            "version": SCHEMA_VERSION,
-            "subscriptions": [s.to_dict(include_token=True) for s in subscriptions],
-        }
+    def _write(self, path: str, payload: Dict[str, Any], indent: Optional[int] = None) -> None:
+        """Write a JSON file via temp file + 0600 + os.replace()."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
 
         fd, tmp_path = tempfile.mkstemp(
             prefix=".subscriptions-", suffix=".tmp", dir=directory
         )
         try:
             with os.fdopen(fd, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2)
+                json.dump(payload, f, indent=indent)
             os.chmod(tmp_path, 0o600)
-            os.replace(tmp_path, self._path)
+            os.replace(tmp_path, path)
         except Exception:
             # Don't leave a stray temp file behind on failure.
             try:
@@ -104,3 +163,91 @@ class SubscriptionStore:
             os.replace(self._path, self._path + ".corrupt")
         except OSError as e:
             self._logger.error(f"❌ Could not back up the corrupt subscriptions file: {e}")
+
+
+class WriteBehind:
+    """
+    Coalesces saves: mark_dirty() runs `write` right away if the last write
+    was at least `interval` seconds ago, otherwise once when the interval is
+    up, however many times it was marked meanwhile. flush() writes anything
+    pending now. With an interval of 0 (or after stop()) every mark writes
+    immediately.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[], None],
+        interval: float,
+        name: str = "WriteBehind",
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Args:
+            write: Does the save; exceptions are logged, not raised.
+            interval: Minimum seconds between writes.
+            name: Timer thread name.
+            logger: Optional logger instance.
+        """
+        self._write = write
+        self._interval = interval
+        self._name = name
+        self._logger = logger or logging.getLogger(__name__)
+        # Held while writing, so writes never overlap or reorder
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._last_write = float("-inf")
+        self._stopped = False
+
+    def mark_dirty(self) -> None:
+        """Schedule a write (or write now if the interval has passed)."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            delay = self._last_write + self._interval - time.monotonic()
+            if self._stopped or delay <= 0:
+                self._run()
+                return
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.name = self._name
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write now if anything is pending."""
+        with self._lock:
+            self._cancel_timer()
+            if self._dirty:
+                self._run()
+
+    def stop(self) -> None:
+        """Flush, and write synchronously from now on."""
+        with self._lock:
+            self._stopped = True
+            self._cancel_timer()
+            if self._dirty:
+                self._run()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return  # flushed or stopped meanwhile
+            self._timer = None
+            if self._dirty:
+                self._run()
+
+    def _cancel_timer(self) -> None:
+        """Caller holds self._lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _run(self) -> None:
+        """Caller holds self._lock."""
+        self._dirty = False
+        self._last_write = time.monotonic()
+        try:
+            self._write()
+        except Exception:
+            self._logger.exception(f"{self._name}: write failed")
@@ -25,6 +25,10 @@ _DETAIL_FIELDS = [
     ("Verify SSL", "verify_ssl"),
     ("Dwell (s)", "duration_seconds"),
     ("Max fires", "max_fires"),
+    ("Batching", "_batching"),
+    ("Queue", "_queue"),
+    ("Rate limit", "_rate_limit"),
+    ("Receiver", "_circuit"),
     ("Created", "created_at"),
 ]
 
@@ -62,6 +66,51 @@ def _format_conditions(sub: Dict[str, Any]) -> str:
     return f'<code>{_esc(json.dumps(conditions))}</code>'
 
 
+def _format_batching(sub: Dict[str, Any]) -> str:
+    window_ms = sub.get("batch_window_ms")
+    if not window_ms:
+        return _esc(None)
+    parts = [f"{_esc(window_ms)} ms"]
+    if sub.get("batch_max_events"):
+        parts.append(f"max {_esc(sub['batch_max_events'])} events")
+    if sub.get("batch_coalesce"):
+        parts.append('<span class="badge">coalesce</span>')
+    return ", ".join(parts)
+
+
+def _format_queue(sub: Dict[str, Any]) -> str:
+    max_events = sub.get("queue_max_events")
+    overflow = sub.get("queue_overflow") or "drop_oldest"
+    if not max_events and overflow == "drop_oldest":
+        return '<span class="muted">default</span>'
+    size = f"max {_esc(max_events)} events" if max_events else "default size"
+    return f"{size}, {_esc(overflow.replace('_', ' '))} when full"
+
+
+def _format_rate_limit(sub: Dict[str, Any]) -> str:
+    per_minute = sub.get("rate_limit_per_minute")
+    if not per_minute:
+        return _esc(None)
+    text = f"{_esc(per_minute)} per minute"
+    if sub.get("rate_limit_burst"):
+        text += f", bursts of {_esc(sub['rate_limit_burst'])}"
+    return text
+
+
+def _format_circuit(sub: Dict[str, Any]) -> str:
+    circuit = sub.get("circuit") or {}
+    state = circuit.get("state", "closed")
+    if state == "closed":
+        return "reachable"
+    if state == "half_open":
+        return '<span class="badge">probing</span>'
+    text = '<span class="err">not responding — deliveries paused</span>'
+    retry_in = circuit.get("retry_in_seconds")
+    if retry_in is not None:
+        text += f' <span class="muted">(retry in {_esc(round(retry_in))}s)</span>'
+    return text
+
+
 def _format_stats(sub: Dict[str, Any]) -> str:
     stats = sub.get("stats") or {}
     fires = stats.get("fires", 0)
@@ -69,6 +118,7 @@ def _format_stats(sub: Dict[str, Any]) -> str:
     last_status = stats.get("last_http_status")
     consec = stats.get("consecutive_failures", 0)
     last_error = stats.get("last_error")
+    dropped = stats.get("dropped", 0)
 
     parts = [f'fires: <strong>{_esc(fires)}</strong>']
     if last_fired:
@@ -79,6 +129,8 @@ def _format_stats(sub: Dict[str, Any]) -> str:
         parts.append(f'<span class="err">consecutive failures: {_esc(consec)}</span>')
     if last_error:
         parts.append(f'<span class="err">last error: {_esc(last_error)}</span>')
+    if dropped:
+        parts.append(f'<span class="err">dropped (queue full): {_esc(dropped)}</span>')
     return " &middot; ".join(parts)
 
 
@@ -93,6 +145,14 @@ def _render_row(sub: Dict[str, Any]) -> str:
             value_html = _format_entity(sub)
         elif key == "_conditions":
             value_html = _format_conditions(sub)
+        elif key == "_batching":
+            value_html = _format_batching(sub)
+        elif key == "_queue":
+            value_html = _format_queue(sub)
+        elif key == "_rate_limit":
+            value_html = _format_rate_limit(sub)
+        elif key == "_circuit":
+            value_html = _format_circuit(sub)
         else:
             value_html = _esc(sub.get(key))
         detail_rows.append(
@@ -177,12 +237,49 @@ def _dispatcher_line(dispatcher_stats: Optional[Dict[str, Any]]) -> str:
     failed = dispatcher_stats.get("events_failed", 0)
     depth = dispatcher_stats.get("queue_depth", 0)
     running = dispatcher_stats.get("running", False)
-    return (
-        f'<p class="dispatcher">Dispatcher: '
-        f'{"running" if running else "stopped"} &middot; '
-        f'sent {_esc(sent)} &middot; failed {_esc(failed)} &middot; '
-        f'queue {_esc(depth)}</p>'
-    )
+    parts = [
+        "running" if running else "stopped",
+        f"sent {_esc(sent)}",
+        f"failed {_esc(failed)}",
+    ]
+    queue = f"queue {_esc(depth)}"
+    oldest = dispatcher_stats.get("oldest_queued_seconds")
+    if depth and oldest:
+        queue += f" (oldest {_esc(round(oldest))}s)"
+    parts.append(queue)
+    on_disk = dispatcher_stats.get("deliveries_on_disk")
+    if on_disk:
+        parts.append(f"{_esc(on_disk)} spilled to disk")
+    dropped = dispatcher_stats.get("events_dropped")
+    if dropped:
+        parts.append(f'<span class="err">dropped {_esc(dropped)}</span>')
+    circuits = dispatcher_stats.get("circuits")
+    if circuits:
+        hosts = ", ".join(_esc(host) for host in circuits)
+        parts.append(f'<span class="err">paused: {hosts}</span>')
+    latency = _latency_summary(dispatcher_stats.get("delivery_latency_ms"))
+    if latency:
+        parts.append(latency)
+    return f'<p class="dispatcher">Dispatcher: {" &middot; ".join(parts)}</p>'
+
+
+def _latency_summary(histogram: Optional[Dict[str, int]]) -> str:
+    """Median and 95th-percentile delivery latency, read off the histogram
+    buckets ("le_250" → at most 250 ms, "gt_60000" → over 60 s)."""
+    total = sum((histogram or {}).values())
+    if not total:
+        return ""
+
+    def percentile(fraction: float) -> str:
+        seen = 0
+        for label, count in histogram.items():
+            seen += count
+            if seen >= fraction * total:
+                kind, bound = label.split("_", 1)
+                return f"{'≤' if kind == 'le' else '>'}{_esc(bound)} ms"
+        return ""
+
+    return f"latency p50 {percentile(0.5)}, p95 {percentile(0.95)}"
 
 
 def render_subscriptions_page(
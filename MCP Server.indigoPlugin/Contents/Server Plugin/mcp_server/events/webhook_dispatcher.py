@@ -2,26 +2,32 @@
 Webhook dispatcher — background HTTP POST delivery with retry.
 
 Receives (subscription, event) pairs from the subscription manager,
-queues them, and delivers via a background daemon thread with
-exponential backoff retry.
+queues them per destination host, and delivers them from a small pool of
+daemon worker threads with exponential backoff retry.
 
-Uses urllib.request (stdlib) — no external dependencies.
+Uses http.client keep-alive connections (stdlib, see http_pool.py) — no
+external dependencies. With an outbox path, queued deliveries are also kept
+in a SQLite side file (see outbox.py) until they are done with, so they
+survive a restart.
 """
 
+import bisect
 import hashlib
+import heapq
 import hmac
 import json
 import logging
-import queue
-import ssl
 import threading
 import time
-import urllib.error
-import urllib.request
-from typing import Any, Callable, Dict, Optional, Tuple
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 from ..common.log_style import host_only
 from .event_model import Event
+from .flow_control import CircuitBreaker, TokenBucket
+from .http_pool import ConnectionPool
+from .outbox import OutboxRecord, WebhookOutbox
 from .subscription_model import Subscription
 
 
@@ -41,12 +47,124 @@ def _subscription_label(subscription: Subscription) -> str:
     return ref
 
 
+def _destination(url: str) -> str:
+    """Delivery lane for a webhook URL: scheme and host[:port], lower-cased."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _events_label(events: List[Event]) -> str:
+    """How log messages refer to the events of one delivery."""
+    if len(events) == 1:
+        return f"'{_entity_label(events[0])}' event"
+    return f"batch of {len(events)} events"
+
+
+# Events a batching subscription sends at most per POST, unless it sets its own cap
+DEFAULT_BATCH_MAX_EVENTS = 100
+
+# Events queued for delivery at most, per subscription (unless it sets its own
+# queue_max_events) and across all subscriptions
+DEFAULT_MAX_QUEUED_PER_SUBSCRIPTION = 1_000
+DEFAULT_MAX_QUEUED_EVENTS = 10_000
+
+# Upper bounds (ms) of the delivery-latency histogram buckets; slower
+# deliveries land in one more bucket past the last
+LATENCY_BUCKETS_MS = (100, 250, 500, 1_000, 2_500, 5_000, 10_000, 30_000, 60_000)
+
+_OVERFLOW_ACTIONS = {
+    "drop_oldest": "dropping its oldest queued events",
+    "drop_newest": "dropping new events",
+    "coalesce": "replacing queued events with newer ones for the same entity",
+    "spill": "keeping new events on disk until it catches up",
+}
+
+
+class _Delivery:
+    """One POST to make — a single event, or a batch — and how many attempts it has had."""
+
+    __slots__ = ("subscription", "events", "batched", "attempt", "outbox_id", "enqueued_at")
+
+    def __init__(
+        self,
+        subscription: Subscription,
+        events: List[Event],
+        batched: bool = False,
+        outbox_id: Optional[int] = None,
+        enqueued_at: Optional[float] = None,
+    ):
+        self.subscription = subscription
+        self.events = events
+        self.batched = batched
+        self.attempt = 0
+        # Row mirroring this delivery in the outbox, while it has one
+        self.outbox_id = outbox_id
+        # time.monotonic() when it was queued
+        self.enqueued_at = time.monotonic() if enqueued_at is None else enqueued_at
+
+
+class _Batch:
+    """Events buffered for a batching subscription until its window closes."""
+
+    __slots__ = ("subscription", "sequence", "_events")
+
+    def __init__(self, subscription: Subscription, sequence: int):
+        self.subscription = subscription
+        self.sequence = sequence
+        # Coalescing keys events by dedupe_key (re-adding moves a key to the
+        # end); otherwise every event gets its own slot
+        self._events: Dict[Any, Event] = {}
+
+    def add(self, event: Event) -> None:
+        if self.subscription.batch_coalesce:
+            self._events.pop(event.dedupe_key, None)
+            self._events[event.dedupe_key] = event
+        else:
+            self._events[len(self._events)] = event
+
+    def events(self) -> List[Event]:
+        return list(self._events.values())
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
 class WebhookDispatcher:
     """
     Asynchronous webhook delivery with retry and auth support.
 
     dispatch() is non-blocking — it enqueues the event and returns
     immediately so Indigo callbacks are never blocked.
+
+    Events queue per destination (scheme + host + port). A destination is
+    worked by one thread at a time, so its events arrive in order, while
+    a pool of workers serves different destinations in parallel. A failed
+    attempt parks its destination on a delay heap for the backoff instead
+    of sleeping in the worker, so a slow or failing receiver only holds
+    up its own events.
+
+    Each destination has a circuit breaker: after a few consecutive failed
+    attempts it opens, and the destination's events wait — without network
+    calls, and without using up their retries — until a probe attempt gets
+    through after the cooldown. While it is open, new events for it go
+    straight to the outbox (when there is one). Subscriptions with
+    rate_limit_per_minute set are paced by a token bucket.
+
+    Subscriptions with batch_window_ms set have their events buffered and
+    sent as one JSON array when the window closes or batch_max_events is
+    reached, optionally keeping only the latest event per dedupe_key.
+
+    The queue is bounded per subscription and overall. A subscription
+    whose queue is full applies its queue_overflow policy to new events:
+    drop its oldest queued ones, drop the new ones, replace a queued event
+    with the same dedupe_key, or (with an outbox) leave new ones on disk
+    and read them back as the queue drains. A queue head being delivered
+    or backing off is never dropped.
+
+    With an outbox, every queued delivery is also recorded on disk until it
+    is delivered, rejected or dead-lettered. stop() then leaves the queue
+    where it is instead of draining it, and replay_outbox() re-queues it on
+    the next start.
     """
 
     def __init__(
@@ -55,6 +173,12 @@ class WebhookDispatcher:
         timeout: int = 10,
         max_retries: int = 3,
         retry_base_delay: float = 1.0,
+        workers: int = 4,
+        outbox_path: Optional[str] = None,
+        max_queued_events: int = DEFAULT_MAX_QUEUED_EVENTS,
+        max_queued_per_subscription: int = DEFAULT_MAX_QUEUED_PER_SUBSCRIPTION,
+        circuit_failure_threshold: int = 3,
+        circuit_cooldown: float = 30.0,
     ):
         """
         Args:
@@ -62,55 +186,140 @@ class WebhookDispatcher:
             timeout: HTTP request timeout in seconds.
             max_retries: Max retry attempts on failure.
             retry_base_delay: Base delay for exponential backoff (seconds).
+            workers: Delivery threads (destinations served in parallel).
+            outbox_path: Optional SQLite file queued deliveries are kept in
+                         until done with (see replay_outbox()).
+            max_queued_events: Events queued at most across all subscriptions.
+            max_queued_per_subscription: Events queued at most per
+                         subscription, unless it sets queue_max_events.
+            circuit_failure_threshold: Consecutive failed attempts that open
+                         a destination's circuit.
+            circuit_cooldown: Seconds an open circuit waits before probing
+                         (doubling, up to 5 minutes, while probes fail).
         """
         self._logger = logger or logging.getLogger(__name__)
         self._timeout = timeout
         self._max_retries = max_retries
         self._retry_base_delay = retry_base_delay
+        self._worker_count = max(1, workers)
+        self._http = ConnectionPool()
+        self._outbox = WebhookOutbox(outbox_path, logger=self._logger) if outbox_path else None
+        self._max_queued_events = max_queued_events
+        self._max_queued_per_subscription = max_queued_per_subscription
+        self._circuit_failure_threshold = circuit_failure_threshold
+        self._circuit_cooldown = circuit_cooldown
 
-        self._queue: queue.Queue[Optional[Tuple[Subscription, Event]]] = queue.Queue()
-        self._worker: Optional[threading.Thread] = None
+        # Destination -> its queued deliveries, oldest first. A destination
+        # is "held" from the moment it has work until its lane is empty:
+        # it is then either in _ready, being worked, or waiting in _delayed.
+        self._cond = threading.Condition(threading.Lock())
+        self._lanes: Dict[str, Deque[_Delivery]] = {}
+        self._held: Set[str] = set()
+        self._ready: Deque[str] = deque()
+        # (due time, sequence, destination) for lanes backing off
+        self._delayed: List[Tuple[float, int, str]] = []
+        # Subscription ID -> open batch, and (due time, sequence, subscription
+        # ID) for when each batch closes
+        self._batches: Dict[str, _Batch] = {}
+        self._batch_due: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        # Events on the lanes (open batches aside), overall and per subscription ID
+        self._queued_events = 0
+        self._queued_by_subscription: Dict[str, int] = {}
+        # Subscription ID -> deliveries spilled to the outbox and not yet read
+        # back, and the newest outbox ID among its deliveries in memory
+        self._spilled: Dict[str, int] = {}
+        self._spill_cursor: Dict[str, int] = {}
+        self._spilled_subscriptions: Dict[str, Subscription] = {}
+        self._refilling: Set[str] = set()
+        # Destination -> circuit breaker (kept while it has failures), and
+        # subscription ID -> token bucket (while it has queued events)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._workers: List[threading.Thread] = []
         self._running = False
 
         # Stats
         self._stats_lock = threading.Lock()
         self._events_sent = 0
         self._events_failed = 0
+        self._events_dropped = 0
+        self._events_coalesced = 0
+        self._events_spilled = 0
+        self._rate_limit_waits = 0
+        self._latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
 
         # Track which subscription IDs have already had warnings logged, to avoid log spam on repeated deliveries
         self._warned_ssl: set = set()
         self._warned_http: set = set()
+        # Subscriptions warned about a full queue, until it empties again
+        self._warned_overflow: set = set()
 
         # Optional callback when a subscription reaches max_fires and should be deleted
         self._on_expired: Optional[Callable[[Subscription], None]] = None
+        # Optional callback after each attempt updates a subscription's stats
+        self._on_stats_changed: Optional[Callable[[], None]] = None
 
     def start(self) -> None:
-        """Start the background delivery worker thread."""
-        if self._running:
-            return
-
-        self._running = True
-        self._worker = threading.Thread(
-            target=self._delivery_loop, name="webhook-dispatcher", daemon=True
-        )
-        self._worker.start()
-        self._logger.debug("Webhook dispatcher started")
+        """Start the delivery worker threads."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            if self._outbox is not None:
+                self._outbox.start()
+            self._workers = [
+                threading.Thread(
+                    target=self._delivery_loop,
+                    name=f"webhook-dispatcher-{number}",
+                    daemon=True,
+                )
+                for number in range(1, self._worker_count + 1)
+            ]
+        for worker in self._workers:
+            worker.start()
+        self._logger.debug(f"Webhook dispatcher started ({self._worker_count} workers)")
 
     def set_on_expired(self, callback: Callable[[Subscription], None]) -> None:
         """Set callback invoked when a subscription reaches max_fires."""
         self._on_expired = callback
 
-    def stop(self) -> None:
-        """Signal the worker to drain the queue and stop."""
-        if not self._running:
-            return
+    def set_on_stats_changed(self, callback: Callable[[], None]) -> None:
+        """Set callback invoked after each delivery attempt (stats were updated)."""
+        self._on_stats_changed = callback
 
-        self._running = False
-        # Send sentinel to unblock the worker
-        self._queue.put(None)
+    def stop(self) -> None:
+        """
+        Stop the workers. Without an outbox they finish the queued events
+        first; with one, the queue is already on disk and they only finish
+        the attempts in flight.
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            # Send (or persist) open batches now rather than waiting out their windows
+            for subscription_id in list(self._batches):
+                self._flush_batch(subscription_id)
+            if self._outbox is not None:
+                self._lanes.clear()
+                self._held.clear()
+                self._ready.clear()
+                self._delayed.clear()
+                self._queued_events = 0
+                self._queued_by_subscription.clear()
+                self._spilled.clear()
+                self._spill_cursor.clear()
+                self._spilled_subscriptions.clear()
+            self._cond.notify_all()
 
-        if self._worker and self._worker.is_alive():
-            self._worker.join(timeout=10)
+        deadline = time.monotonic() + 10
+        for worker in self._workers:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._workers = []
+        self._http.close_all()
+        if self._outbox is not None:
+            self._outbox.stop()
 
         self._logger.debug("Webhook dispatcher stopped")
 
@@ -124,16 +333,486 @@ class WebhookDispatcher:
             self._logger.debug("Dispatcher not running, dropping event")
             return
 
-        self._queue.put((subscription, event))
+        with self._cond:
+            if subscription.batch_window_ms:
+                self._add_to_batch(subscription, event)
+            else:
+                self._enqueue(_Delivery(subscription, [event]))
+
+    def replay_outbox(self, resolve: Callable[[str], Optional[Subscription]]) -> int:
+        """
+        Re-queue the deliveries left in the outbox by a previous run, in
+        their original order. Call after start() and before events flow.
+        Only as many as the queue bounds allow are read into memory; the
+        rest stay on disk and are read back as the queues drain.
+
+        Args:
+            resolve: resolve(subscription_id) returns the live Subscription,
+                     or None if it was deleted (its deliveries are dropped).
+
+        Returns:
+            Number of deliveries re-queued
+        """
+        if self._outbox is None or not self._running:
+            return 0
+        replayed = 0
+        wall_now, now = time.time(), time.monotonic()
+        for record in self._outbox.pending():
+            subscription = resolve(record.subscription_id)
+            try:
+                events = [Event(**event) for event in record.events]
+            except TypeError as e:
+                self._logger.debug(f"Dropping unreadable outbox record {record.outbox_id}: {e}")
+                subscription = None
+            if subscription is None or not events:
+                self._outbox.ack(record.outbox_id)
+                continue
+            delivery = _Delivery(
+                subscription, events, record.batched, record.outbox_id,
+                enqueued_at=now - max(0.0, wall_now - record.created),
+            )
+            with self._cond:
+                if self._spilled.get(subscription.subscription_id) or not self._has_room(delivery):
+                    # Never apply the overflow policy to the durable backlog
+                    self._spill(delivery)
+                else:
+                    self._push(delivery)
+            replayed += 1
+        return replayed
+
+    def _has_room(self, delivery: _Delivery) -> bool:
+        """Whether a delivery fits under the subscription and overall bounds
+        (an empty queue always takes one). Caller holds self._cond."""
+        subscription = delivery.subscription
+        size = len(delivery.events)
+        queued = self._queued_by_subscription.get(subscription.subscription_id, 0)
+        limit = subscription.queue_max_events or self._max_queued_per_subscription
+        if queued and queued + size > limit:
+            return False
+        return not self._queued_events or self._queued_events + size <= self._max_queued_events
+
+    def _enqueue(self, delivery: _Delivery) -> None:
+        """Admit a delivery under the queue bounds and queue it on its
+        destination's lane. Caller holds self._cond."""
+        subscription_id = delivery.subscription.subscription_id
+        if self._spilled.get(subscription_id):
+            # Older deliveries are waiting on disk; stay behind them
+            self._spill(delivery)
+            return
+        if self._outbox is not None and self._circuit_open(delivery.subscription):
+            # The receiver is down; no point holding this in memory
+            self._spill(delivery)
+            return
+        size = len(delivery.events)
+        limit = delivery.subscription.queue_max_events or self._max_queued_per_subscription
+        while True:
+            over_subscription = self._queued_by_subscription.get(subscription_id, 0) + size > limit
+            if not over_subscription and self._queued_events + size <= self._max_queued_events:
+                break
+            if not self._make_room(delivery, over_subscription):
+                return
+        self._push(delivery)
+
+    def _push(self, delivery: _Delivery) -> None:
+        """Append a delivery to its destination's lane. Caller holds self._cond."""
+        subscription_id = delivery.subscription.subscription_id
+        self._record(delivery)
+        if delivery.outbox_id is not None:
+            self._outbox.hold(delivery.outbox_id)
+            self._spill_cursor[subscription_id] = max(
+                self._spill_cursor.get(subscription_id, 0), delivery.outbox_id
+            )
+        self._queued_events += len(delivery.events)
+        self._queued_by_subscription[subscription_id] = (
+            self._queued_by_subscription.get(subscription_id, 0) + len(delivery.events)
+        )
+        destination = _destination(delivery.subscription.webhook_url)
+        self._lanes.setdefault(destination, deque()).append(delivery)
+        if destination not in self._held:
+            self._held.add(destination)
+            self._ready.append(destination)
+            self._cond.notify()
+
+    def _record(self, delivery: _Delivery) -> None:
+        """Give a delivery its outbox row, if there is an outbox and it has none yet."""
+        if self._outbox is not None and delivery.outbox_id is None:
+            delivery.outbox_id = self._outbox.add(
+                delivery.subscription.subscription_id,
+                [event.to_dict() for event in delivery.events],
+                delivery.batched,
+            )
+
+    def _discard(self, delivery: _Delivery) -> None:
+        """Account for a delivery leaving its lane. Caller holds self._cond."""
+        subscription_id = delivery.subscription.subscription_id
+        self._queued_events -= len(delivery.events)
+        remaining = self._queued_by_subscription.get(subscription_id, 0) - len(delivery.events)
+        if remaining > 0:
+            self._queued_by_subscription[subscription_id] = remaining
+        else:
+            self._queued_by_subscription.pop(subscription_id, None)
+            self._warned_overflow.discard(subscription_id)
+            self._buckets.pop(subscription_id, None)
+            if not self._spilled.get(subscription_id):
+                self._spill_cursor.pop(subscription_id, None)
+
+    # ------------------------------------------------------------------
+    # Overflow
+    # ------------------------------------------------------------------
+
+    def _make_room(self, delivery: _Delivery, over_subscription: bool) -> bool:
+        """
+        Apply the subscription's overflow policy to a delivery that doesn't
+        fit. Caller holds self._cond.
+
+        Returns:
+            True when an older delivery was evicted (check the bounds again),
+            False when the new delivery was dropped, coalesced or spilled
+        """
+        subscription = delivery.subscription
+        policy = subscription.queue_overflow
+        if subscription.subscription_id not in self._warned_overflow:
+            self._warned_overflow.add(subscription.subscription_id)
+            bound = "the dispatcher's queue" if not over_subscription else "its queue"
+            self._logger.warning(
+                f"⚠️ Subscription '{_subscription_label(subscription)}' has filled {bound} — "
+                f"{_OVERFLOW_ACTIONS.get(policy, _OVERFLOW_ACTIONS['drop_oldest'])} until "
+                f"{host_only(subscription.webhook_url)} catches up"
+            )
+
+        if policy == "drop_newest":
+            self._drop(delivery)
+            return False
+        if policy == "coalesce" and self._coalesce(delivery):
+            return False
+        if policy == "spill" and self._outbox is not None:
+            self._spill(delivery)
+            return False
+
+        # drop_oldest, and what the other policies fall back to
+        victim = self._oldest_evictable(subscription.subscription_id if over_subscription else None)
+        if victim is None:
+            self._drop(delivery)
+            return False
+        lane, index = victim
+        evicted = lane[index]
+        del lane[index]
+        self._discard(evicted)
+        self._drop(evicted)
+        return True
+
+    def _oldest_evictable(
+        self, subscription_id: Optional[str]
+    ) -> Optional[Tuple[Deque[_Delivery], int]]:
+        """
+        (lane, index) of the oldest queued delivery that may be dropped — of
+        one subscription, or of any when None. Lane heads are being (or
+        about to be) delivered and are left alone. Caller holds self._cond.
+        """
+        best: Optional[Tuple[Deque[_Delivery], int]] = None
+        for lane in self._lanes.values():
+            for index in range(1, len(lane)):
+                candidate = lane[index]
+                if subscription_id is not None and candidate.subscription.subscription_id != subscription_id:
+                    continue
+                if best is None or candidate.enqueued_at < best[0][best[1]].enqueued_at:
+                    best = (lane, index)
+                break  # lanes are oldest first
+        return best
+
+    def _coalesce(self, delivery: _Delivery) -> bool:
+        """Replace the subscription's queued event with the same dedupe_key by
+        the new one. Returns False if it has none. Caller holds self._cond."""
+        if delivery.batched or not delivery.events[0].dedupe_key:
+            return False
+        subscription_id = delivery.subscription.subscription_id
+        key = delivery.events[0].dedupe_key
+        lane = self._lanes.get(_destination(delivery.subscription.webhook_url), ())
+        for index in range(1, len(lane)):
+            queued = lane[index]
+            if (
+                queued.subscription.subscription_id == subscription_id
+                and not queued.batched
+                and queued.events[0].dedupe_key == key
+            ):
+                queued.events = delivery.events
+                if queued.outbox_id is not None:
+                    # Same row, so _spill_cursor and replay order still hold
+                    self._outbox.replace(
+                        queued.outbox_id,
+                        subscription_id,
+                        [event.to_dict() for event in queued.events],
+                        queued.batched,
+                    )
+                with self._stats_lock:
+                    self._events_coalesced += 1
+                return True
+        return False
+
+    def _drop(self, delivery: _Delivery) -> None:
+        """Give up on a delivery that is not on a lane. Caller holds self._cond."""
+        if delivery.outbox_id is not None:
+            self._outbox.ack(delivery.outbox_id)
+            delivery.outbox_id = None
+        dropped = len(delivery.events)
+        delivery.subscription.stats["dropped"] = delivery.subscription.stats.get("dropped", 0) + dropped
+        with self._stats_lock:
+            self._events_dropped += dropped
+        self._logger.debug(
+            f"Webhook queue full, dropped: "
+            f"{', '.join(event.event_id for event in delivery.events)}"
+        )
+
+    def _spill(self, delivery: _Delivery) -> None:
+        """Leave a delivery in the outbox only, to be read back by _refill().
+        Caller holds self._cond."""
+        self._record(delivery)
+        subscription_id = delivery.subscription.subscription_id
+        self._spilled[subscription_id] = self._spilled.get(subscription_id, 0) + 1
+        self._spilled_subscriptions[subscription_id] = delivery.subscription
+        with self._stats_lock:
+            self._events_spilled += len(delivery.events)
+
+    def _needs_refill(self, subscription: Subscription) -> bool:
+        """Whether a subscription has spilled deliveries and room for them.
+        Caller holds self._cond."""
+        subscription_id = subscription.subscription_id
+        if not self._spilled.get(subscription_id) or subscription_id in self._refilling:
+            return False
+        if self._circuit_open(subscription):
+            return False
+        if self._queued_events >= self._max_queued_events:
+            return False
+        limit = subscription.queue_max_events or self._max_queued_per_subscription
+        return self._queued_by_subscription.get(subscription_id, 0) <= limit // 2
+
+    def _refill(self, subscription: Subscription) -> None:
+        """Read a subscription's spilled deliveries back from the outbox onto
+        its lane, up to its bound (in events, so batches count in full).
+        Does the disk read without self._cond."""
+        subscription_id = subscription.subscription_id
+        with self._cond:
+            if not self._running or not self._needs_refill(subscription):
+                return
+            limit = subscription.queue_max_events or self._max_queued_per_subscription
+            room = max(1, min(
+                limit - self._queued_by_subscription.get(subscription_id, 0),
+                self._max_queued_events - self._queued_events,
+            ))
+            after = self._spill_cursor.get(subscription_id, 0)
+            self._refilling.add(subscription_id)
+
+        records: Optional[List[OutboxRecord]] = None
+        try:
+            records = self._outbox.pending_for(subscription_id, after, room)
+        except Exception as e:
+            self._logger.debug(f"Reading spilled webhook deliveries failed: {e}")
+
+        with self._cond:
+            self._refilling.discard(subscription_id)
+            if not self._running:
+                return  # stopped meanwhile; they stay in the outbox
+            if records is None:
+                return  # still spilled; the next drain tries again
+            wall_now, now = time.time(), time.monotonic()
+            taken = read_back = 0
+            for record in records:
+                if taken and taken + len(record.events) > room:
+                    break  # the rest stays on disk, after the cursor
+                read_back += 1
+                try:
+                    events = [Event(**event) for event in record.events]
+                except TypeError as e:
+                    self._logger.debug(f"Dropping unreadable outbox record {record.outbox_id}: {e}")
+                    self._outbox.ack(record.outbox_id)
+                    continue
+                taken += len(events)
+                self._push(_Delivery(
+                    subscription, events, record.batched, record.outbox_id,
+                    enqueued_at=now - max(0.0, wall_now - record.created),
+                ))
+            spilled = self._spilled.get(subscription_id, 0) - read_back
+            if records and spilled > 0:
+                self._spilled[subscription_id] = spilled
+            else:
+                # All read back (or gone from the outbox, e.g. past its cap)
+                self._spilled.pop(subscription_id, None)
+                self._spilled_subscriptions.pop(subscription_id, None)
+
+    def _refill_candidates(self, destination: str) -> List[Subscription]:
+        """Subscriptions whose spilled deliveries can be read back now: those
+        delivering to `destination`, and those with nothing in memory (kept
+        on disk by the overall bound, so no lane of their own would drain).
+        Caller holds self._cond."""
+        return [
+            subscription
+            for subscription in self._spilled_subscriptions.values()
+            if (
+                _destination(subscription.webhook_url) == destination
+                or _destination(subscription.webhook_url) not in self._lanes
+            )
+            and self._needs_refill(subscription)
+        ]
+
+    # ------------------------------------------------------------------
+    # Circuit breaking and rate limiting
+    # ------------------------------------------------------------------
+
+    def _breaker(self, destination: str) -> CircuitBreaker:
+        """The destination's breaker, created on first failure. Caller holds self._cond."""
+        breaker = self._breakers.get(destination)
+        if breaker is None:
+            breaker = self._breakers[destination] = CircuitBreaker(
+                failure_threshold=self._circuit_failure_threshold,
+                cooldown=self._circuit_cooldown,
+            )
+        return breaker
+
+    def _circuit_open(self, subscription: Subscription) -> bool:
+        """Whether the subscription's destination is held back. Caller holds self._cond."""
+        breaker = self._breakers.get(_destination(subscription.webhook_url))
+        return breaker is not None and breaker.is_open(time.monotonic())
+
+    def _hold_back(self, destination: str, delivery: _Delivery) -> float:
+        """
+        Seconds the destination's next attempt must wait for its circuit or
+        the subscription's rate limit; 0 to go ahead (taking a token).
+        Caller holds self._cond.
+        """
+        now = time.monotonic()
+        breaker = self._breakers.get(destination)
+        if breaker is not None:
+            wait = breaker.wait_time(now)
+            if wait > 0:
+                return wait
+        subscription = delivery.subscription
+        if subscription.rate_limit_per_minute:
+            bucket = self._buckets.get(subscription.subscription_id)
+            if bucket is None:
+                bucket = self._buckets[subscription.subscription_id] = TokenBucket(
+                    subscription.rate_limit_per_minute / 60,
+                    subscription.rate_limit_burst or 1,
+                    now,
+                )
+            wait = bucket.take(now)
+            if wait > 0:
+                with self._stats_lock:
+                    self._rate_limit_waits += 1
+                return wait
+        return 0.0
+
+    def _park(self, destination: str, delay: float) -> None:
+        """Put a claimed destination back to wait `delay` seconds. Caller holds self._cond."""
+        self._sequence += 1
+        heapq.heappush(self._delayed, (time.monotonic() + delay, self._sequence, destination))
+
+    def _record_reachable(self, subscription: Subscription) -> None:
+        """The subscription's destination answered (any status below 500)."""
+        destination = _destination(subscription.webhook_url)
+        with self._cond:
+            breaker = self._breakers.pop(destination, None)
+        if breaker is not None and breaker.record_success() and breaker.times_opened:
+            self._logger.info(
+                f"🔔 {host_only(subscription.webhook_url)} is answering again — resuming webhook deliveries"
+            )
+
+    def _after_failure(self, delivery: _Delivery) -> Optional[float]:
+        """
+        Count a failed attempt (network error or 5xx) against the
+        destination's circuit and decide what comes next.
+
+        Returns:
+            Seconds until the next attempt, or None when the delivery is out
+            of retries
+        """
+        subscription = delivery.subscription
+        now = time.monotonic()
+        with self._cond:
+            breaker = self._breaker(_destination(subscription.webhook_url))
+            was_open = breaker.times_opened
+            is_open = breaker.record_failure(now)
+            wait = breaker.wait_time(now)
+        if is_open:
+            if not was_open:
+                self._logger.warning(
+                    f"⚠️ {host_only(subscription.webhook_url)} is not responding — pausing webhook "
+                    f"deliveries to it and retrying every {self._circuit_cooldown:g}s or so"
+                )
+            # Waiting out an open circuit doesn't use up the delivery's retries
+            return wait
+        if delivery.attempt < self._max_retries:
+            # Exponential backoff: 1s, 2s, 4s (for base_delay=1.0)
+            delay = self._retry_base_delay * (2 ** delivery.attempt)
+            delivery.attempt += 1
+            return delay
+        return None
+
+    def circuit_state(self, webhook_url: str) -> Dict[str, Any]:
+        """Circuit breaker state of a webhook URL's destination."""
+        now = time.monotonic()
+        with self._cond:
+            breaker = self._breakers.get(_destination(webhook_url))
+            if breaker is None:
+                return {"state": CircuitBreaker.CLOSED}
+            return breaker.to_dict(now)
+
+    def _add_to_batch(self, subscription: Subscription, event: Event) -> None:
+        """Buffer an event for a batching subscription. Caller holds self._cond."""
+        subscription_id = subscription.subscription_id
+        batch = self._batches.get(subscription_id)
+        if batch is None:
+            self._sequence += 1
+            batch = self._batches[subscription_id] = _Batch(subscription, self._sequence)
+            due = time.monotonic() + subscription.batch_window_ms / 1000
+            heapq.heappush(self._batch_due, (due, self._sequence, subscription_id))
+            self._cond.notify()  # an idle worker may need to wait less
+        batch.add(event)
+        if len(batch) >= (subscription.batch_max_events or DEFAULT_BATCH_MAX_EVENTS):
+            self._flush_batch(subscription_id)
+
+    def _flush_batch(self, subscription_id: str) -> None:
+        """Queue a subscription's open batch for delivery. Caller holds self._cond."""
+        batch = self._batches.pop(subscription_id, None)
+        if batch is not None and len(batch):
+            self._enqueue(_Delivery(batch.subscription, batch.events(), batched=True))
 
     def get_stats(self) -> Dict[str, Any]:
-        """Return dispatcher-level delivery stats."""
+        """Return dispatcher-level delivery and queue stats."""
+        with self._cond:
+            queue_depth = self._queued_events
+            oldest = min((lane[0].enqueued_at for lane in self._lanes.values()), default=None)
+            batched = sum(len(batch) for batch in self._batches.values())
+            spilled = sum(self._spilled.values())
+            destinations = len(self._lanes)
+            backing_off = len(self._delayed)
+            now = time.monotonic()
+            circuits = {
+                host_only(destination): breaker.to_dict(now)
+                for destination, breaker in self._breakers.items()
+                if breaker.state != CircuitBreaker.CLOSED
+            }
+        latency_labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + [f"gt_{LATENCY_BUCKETS_MS[-1]}"]
         with self._stats_lock:
             return {
                 "events_sent": self._events_sent,
                 "events_failed": self._events_failed,
-                "queue_depth": self._queue.qsize(),
+                "events_dropped": self._events_dropped,
+                "events_coalesced": self._events_coalesced,
+                "events_spilled": self._events_spilled,
+                "queue_depth": queue_depth,
+                "max_queue_depth": self._max_queued_events,
+                "oldest_queued_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0,
+                "deliveries_on_disk": spilled,
+                "delivery_latency_ms": dict(zip(latency_labels, self._latency_counts)),
+                "events_batching": batched,
+                "rate_limit_waits": self._rate_limit_waits,
+                "circuits": circuits,
+                "destinations": destinations,
+                "destinations_backing_off": backing_off,
+                "workers": self._worker_count,
                 "running": self._running,
+                **self._http.get_stats(),
+                **(self._outbox.get_stats() if self._outbox is not None else {}),
             }
 
     # ------------------------------------------------------------------
@@ -141,135 +820,196 @@ class WebhookDispatcher:
     # ------------------------------------------------------------------
 
     def _delivery_loop(self) -> None:
-        """Background worker: read from queue, deliver with retry."""
-        while self._running:
-            try:
-                item = self._queue.get(timeout=1.0)
-            except queue.Empty:
-                continue
+        """Worker: take a ready destination, attempt its oldest event, release it."""
+        while True:
+            with self._cond:
+                destination = self._next_destination()
+                if destination is None:
+                    return
+                delivery = self._lanes[destination][0]
+                wait = self._hold_back(destination, delivery)
+                if wait > 0:
+                    self._park(destination, wait)
+                    continue
 
-            if item is None:
-                # Sentinel — drain remaining items then exit
-                self._drain_queue()
-                break
+            retry_delay = self._attempt(delivery)
+            if retry_delay is None and delivery.outbox_id is not None:
+                self._outbox.ack(delivery.outbox_id)
+            if self._on_stats_changed:
+                try:
+                    self._on_stats_changed()
+                except Exception:
+                    self._logger.exception("Error saving subscription stats")
 
-            subscription, event = item
-            self._deliver_with_retry(subscription, event)
+            refill: List[Subscription] = []
+            with self._cond:
+                lane = self._lanes.get(destination)
+                if lane is None or lane[0] is not delivery:
+                    pass  # stopped meanwhile; what was queued stays in the outbox
+                elif retry_delay is not None:
+                    self._park(destination, retry_delay)
+                else:
+                    lane.popleft()
+                    self._discard(delivery)
+                    refill = self._refill_candidates(destination)
+                    if lane:
+                        self._ready.append(destination)
+                    else:
+                        del self._lanes[destination]
+                        self._held.discard(destination)
+                self._cond.notify()
+            for subscription in refill:
+                self._refill(subscription)
 
-    def _drain_queue(self) -> None:
-        """Deliver any remaining queued events before shutdown."""
-        while not self._queue.empty():
-            try:
-                item = self._queue.get_nowait()
-                if item is not None:
-                    subscription, event = item
-                    self._deliver_with_retry(subscription, event)
-            except queue.Empty:
-                break
+    def _next_destination(self) -> Optional[str]:
+        """
+        Wait for a destination with work that is due and claim it. Returns
+        None once stopped with nothing left queued (or, with an outbox, as
+        soon as stopped). Caller holds self._cond.
+        """
+        while True:
+            now = time.monotonic()
+            while self._batch_due and self._batch_due[0][0] <= now:
+                _, sequence, subscription_id = heapq.heappop(self._batch_due)
+                batch = self._batches.get(subscription_id)
+                if batch is not None and batch.sequence == sequence:
+                    self._flush_batch(subscription_id)
+            while self._delayed and self._delayed[0][0] <= now:
+                self._ready.append(heapq.heappop(self._delayed)[2])
+            if self._ready and (self._running or self._outbox is None):
+                return self._ready.popleft()
+            if not self._running and (self._outbox is not None or not self._lanes):
+                self._cond.notify_all()  # let the other workers exit too
+                return None
+            due = [heap[0][0] for heap in (self._delayed, self._batch_due) if heap]
+            self._cond.wait(min(due) - now if due else None)
 
-    def _deliver_with_retry(
-        self, subscription: Subscription, event: Event
-    ) -> None:
-        """Attempt delivery with exponential backoff retry."""
-        body = json.dumps(event.to_dict())
+    def _attempt(self, delivery: _Delivery) -> Optional[float]:
+        """
+        Make one delivery attempt.
 
-        for attempt in range(self._max_retries + 1):
-            try:
-                status_code = self._post(subscription, body, event)
+        Returns:
+            Seconds to wait before retrying, or None when the event is done
+            with (delivered, rejected, or out of retries)
+        """
+        subscription, events = delivery.subscription, delivery.events
+        error = None
+        event_ids = ", ".join(event.event_id for event in events)
+        if delivery.batched:
+            body = json.dumps([event.to_dict() for event in events])
+        else:
+            body = json.dumps(events[0].to_dict())
 
-                if 200 <= status_code < 300:
-                    subscription.record_success(status_code)
-                    with self._stats_lock:
-                        self._events_sent += 1
+        try:
+            status_code = self._post(subscription, body, events, delivery.batched)
+            if status_code < 500:
+                self._record_reachable(subscription)
+
+            if 200 <= status_code < 300:
+                subscription.record_success(status_code, events=len(events))
+                latency_ms = (time.monotonic() - delivery.enqueued_at) * 1000
+                with self._stats_lock:
+                    self._events_sent += len(events)
+                    self._latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+                what = (
+                    f"Batch of {len(events)} event{'s' if len(events) != 1 else ''}"
+                    if delivery.batched
+                    else f"'{_entity_label(events[0])}' changed"
+                )
+                self._logger.info(
+                    f"🔔 {what} → webhook sent to "
+                    f"{host_only(subscription.webhook_url)} (HTTP {status_code})"
+                )
+                self._logger.debug(
+                    f"Webhook delivered: {event_ids} → "
+                    f"{subscription.webhook_url} ({status_code})"
+                )
+                # Auto-expire if max_fires reached
+                if (
+                    subscription.max_fires is not None
+                    and subscription.stats["fires"] >= subscription.max_fires
+                    and self._on_expired
+                ):
                     self._logger.info(
-                        f"🔔 '{_entity_label(event)}' changed → webhook sent to "
-                        f"{host_only(subscription.webhook_url)} (HTTP {status_code})"
-                    )
-                    self._logger.debug(
-                        f"Webhook delivered: {event.event_id} → "
-                        f"{subscription.webhook_url} ({status_code})"
+                        f"🔔 Subscription '{_subscription_label(subscription)}' finished "
+                        f"(reached {subscription.stats['fires']} events) and was removed"
                     )
-                    # Auto-expire if max_fires reached
-                    if (
-                        subscription.max_fires is not None
-                        and subscription.stats["fires"] >= subscription.max_fires
-                        and self._on_expired
-                    ):
-                        self._logger.info(
-                            f"🔔 Subscription '{_subscription_label(subscription)}' finished "
-                            f"(reached {subscription.stats['fires']} events) and was removed"
+                    try:
+                        self._on_expired(subscription)
+                    except Exception:
+                        self._logger.exception(
+                            f"Error auto-expiring subscription "
+                            f"{subscription.subscription_id}"
                         )
-                        try:
-                            self._on_expired(subscription)
-                        except Exception:
-                            self._logger.exception(
-                                f"Error auto-expiring subscription "
-                                f"{subscription.subscription_id}"
-                            )
-                    return
-                elif status_code >= 500:
-                    # Server error — retry
-                    subscription.record_failure(
-                        f"HTTP {status_code}", http_status=status_code
-                    )
-                    if attempt < self._max_retries:
-                        # Exponential backoff: 1s, 2s, 4s (for base_delay=1.0)
-                        delay = self._retry_base_delay * (2 ** attempt)
-                        self._logger.debug(
-                            f"Webhook {status_code}, retry {attempt + 1} "
-                            f"in {delay}s: {event.event_id}"
-                        )
-                        time.sleep(delay)
-                        continue
-                else:
-                    # Client error (4xx) — don't retry
-                    subscription.record_failure(
-                        f"HTTP {status_code}", http_status=status_code
-                    )
-                    self._logger.warning(
-                        f"⚠️ Webhook for '{_entity_label(event)}' rejected by "
-                        f"{host_only(subscription.webhook_url)} (HTTP {status_code}) — "
-                        f"check the receiving server's URL"
-                    )
+                return None
+            elif status_code >= 500:
+                # Server error — retry
+                error = f"HTTP {status_code}"
+                subscription.record_failure(error, http_status=status_code)
+                delay = self._after_failure(delivery)
+                if delay is not None:
                     self._logger.debug(
-                        f"Webhook rejected ({status_code}): {event.event_id} "
-                        f"→ {subscription.webhook_url}"
+                        f"Webhook {status_code}, next attempt in {delay:.1f}s: {event_ids}"
                     )
-                    with self._stats_lock:
-                        self._events_failed += 1
-                    return
+                    return delay
+            else:
+                # Client error (4xx) — don't retry
+                subscription.record_failure(
+                    f"HTTP {status_code}", http_status=status_code
+                )
+                self._logger.warning(
+                    f"⚠️ Webhook for {_events_label(events)} rejected by "
+                    f"{host_only(subscription.webhook_url)} (HTTP {status_code}) — "
+                    f"check the receiving server's URL"
+                )
+                self._logger.debug(
+                    f"Webhook rejected ({status_code}): {event_ids} "
+                    f"→ {subscription.webhook_url}"
+                )
+                with self._stats_lock:
+                    self._events_failed += len(events)
+                return None
 
-            except Exception as e:
-                subscription.record_failure(str(e))
-                if attempt < self._max_retries:
-                    delay = self._retry_base_delay * (2 ** attempt)
-                    self._logger.debug(
-                        f"Webhook error, retry {attempt + 1} in {delay}s: {e}"
-                    )
-                    time.sleep(delay)
-                    continue
+        except Exception as e:
+            error = str(e)
+            subscription.record_failure(error)
+            delay = self._after_failure(delivery)
+            if delay is not None:
+                self._logger.debug(
+                    f"Webhook error, next attempt in {delay:.1f}s: {e}"
+                )
+                return delay
 
         # All retries exhausted
         self._logger.error(
-            f"❌ Webhook delivery failed: '{_entity_label(event)}' event could not reach "
+            f"❌ Webhook delivery failed: {_events_label(events)} could not reach "
             f"{host_only(subscription.webhook_url)} after {self._max_retries + 1} attempts — "
             f"check that the receiver is running"
         )
         self._logger.debug(
-            f"Webhook delivery failed: {event.event_id} → {subscription.webhook_url}"
+            f"Webhook delivery failed: {event_ids} → {subscription.webhook_url}"
         )
         with self._stats_lock:
-            self._events_failed += 1
+            self._events_failed += len(events)
+        if delivery.outbox_id is not None:
+            self._outbox.dead_letter(delivery.outbox_id, error or "delivery failed")
+            delivery.outbox_id = None
+        return None
 
     # ------------------------------------------------------------------
     # HTTP POST
     # ------------------------------------------------------------------
 
     def _post(
-        self, subscription: Subscription, body: str, event: Event
+        self,
+        subscription: Subscription,
+        body: str,
+        events: List[Event],
+        batched: bool = False,
     ) -> int:
         """
-        POST the event payload to the subscription's webhook URL.
+        POST the event payload (a JSON array of events when batched) to the
+        subscription's webhook URL. The HMAC signature covers the whole body.
 
         Returns the HTTP status code.
         """
@@ -289,12 +1029,20 @@ class WebhookDispatcher:
             self._warned_http.add(sub_id)
 
         # Build headers
-        headers = {
-            "Content-Type": "application/json",
-            "X-Event-Id": event.event_id,
-            "X-Event-Type": event.event_type,
-            "X-Subscription-Id": subscription.subscription_id,
-        }
+        if batched:
+            headers = {
+                "Content-Type": "application/json",
+                "X-Event-Type": "batch",
+                "X-Event-Count": str(len(events)),
+                "X-Subscription-Id": subscription.subscription_id,
+            }
+        else:
+            headers = {
+                "Content-Type": "application/json",
+                "X-Event-Id": events[0].event_id,
+                "X-Event-Type": events[0].event_type,
+                "X-Subscription-Id": subscription.subscription_id,
+            }
 
         # Auth
         body_bytes = body.encode("utf-8")
@@ -312,26 +1060,12 @@ class WebhookDispatcher:
             headers["X-Webhook-Signature"] = f"sha256={signature}"
             headers["X-Webhook-Timestamp"] = timestamp
 
-        # Build request
-        req = urllib.request.Request(
-            url, data=body_bytes, headers=headers, method="POST"
+        # Execute over a pooled keep-alive connection. Any status comes back
+        # so the caller can distinguish 4xx (no retry) from 5xx (retry).
+        return self._http.post(
+            url,
+            body_bytes,
+            headers,
+            verify_ssl=subscription.verify_ssl,
+            timeout=self._timeout,
         )
-
-        # SSL context
-        ssl_context = None
-        if url.startswith("https://"):
-            if subscription.verify_ssl:
-                ssl_context = ssl.create_default_context()
-            else:
-                ssl_context = ssl._create_unverified_context()
-
-        # Execute
-        try:
-            response = urllib.request.urlopen(
-                req, timeout=self._timeout, context=ssl_context
-            )
-            return response.getcode()
-        except urllib.error.HTTPError as e:
-            # HTTPError carries the status code — return it so the caller
-            # can distinguish 4xx (no retry) from 5xx (retry).
-            return e.code
@@ -36,7 +36,7 @@ from .tools.action_control import ActionControlHandler
 from .tools.automation import AutomationHandler
 from .tools.device_control import DeviceControlHandler
 from .tools.get_devices_by_type import GetDevicesByTypeHandler
-from .tools.historical_analysis import HistoricalAnalysisHandler
+from .tools.historical_analysis import HistoricalAnalysisHandler, HistoryRollups
 from .tools.log_search import LogSearchHandler
 from .tools.plugin_control import PluginControlHandler
 from .tools.rgb_control import RGBControlHandler
@@ -161,9 +161,20 @@ class MCPHandler:
             data_provider=self.data_provider,
             logger=self.logger
         )
+        # Pre-aggregated rollups for frequently analyzed entities. The file
+        # path is always set by the plugin; whether the job does anything is
+        # the HISTORY_ROLLUPS_ENABLED preference, checked on every cycle.
+        rollups_path = os.environ.get("HISTORY_ROLLUPS_FILE")
+        self.history_rollups = (
+            HistoryRollups(db_path=rollups_path, logger=self.logger)
+            if rollups_path else None
+        )
+        if self.history_rollups:
+            self.history_rollups.start()
         self.historical_analysis_handler = HistoricalAnalysisHandler(
             data_provider=self.data_provider,
-            logger=self.logger
+            logger=self.logger,
+            rollups=self.history_rollups
         )
         self.plugin_control_handler = PluginControlHandler(
             data_provider=self.data_provider,
@@ -172,11 +183,14 @@ class MCPHandler:
 
         # Structure store over Indigo's database file (action steps and
         # condition trees the IOM does not expose), plus the automation
-        # introspection handler built on it.
+        # introspection handler built on it. Parses are persisted so a restart
+        # can skip the first one.
         self.structure_store = IndiDbStructureStore(
             db_path_supplier=self.data_provider.get_db_file_path,
             logger=self.logger,
+            snapshot_path=os.environ.get("INDIDB_SNAPSHOT_FILE"),
         )
+        self.structure_store.start()
         self.automation_handler = AutomationHandler(
             data_provider=self.data_provider,
             structure_store=self.structure_store,
@@ -187,7 +201,11 @@ class MCPHandler:
             data_provider=self.data_provider,
             structure_store=self.structure_store,
             logger=self.logger,
+            log_index_path=os.environ.get("EVENT_LOG_INDEX_FILE"),
+            parallel_workers=int(os.environ.get("EVENT_LOG_PARALLEL_WORKERS", "0")),
         )
+        if self.log_search_handler.log_index:
+            self.log_search_handler.log_index.start()
 
         # Initialize tool wrappers with all handlers
         self.tool_wrappers = ToolWrappers(
@@ -212,6 +230,12 @@ class MCPHandler:
         """Stop the MCP handler and cleanup resources."""
         if self.vector_store_manager:
             self.vector_store_manager.stop()
+        if self.history_rollups:
+            self.history_rollups.stop()
+        self.structure_store.stop()
+        if self.log_search_handler.log_index:
+            self.log_search_handler.log_index.stop()
+        self.log_search_handler.reader.close()
 
     @property
     def _sessions(self) -> Dict[str, Any]:
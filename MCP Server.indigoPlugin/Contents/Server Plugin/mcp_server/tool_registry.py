@@ -911,6 +911,20 @@ def get_tool_schemas(tool_functions):
                     "default": 5,
                     "minimum": 0,
                     "maximum": 600
+                },
+                "targets": {
+                    "type": "array",
+                    "description": "Batch mode: investigate up to 50 changes in one call (e.g. every light that flipped last night) instead of device_id/search_text. One log scan is shared by all targets; returns one result per target, in order.",
+                    "maxItems": 50,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "device_id": {"type": "integer"},
+                            "search_text": {"type": "string"},
+                            "around_time": {"type": "string"},
+                            "occurrence": {"type": "integer", "minimum": 1}
+                        }
+                    }
                 }
             }
         },
@@ -1143,6 +1157,63 @@ def get_tool_schemas(tool_functions):
                         "description": "Auto-delete subscription after this many successful deliveries. Omit for unlimited. Use 1 for one-shot notifications.",
                         "minimum": 1
                     },
+                    "batch": {
+                        "type": "object",
+                        "description": "Optional batching for bursty sources: events are buffered and POSTed together as one JSON array (X-Event-Type: batch, X-Event-Count headers; the HMAC signature covers the whole array).",
+                        "properties": {
+                            "window_ms": {
+                                "type": "integer",
+                                "description": "How long to buffer events after the first one before sending the batch",
+                                "minimum": 1,
+                                "maximum": 60000
+                            },
+                            "max_events": {
+                                "type": "integer",
+                                "description": "Send the batch early once it holds this many events (default 100)",
+                                "minimum": 1
+                            },
+                            "coalesce": {
+                                "type": "boolean",
+                                "description": "Keep only the latest event per dedupe_key within a batch",
+                                "default": False
+                            }
+                        },
+                        "required": ["window_ms"]
+                    },
+                    "queue": {
+                        "type": "object",
+                        "description": "Optional bound on events waiting for delivery while the receiver is slow or down (default 1000), and what to do with new events once it is reached.",
+                        "properties": {
+                            "max_events": {
+                                "type": "integer",
+                                "description": "Events queued for delivery at most",
+                                "minimum": 1
+                            },
+                            "overflow": {
+                                "type": "string",
+                                "enum": ["drop_oldest", "drop_newest", "coalesce", "spill"],
+                                "description": "drop_oldest (default) drops the oldest queued events; drop_newest drops new ones; coalesce replaces a queued event with the same dedupe_key (else drops the oldest); spill keeps new events on disk until the queue drains",
+                                "default": "drop_oldest"
+                            }
+                        }
+                    },
+                    "rate_limit": {
+                        "type": "object",
+                        "description": "Optional cap on how fast this subscription's webhooks are sent. Events over the limit wait in the queue.",
+                        "properties": {
+                            "per_minute": {
+                                "type": "integer",
+                                "description": "Deliveries per minute at most, on average",
+                                "minimum": 1
+                            },
+                            "burst": {
+                                "type": "integer",
+                                "description": "Deliveries that may go back to back before pacing starts (default 1)",
+                                "minimum": 1
+                            }
+                        },
+                        "required": ["per_minute"]
+                    },
                     "description": {
                         "type": "string",
                         "description": "Human-readable label for this subscription"
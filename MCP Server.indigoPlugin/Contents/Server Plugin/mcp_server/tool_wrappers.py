@@ -517,7 +517,8 @@ class ToolWrappers:
         around_time: str = None,
         occurrence: int = 1,
         lookback_seconds: int = 60,
-        lookahead_seconds: int = 5
+        lookahead_seconds: int = 5,
+        targets: list = None
     ) -> str:
         """Investigate event tool implementation."""
         return self._call(
@@ -525,7 +526,8 @@ class ToolWrappers:
             self.log_search_handler.investigate_event,
             device_id=device_id, search_text=search_text,
             around_time=around_time, occurrence=occurrence,
-            lookback_seconds=lookback_seconds, lookahead_seconds=lookahead_seconds
+            lookback_seconds=lookback_seconds, lookahead_seconds=lookahead_seconds,
+            targets=targets
         )
 
     def _control(self, entity_type, entity_id, action, duration_seconds,
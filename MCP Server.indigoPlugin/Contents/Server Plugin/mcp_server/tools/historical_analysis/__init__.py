@@ -3,5 +3,6 @@ Historical data analysis tool using direct InfluxDB queries.
 """
 
 from .main import HistoricalAnalysisHandler
+from .rollups import HistoryRollups
 
-__all__ = ['HistoricalAnalysisHandler']
\ No newline at end of file
+__all__ = ['HistoricalAnalysisHandler', 'HistoryRollups']
@@ -12,6 +12,7 @@ from zoneinfo import ZoneInfo
 from ...adapters.data_provider import DataProvider
 from ..base_handler import BaseToolHandler
 from ...common.influxdb import InfluxDBClient, InfluxDBQueryBuilder
+from .rollups import HistoryRollups, rollups_enabled
 
 
 # Alternative fields to try for device properties
@@ -33,6 +34,10 @@ _MAX_WINDOW = timedelta(days=365)
 # lines. The stats block always covers every sample, capped or not.
 _MAX_CHANGE_LINES = 50
 
+# Rollups only answer windows of at least a day. Shorter windows are cheap to
+# read raw, and their change narrative would shrink to the sub-hour tail.
+_ROLLUP_MIN_WINDOW = timedelta(days=1)
+
 
 class HistoricalAnalysisHandler(BaseToolHandler):
     """Handler for historical data analysis using direct InfluxDB queries."""
@@ -40,17 +45,20 @@ class HistoricalAnalysisHandler(BaseToolHandler):
     def __init__(
         self,
         data_provider: DataProvider,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        rollups: Optional[HistoryRollups] = None
     ):
         """
         Initialize the historical analysis handler.
-        
+
         Args:
             data_provider: Data provider for accessing entity data
             logger: Optional logger instance
+            rollups: Optional pre-aggregated rollup store for hot entities
         """
         super().__init__(tool_name="historical_analysis", logger=logger)
         self.data_provider = data_provider
+        self.rollups = rollups
     
     def analyze_historical_data(
         self,
@@ -338,6 +346,13 @@ class HistoricalAnalysisHandler(BaseToolHandler):
             end_time = datetime.now()
             start_time = end_time - window
 
+            rollup_report = self._get_rollup_device_data(
+                device_name, device_property, window, start_time, end_time,
+                client, query_builder
+            )
+            if rollup_report:
+                return rollup_report
+
             # Build and execute query - try top-level property first
             query = query_builder.build_time_range_query(
                 device_name=device_name,
@@ -371,6 +386,7 @@ class HistoricalAnalysisHandler(BaseToolHandler):
                 return None
 
             self.debug_log(f"InfluxDB returned {len(results)} raw records for {device_name}.{actual_property}")
+            self._record_rollup_call(device_name, actual_property)
 
             return self._build_entity_report(
                 label=f"{device_name}.{actual_property}",
@@ -388,6 +404,82 @@ class HistoricalAnalysisHandler(BaseToolHandler):
             self.debug_log(f"Error querying {device_name}.{device_property}: {e}")
             return None
 
+    def _get_rollup_device_data(
+        self,
+        device_name: str,
+        device_property: str,
+        window: timedelta,
+        start_time: datetime,
+        end_time: datetime,
+        client: InfluxDBClient,
+        query_builder: InfluxDBQueryBuilder
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer from the rollups plus a raw query for the tail since them.
+
+        Args:
+            device_name: The device name to query data for
+            device_property: The device property to query data for
+            window: The analysis window
+            start_time: Window start
+            end_time: Window end
+            client: InfluxDB client for the tail query
+            query_builder: Query builder for the tail query
+
+        Returns:
+            An entity report whose stats cover the whole window, or None when
+            rollups are off, don't cover the window, or the tail is empty (the
+            caller then falls back to the raw path)
+        """
+        if self.rollups is None or not rollups_enabled() or window < _ROLLUP_MIN_WINDOW:
+            return None
+
+        candidates = [device_property]
+        if not device_property.startswith("state."):
+            candidates.append(f"state.{device_property}")
+
+        for prop in candidates:
+            rollup = self.rollups.summarize(device_name, prop, start_time.timestamp())
+            if not rollup:
+                continue
+
+            tail_start = datetime.fromtimestamp(rollup["covered_through"])
+            query = query_builder.build_time_range_query(
+                device_name=device_name,
+                device_property=prop,
+                start_time=tail_start,
+                end_time=end_time
+            )
+            results = client.execute_query(query)
+            if not results:
+                return None
+
+            self.debug_log(
+                f"Answered {device_name}.{prop} from {rollup['buckets']} {rollup['granularity']} "
+                f"rollups plus {len(results)} raw tail records"
+            )
+            self._record_rollup_call(device_name, prop)
+
+            return self._build_entity_report(
+                label=f"{device_name}.{prop}",
+                entity_name=device_name,
+                property_name=prop,
+                records=results,
+                value_key=prop,
+                window=window,
+                client=client,
+                query_builder=query_builder,
+                unit=self._get_property_unit(device_name, prop),
+                rollup=rollup
+            )
+
+        return None
+
+    def _record_rollup_call(self, device_name: str, device_property: str) -> None:
+        """Count this analysis towards the entity's rollup "hotness"."""
+        if self.rollups is not None and rollups_enabled():
+            self.rollups.record_call(device_name, device_property)
+
     def _build_entity_report(
         self,
         label: str,
@@ -400,7 +492,8 @@ class HistoricalAnalysisHandler(BaseToolHandler):
         query_builder: Optional[InfluxDBQueryBuilder] = None,
         message_prefix: Optional[str] = None,
         value_formatter: Optional[Any] = None,
-        unit: Optional[str] = None
+        unit: Optional[str] = None,
+        rollup: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Turn raw InfluxDB records into a change narrative plus summary stats.
@@ -418,6 +511,8 @@ class HistoricalAnalysisHandler(BaseToolHandler):
             value_formatter: Callable rendering a value for display; defaults to
                 the device-oriented, unit-aware _format_state_value
             unit: Display unit for the stats line, e.g. "°F"
+            rollup: Rollup summary covering the window before `records`; when
+                given, the stats span both and the narrative only the records
 
         Returns:
             Entity report dict, or None when the records held no usable values
@@ -478,7 +573,10 @@ class HistoricalAnalysisHandler(BaseToolHandler):
         truncated = total_changes > _MAX_CHANGE_LINES
         shown = messages[-_MAX_CHANGE_LINES:] if truncated else messages
 
-        stats = self._summarize_numeric(values, property_name)
+        if rollup:
+            stats = self._merge_rollup_stats(rollup, values, property_name)
+        else:
+            stats = self._summarize_numeric(values, property_name)
 
         warning = None
         if stats and stats["distinct_count"] == 1 and stats["sample_count"] >= 3:
@@ -495,7 +593,8 @@ class HistoricalAnalysisHandler(BaseToolHandler):
             "truncated": truncated,
             "stats": stats,
             "warning": warning,
-            "unit": unit
+            "unit": unit,
+            "rollup": rollup
         }
 
     def _get_property_unit(self, device_name: str, property_name: str) -> Optional[str]:
@@ -559,15 +658,6 @@ class HistoricalAnalysisHandler(BaseToolHandler):
         last = numeric[-1]
         delta = last - first
 
-        # A tenth of a degree/percent/watt is below the noise floor of most
-        # sensors; anything smaller reads as steady rather than as a trend.
-        if abs(delta) < 0.1:
-            trend = "steady"
-        elif delta > 0:
-            trend = "rising"
-        else:
-            trend = "falling"
-
         return {
             "current": last,
             "first": first,
@@ -575,12 +665,64 @@ class HistoricalAnalysisHandler(BaseToolHandler):
             "max": max(numeric),
             "mean": sum(numeric) / len(numeric),
             "delta": delta,
-            "trend": trend,
+            "trend": self._classify_trend(delta),
             "sample_count": len(numeric),
             "distinct_count": len(set(numeric)),
             "property": property_name
         }
 
+    def _merge_rollup_stats(
+        self, rollup: Dict[str, Any], tail_values: List[Any], property_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Combine a rollup summary with the raw tail into _summarize_numeric's shape.
+
+        "first" is the earliest bucket's mean rather than the first sample, and
+        the number of distinct values is only known when min equals max.
+
+        Args:
+            rollup: Output of HistoryRollups.summarize
+            tail_values: Raw values after the rollup coverage, chronological
+            property_name: The field name, used for unit-aware formatting
+
+        Returns:
+            Dict of summary figures, or None if the tail has no numeric value
+        """
+        numeric = [
+            v for v in tail_values
+            if isinstance(v, (int, float)) and not isinstance(v, bool)
+        ]
+        if not numeric:
+            return None
+
+        count = rollup["count"] + len(numeric)
+        low = min(rollup["min"], *numeric)
+        high = max(rollup["max"], *numeric)
+        first = rollup["first"] if rollup["first"] is not None else numeric[0]
+        last = numeric[-1]
+        delta = last - first
+
+        return {
+            "current": last,
+            "first": first,
+            "min": low,
+            "max": high,
+            "mean": (rollup["mean"] * rollup["count"] + sum(numeric)) / count,
+            "delta": delta,
+            "trend": self._classify_trend(delta),
+            "sample_count": count,
+            "distinct_count": 1 if low == high else None,
+            "property": property_name
+        }
+
+    def _classify_trend(self, delta: float) -> str:
+        """Label a first-to-last movement as rising, falling, or steady."""
+        # A tenth of a degree/percent/watt is below the noise floor of most
+        # sensors; anything smaller reads as steady rather than as a trend.
+        if abs(delta) < 0.1:
+            return "steady"
+        return "rising" if delta > 0 else "falling"
+
     def _describe_frozen_value(
         self,
         entity_name: str,
@@ -1314,6 +1456,14 @@ Recommend 1-3 most relevant properties:"""
             if summary_line:
                 report_lines.append(f"  {summary_line}")
 
+            rollup = report.get("rollup")
+            if rollup:
+                since = datetime.fromtimestamp(rollup["covered_through"]).astimezone()
+                report_lines.append(
+                    f"  (summary covers the whole period from {rollup['granularity']} "
+                    f"rollups; changes below are since {since.strftime('%Y-%m-%d %H:%M %Z')})"
+                )
+
             if report["warning"]:
                 for line in report["warning"].split("\n"):
                     report_lines.append(f"  {line}")
@@ -0,0 +1,385 @@
+"""
+Pre-aggregated hourly/daily rollups for frequently analyzed device properties.
+
+Agents ask about the same thermostats and power meters every day, and each
+question re-reads weeks of raw samples from InfluxDB. This module tracks which
+(device, property) pairs analyze_historical_data is asked about, keeps
+MIN/MAX/MEAN/COUNT summaries for the "hot" ones in a SQLite side file, and
+refreshes them from a background thread. The handler then answers the summary
+block from the rollups and reads raw InfluxDB only for the tail since the last
+complete bucket.
+
+The rollup file is a cache: deleting it only costs a backfill.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...common.influxdb import InfluxDBClient, InfluxDBQueryBuilder
+
+# (granularity, InfluxQL interval, bucket seconds, backfill days, refresh days).
+# Hourly buckets serve windows up to a month; daily buckets the rest of the
+# year. Refreshes re-read a short overlap so late-arriving samples land.
+_GRANULARITIES: Tuple[Tuple[str, str, int, int, int], ...] = (
+    ("hourly", "1h", 3600, 31, 2),
+    ("daily", "1d", 86400, 366, 3),
+)
+
+_AGGREGATIONS = ("MIN", "MAX", "MEAN", "COUNT")
+
+# An entity is "hot" once it has been analyzed this many times within
+# _HOT_WINDOW_SECONDS; rollups for entities that cool off are dropped.
+_HOT_MIN_CALLS = 3
+_HOT_WINDOW_SECONDS = 14 * 86400
+_MAX_HOT_ENTITIES = 25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entity_calls (
+    entity TEXT NOT NULL,
+    property TEXT NOT NULL,
+    called_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entity_calls_by_time ON entity_calls (called_at);
+CREATE TABLE IF NOT EXISTS rollups (
+    entity TEXT NOT NULL,
+    property TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (entity, property, granularity, bucket_start)
+);
+CREATE TABLE IF NOT EXISTS rollup_coverage (
+    entity TEXT NOT NULL,
+    property TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    covered_from INTEGER NOT NULL,
+    covered_through INTEGER NOT NULL,
+    PRIMARY KEY (entity, property, granularity)
+);
+"""
+
+
+def rollups_enabled() -> bool:
+    """Whether the rollup job is switched on in plugin config (checked per use)."""
+    return os.environ.get("HISTORY_ROLLUPS_ENABLED", "false").lower() == "true"
+
+
+def _parse_bucket_time(value: str) -> Optional[int]:
+    """InfluxDB bucket timestamp ("2026-08-08T00:00:00Z") -> epoch seconds."""
+    try:
+        parsed = datetime.fromisoformat(value.rstrip("Z"))
+    except (AttributeError, ValueError):
+        return None
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp())
+
+
+class HistoryRollups:
+    """SQLite-backed rollup store plus the background job that fills it."""
+
+    def __init__(
+        self,
+        db_path: str,
+        logger: Optional[logging.Logger] = None,
+        refresh_interval: int = 900,
+        client: Optional[InfluxDBClient] = None,
+        query_builder: Optional[InfluxDBQueryBuilder] = None,
+    ):
+        """
+        Args:
+            db_path: Path of the SQLite side file (created on first use)
+            logger: Optional logger instance
+            refresh_interval: Seconds between background refresh cycles
+            client: Optional InfluxDB client (tests inject a fake)
+            query_builder: Optional query builder
+        """
+        self.db_path = db_path
+        self.logger = logger or logging.getLogger("Plugin")
+        self.refresh_interval = refresh_interval
+        self._client = client or InfluxDBClient(logger=self.logger)
+        self._query_builder = query_builder or InfluxDBQueryBuilder(logger=self.logger)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background refresh thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, daemon=True, name="HistoryRollups-Thread"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh thread and close the side file."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (and migrate) the side file lazily. Caller holds self._lock."""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Hot-entity tracking
+    # ------------------------------------------------------------------
+
+    def record_call(self, entity: str, prop: str, now: Optional[float] = None) -> None:
+        """Note that a tool call analyzed entity.prop."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT INTO entity_calls (entity, property, called_at) VALUES (?, ?, ?)",
+                    (entity, prop, now if now is not None else time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.debug(f"History rollups: could not record call for {entity}.{prop}: {e}")
+
+    def hot_entities(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """(entity, property) pairs analyzed often enough to be worth rolling up."""
+        since = (now if now is not None else time.time()) - _HOT_WINDOW_SECONDS
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT entity, property FROM entity_calls WHERE called_at >= ? "
+                "GROUP BY entity, property HAVING COUNT(*) >= ? "
+                "ORDER BY COUNT(*) DESC LIMIT ?",
+                (since, _HOT_MIN_CALLS, _MAX_HOT_ENTITIES),
+            ).fetchall()
+        return [(entity, prop) for entity, prop in rows]
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.is_set():
+            if rollups_enabled() and self._client.is_enabled():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.logger.debug(f"History rollups: refresh cycle failed: {e}")
+            self._stop_event.wait(self.refresh_interval)
+
+    def refresh(self, now: Optional[float] = None) -> int:
+        """
+        Bring every hot entity's rollups up to the last complete bucket.
+
+        Returns:
+            Number of (entity, property) pairs refreshed
+        """
+        now = now if now is not None else time.time()
+        hot = self.hot_entities(now)
+        refreshed = 0
+        for entity, prop in hot:
+            if self._stop_event.is_set():
+                break
+            try:
+                for granularity in _GRANULARITIES:
+                    self._refresh_one(entity, prop, granularity, now)
+                refreshed += 1
+            except Exception as e:
+                # Boolean and string fields can't be averaged; they simply
+                # never get rollups and keep using raw queries.
+                self.logger.debug(f"History rollups: skipped {entity}.{prop}: {e}")
+        self._prune(now, hot)
+        if refreshed:
+            self.logger.debug(f"History rollups: refreshed {refreshed} hot entities")
+        return refreshed
+
+    def _refresh_one(
+        self,
+        entity: str,
+        prop: str,
+        granularity: Tuple[str, str, int, int, int],
+        now: float,
+    ) -> None:
+        name, interval, bucket_seconds, backfill_days, refresh_days = granularity
+        coverage = self._coverage(entity, prop, name)
+        if coverage is not None:
+            # Re-read from the end of coverage if refreshes stopped for longer
+            # than the usual overlap (plugin down, InfluxDB unreachable)
+            gap_days = math.ceil((now - coverage[1]) / 86400)
+            days = max(refresh_days, gap_days)
+            if days > backfill_days:
+                # Too far behind to close the gap; start coverage afresh
+                coverage = None
+        if coverage is None:
+            days = backfill_days
+
+        query = self._query_builder.build_aggregation_query(
+            device_name=entity,
+            device_property=prop,
+            aggregation=_AGGREGATIONS,
+            time_range_days=days,
+            group_by_time=interval,
+        )
+        records = self._client.execute_query(query)
+
+        # Everything before the current (still-filling) bucket is final, even
+        # buckets InfluxDB returned empty.
+        covered_through = int(now // bucket_seconds) * bucket_seconds
+        rows = []
+        for record in records:
+            bucket_start = _parse_bucket_time(record.get("time", ""))
+            count = record.get("count")
+            if bucket_start is None or not count or bucket_start >= covered_through:
+                continue
+            rows.append(
+                (entity, prop, name, bucket_start,
+                 record.get("min"), record.get("max"), record.get("mean"), int(count))
+            )
+
+        covered_from = int((now - days * 86400) // bucket_seconds + 1) * bucket_seconds
+        if coverage is not None:
+            covered_from = min(covered_from, coverage[0])
+
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO rollups "
+                "(entity, property, granularity, bucket_start, min, max, mean, count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rollup_coverage "
+                "(entity, property, granularity, covered_from, covered_through) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (entity, prop, name, covered_from, covered_through),
+            )
+            conn.commit()
+
+    def _coverage(self, entity: str, prop: str, granularity: str) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT covered_from, covered_through FROM rollup_coverage "
+                "WHERE entity = ? AND property = ? AND granularity = ?",
+                (entity, prop, granularity),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _prune(self, now: float, hot: List[Tuple[str, str]]) -> None:
+        """Expire old call records, old buckets, and entities that cooled off."""
+        hot_set = set(hot)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM entity_calls WHERE called_at < ?",
+                (now - _HOT_WINDOW_SECONDS,),
+            )
+            for name, _, bucket_seconds, backfill_days, _ in _GRANULARITIES:
+                cutoff = int((now - backfill_days * 86400) // bucket_seconds) * bucket_seconds
+                conn.execute(
+                    "DELETE FROM rollups WHERE granularity = ? AND bucket_start < ?",
+                    (name, cutoff),
+                )
+                conn.execute(
+                    "UPDATE rollup_coverage SET covered_from = MAX(covered_from, ?) "
+                    "WHERE granularity = ?",
+                    (cutoff, name),
+                )
+            for entity, prop in conn.execute(
+                "SELECT DISTINCT entity, property FROM rollup_coverage"
+            ).fetchall():
+                if (entity, prop) not in hot_set:
+                    conn.execute(
+                        "DELETE FROM rollups WHERE entity = ? AND property = ?",
+                        (entity, prop),
+                    )
+                    conn.execute(
+                        "DELETE FROM rollup_coverage WHERE entity = ? AND property = ?",
+                        (entity, prop),
+                    )
+            conn.commit()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def summarize(self, entity: str, prop: str, start: float) -> Optional[Dict[str, Any]]:
+        """
+        Combine the rollup buckets from `start` up to the last complete bucket.
+
+        Uses the finest granularity whose coverage reaches back to `start`;
+        the window is widened to the start of the bucket containing it.
+
+        Args:
+            entity: Device name
+            prop: Property (InfluxDB field) name
+            start: Window start, epoch seconds
+
+        Returns:
+            Dict with min/max/mean/count, the earliest bucket's mean ("first"),
+            the granularity used, and "covered_through" (epoch seconds, where
+            the caller's raw tail query should begin) — or None when the
+            rollups don't cover the window or hold no samples for it
+        """
+        try:
+            with self._lock:
+                conn = self._connection()
+                for name, _, bucket_seconds, _, _ in _GRANULARITIES:
+                    coverage = conn.execute(
+                        "SELECT covered_from, covered_through FROM rollup_coverage "
+                        "WHERE entity = ? AND property = ? AND granularity = ?",
+                        (entity, prop, name),
+                    ).fetchone()
+                    if coverage is None or coverage[0] > start or coverage[1] <= start:
+                        continue
+                    bucket_floor = int(start // bucket_seconds) * bucket_seconds
+                    row = conn.execute(
+                        "SELECT MIN(min), MAX(max), SUM(mean * count), SUM(count), COUNT(*) "
+                        "FROM rollups WHERE entity = ? AND property = ? AND granularity = ? "
+                        "AND bucket_start >= ? AND bucket_start < ?",
+                        (entity, prop, name, bucket_floor, coverage[1]),
+                    ).fetchone()
+                    if not row or not row[3]:
+                        return None
+                    first = conn.execute(
+                        "SELECT mean FROM rollups WHERE entity = ? AND property = ? "
+                        "AND granularity = ? AND bucket_start >= ? "
+                        "ORDER BY bucket_start ASC LIMIT 1",
+                        (entity, prop, name, bucket_floor),
+                    ).fetchone()
+                    return {
+                        "min": row[0],
+                        "max": row[1],
+                        "mean": row[2] / row[3],
+                        "count": row[3],
+                        "buckets": row[4],
+                        "first": first[0] if first else None,
+                        "granularity": name,
+                        "covered_through": coverage[1],
+                    }
+        except sqlite3.Error as e:
+            self.logger.debug(f"History rollups: summary for {entity}.{prop} failed: {e}")
+        return None
@@ -3,7 +3,9 @@ Event-log investigation tools: historical search over the daily Events.txt
 files and cause correlation ("what made this device change?").
 """
 
+from .activity_index import ActivityIndex
 from .event_log_reader import EventLogReader, LogEntry
+from .log_index import EventLogIndex
 from .log_search_handler import LogSearchHandler
 
-__all__ = ["EventLogReader", "LogEntry", "LogSearchHandler"]
+__all__ = ["ActivityIndex", "EventLogIndex", "EventLogReader", "LogEntry", "LogSearchHandler"]
@@ -0,0 +1,130 @@
+"""
+Per-day index of automation activity in the event log.
+
+Cause correlation asks the same question for every target event: which
+triggers, schedules and action groups fired within a few seconds of it?
+Rather than re-reading the day-file for each window, every day's automation
+lines are extracted once into timestamp-sorted arrays and answered by
+bisect. A day is rebuilt only when its file changes (today's log, as it
+grows); the parsed lines come from the reader's day cache.
+"""
+
+import bisect
+import datetime
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from .event_log_reader import EventLogReader, LogEntry
+
+# Event-log types that record an automation firing, and the container kind
+# each one names.
+AUTOMATION_KINDS = {
+    "trigger": "trigger",
+    "schedule": "schedule",
+    "action group": "action_group",
+}
+
+# Day-files kept indexed (least recently queried are dropped first).
+DEFAULT_MAX_DAYS = 31
+
+
+@dataclass
+class DayActivity:
+    """Automation firings of one day-file, sorted by timestamp."""
+
+    size: int
+    mtime: float
+    timestamps: List[datetime.datetime] = field(default_factory=list)
+    entries: List[LogEntry] = field(default_factory=list)
+
+    def between(self, start: datetime.datetime, end: datetime.datetime) -> List[LogEntry]:
+        """Firings with start <= timestamp <= end, chronological."""
+        low = bisect.bisect_left(self.timestamps, start)
+        high = bisect.bisect_right(self.timestamps, end)
+        return self.entries[low:high]
+
+
+def build_day_activity(entries: Sequence[LogEntry], size: int, mtime: float) -> DayActivity:
+    """Extract and sort the automation firings from a day's entries."""
+    firings = [
+        entry
+        for entry in entries
+        if (entry.type or "").lower() in AUTOMATION_KINDS and entry.timestamp is not None
+    ]
+    # Stable, so equal timestamps keep file order.
+    firings.sort(key=lambda entry: entry.timestamp)
+    return DayActivity(
+        size=size,
+        mtime=mtime,
+        timestamps=[entry.timestamp for entry in firings],
+        entries=firings,
+    )
+
+
+class ActivityIndex:
+    """Lazily built DayActivity per day-file, shared by every investigation."""
+
+    def __init__(self, reader: EventLogReader, max_days: int = DEFAULT_MAX_DAYS):
+        self.reader = reader
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        # path -> DayActivity, least recently used first
+        self._days: "OrderedDict[str, DayActivity]" = OrderedDict()
+
+    def firings_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> List[LogEntry]:
+        """Automation firings in [start, end] across day-files, chronological."""
+        return self.firings_for_windows([(start, end)])[0]
+
+    def firings_for_windows(
+        self, windows: Sequence[Tuple[datetime.datetime, datetime.datetime]]
+    ) -> List[List[LogEntry]]:
+        """
+        firings_between for many windows at once; each day-file involved is
+        checked (and if needed indexed) once, however many windows touch it.
+        """
+        results: List[List[LogEntry]] = [[] for _ in windows]
+        if not windows:
+            return results
+        first_day = min(start for start, _ in windows).date()
+        last_day = max(end for _, end in windows).date()
+        for file_date, path in self.reader.list_log_files():
+            if not first_day <= file_date <= last_day:
+                continue
+            day = None
+            for position, (start, end) in enumerate(windows):
+                if not start.date() <= file_date <= end.date():
+                    continue
+                if day is None:
+                    day = self._day(path)
+                    if day is None:
+                        break
+                results[position].extend(day.between(start, end))
+        for (start, end), firings in zip(windows, results):
+            if start.date() != end.date():
+                firings.sort(key=lambda entry: entry.timestamp)
+        return results
+
+    def _day(self, path: str) -> Optional[DayActivity]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            day = self._days.get(path)
+            if day is not None and (day.size, day.mtime) == (stat.st_size, stat.st_mtime):
+                self._days.move_to_end(path)
+                return day
+        # Stat before reading: if the file moves on meanwhile, the next
+        # query sees a different stat and rebuilds.
+        day = build_day_activity(self.reader.read_day(path), stat.st_size, stat.st_mtime)
+        with self._lock:
+            self._days[path] = day
+            self._days.move_to_end(path)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        return day
@@ -7,28 +7,24 @@ Scoring combines structural evidence from the reverse-reference index
 (does this automation actually act on the device, directly or through
 action-group chains?) with temporal proximity. Results always carry the
 evidence; the tool reports likelihood, never certainty.
+
+Automation firings around a target come from a per-day ActivityIndex, so
+repeated investigations on the same day don't re-read the day-file.
 """
 
 import datetime
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from .activity_index import AUTOMATION_KINDS, ActivityIndex
 from .event_log_reader import EventLogReader, LogEntry
 
-AUTOMATION_LOG_TYPES = ["Trigger", "Schedule", "Action Group"]
-
 STRUCTURAL_SCORE = 3.0
 CHAIN_DECAY = 0.8
 HEURISTIC_SCORE = 1.0
 
 QUOTED_NAME_RE = re.compile(r'"([^"]+)"')
 
-_LOG_TYPE_TO_KIND = {
-    "trigger": "trigger",
-    "schedule": "schedule",
-    "action group": "action_group",
-}
-
 
 def extract_element_name(entry: LogEntry) -> str:
     """
@@ -42,13 +38,36 @@ def extract_element_name(entry: LogEntry) -> str:
     return entry.message.strip()
 
 
+def _search_limit(target: Dict[str, Any]) -> int:
+    """How many recent matches to consider when locating a target."""
+    return max(target.get("occurrence") or 1, 50)
+
+
+def _pick_target(
+    entries: List[LogEntry],
+    around_time: Optional[datetime.datetime],
+    occurrence: int,
+) -> Optional[LogEntry]:
+    """The matching line nearest `around_time`, else the Nth most recent."""
+    entries = [entry for entry in entries if entry.timestamp is not None]
+    if not entries:
+        return None
+    if around_time is not None:
+        return min(entries, key=lambda e: abs((e.timestamp - around_time).total_seconds()))
+    index = min(occurrence, len(entries)) - 1
+    return entries[index]
+
+
 class CauseCorrelator:
-    """Builds the ranked candidate-cause list for one target event."""
+    """Builds the ranked candidate-cause list for target events."""
 
     def __init__(self, reader: EventLogReader, structure_store, data_provider):
         self.reader = reader
         self.structure_store = structure_store
         self.data_provider = data_provider
+        self.activity = ActivityIndex(reader)
+        # kind -> (structures dict it was built from, name -> id or None if ambiguous)
+        self._name_ids: Dict[str, Tuple[Dict[int, dict], Dict[str, Optional[int]]]] = {}
 
     # ------------------------------------------------------------------
 
@@ -61,27 +80,112 @@ class CauseCorrelator:
         lookback_seconds: int = 60,
         lookahead_seconds: int = 5,
     ) -> Dict[str, Any]:
-        device = None
-        if device_id is not None:
-            device = self._describe_device(device_id)
-            if device is None:
-                return {"error": f"Device {device_id} not found"}
-            needle = f'"{device["name"]}"'
-        elif search_text:
-            needle = search_text
-        else:
-            return {"error": "Provide device_id or search_text"}
-
-        target = self._locate_target(needle, around_time, occurrence)
-        if target is None:
-            return {
-                "error": "No matching log line found",
-                "searched_for": needle,
-                "hint": "The change may predate the retained log files, or the "
-                "device may log under a different name.",
-            }
+        target = {
+            "device_id": device_id,
+            "search_text": search_text,
+            "around_time": around_time,
+            "occurrence": occurrence,
+        }
+        return self.investigate_many([target], lookback_seconds, lookahead_seconds)[0]
+
+    def investigate_many(
+        self,
+        targets: List[Dict[str, Any]],
+        lookback_seconds: int = 60,
+        lookahead_seconds: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        investigate() for several targets, sharing the work between them.
+
+        One pass over the log files locates every target, one pass over the
+        activity index collects every window, and each device's references
+        are looked up once.
+
+        Args:
+            targets: Dicts with device_id or search_text, plus optional
+                around_time (datetime) and occurrence
+            lookback_seconds: Window before each target event
+            lookahead_seconds: Window after each target event
+
+        Returns:
+            One investigate() result per target, in order; a target that
+            can't be located gets its own error dict
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(targets)
+        devices: Dict[int, Optional[Dict[str, Any]]] = {}
+        wanted: List[Tuple[int, str, Optional[Dict[str, Any]]]] = []
+        for position, target in enumerate(targets):
+            device_id = target.get("device_id")
+            device = None
+            if device_id is not None:
+                if device_id not in devices:
+                    devices[device_id] = self._describe_device(device_id)
+                device = devices[device_id]
+                if device is None:
+                    results[position] = {"error": f"Device {device_id} not found"}
+                    continue
+                needle = f'"{device["name"]}"'
+            elif target.get("search_text"):
+                needle = target["search_text"]
+            else:
+                results[position] = {"error": "Provide device_id or search_text"}
+                continue
+            wanted.append((position, needle, device))
+
+        needles = list(dict.fromkeys(needle for _, needle, _ in wanted))
+        limits = [_search_limit(targets[position]) for position, _, _ in wanted]
+        found = dict(zip(needles, self.reader.search_many(needles, limit=max(limits, default=0))))
+
+        located: List[Tuple[int, LogEntry, Optional[Dict[str, Any]]]] = []
+        for (position, needle, device), limit in zip(wanted, limits):
+            target = targets[position]
+            entry = _pick_target(
+                found[needle][:limit], target.get("around_time"), target.get("occurrence") or 1
+            )
+            if entry is None:
+                results[position] = {
+                    "error": "No matching log line found",
+                    "searched_for": needle,
+                    "hint": "The change may predate the retained log files, or the "
+                    "device may log under a different name.",
+                }
+                continue
+            located.append((position, entry, device))
+
+        windows = [
+            (
+                entry.timestamp - datetime.timedelta(seconds=lookback_seconds),
+                entry.timestamp + datetime.timedelta(seconds=lookahead_seconds),
+            )
+            for _, entry, _ in located
+        ]
+        references: Dict[int, List[Dict[str, Any]]] = {}
+        for (position, entry, device), firings in zip(
+            located, self.activity.firings_for_windows(windows)
+        ):
+            # The target line itself is never a candidate.
+            candidates = [e for e in firings if e.message != entry.message]
+            device_refs: List[Dict[str, Any]] = []
+            if device is not None:
+                if device["id"] not in references:
+                    references[device["id"]] = self.structure_store.find_references(
+                        "device", device["id"]
+                    )
+                device_refs = references[device["id"]]
+            results[position] = self._result(
+                entry, device, candidates, device_refs, lookback_seconds, lookahead_seconds
+            )
+        return results
 
-        candidates = self._collect_candidates(target, lookback_seconds, lookahead_seconds)
+    def _result(
+        self,
+        target: LogEntry,
+        device: Optional[Dict[str, Any]],
+        candidates: List[LogEntry],
+        references: List[Dict[str, Any]],
+        lookback_seconds: int,
+        lookahead_seconds: int,
+    ) -> Dict[str, Any]:
         notes: List[str] = []
         if not candidates:
             notes.append(
@@ -100,7 +204,7 @@ class CauseCorrelator:
                 "lookback_seconds": lookback_seconds,
                 "lookahead_seconds": lookahead_seconds,
             },
-            "candidates": self._rank(candidates, target, device_id, lookback_seconds),
+            "candidates": self._rank(candidates, target, references, lookback_seconds),
             "notes": notes,
         }
         if device is not None:
@@ -123,59 +227,15 @@ class CauseCorrelator:
             return None
         return {"id": device_id, "name": name}
 
-    def _locate_target(
-        self,
-        needle: str,
-        around_time: Optional[datetime.datetime],
-        occurrence: int,
-    ) -> Optional[LogEntry]:
-        found = self.reader.search(query=needle, limit=max(occurrence, 50))
-        if found.get("error") or not found.get("entries"):
-            return None
-
-        # Re-materialize LogEntry objects (search returns dicts, newest first)
-        entries = [
-            LogEntry(
-                timestamp=datetime.datetime.fromisoformat(e["timestamp"])
-                if e["timestamp"]
-                else None,
-                type=e["type"],
-                message=e["message"],
-            )
-            for e in found["entries"]
-            if e["timestamp"] is not None
-        ]
-        if not entries:
-            return None
-
-        if around_time is not None:
-            return min(entries, key=lambda e: abs((e.timestamp - around_time).total_seconds()))
-        index = min(occurrence, len(entries)) - 1
-        return entries[index]
-
-    def _collect_candidates(
-        self, target: LogEntry, lookback_seconds: int, lookahead_seconds: int
-    ) -> List[LogEntry]:
-        if target.timestamp is None:
-            return []
-        entries = self.reader.entries_around(
-            target.timestamp, lookback_seconds, lookahead_seconds, types=AUTOMATION_LOG_TYPES
-        )
-        # The target line itself is never a candidate.
-        return [e for e in entries if e is not target and e.message != target.message]
-
     # ------------------------------------------------------------------
 
     def _rank(
         self,
         candidates: List[LogEntry],
         target: LogEntry,
-        device_id: Optional[int],
+        references: List[Dict[str, Any]],
         lookback_seconds: int,
     ) -> List[Dict[str, Any]]:
-        references = (
-            self.structure_store.find_references("device", device_id) if device_id else []
-        )
         refs_by_container: Dict[Any, List[Dict[str, Any]]] = {}
         for ref in references:
             refs_by_container.setdefault((ref["entity_type"], ref["id"]), []).append(ref)
@@ -183,7 +243,7 @@ class CauseCorrelator:
         ranked = []
         seen_keys = set()
         for entry in candidates:
-            kind = _LOG_TYPE_TO_KIND.get((entry.type or "").lower())
+            kind = AUTOMATION_KINDS.get((entry.type or "").lower())
             if kind is None:
                 continue
             name = extract_element_name(entry)
@@ -253,12 +313,15 @@ class CauseCorrelator:
         return ranked
 
     def _resolve_name(self, kind: str, name: str) -> Optional[int]:
+        """The id of the one `kind` named `name` (None if none or several)."""
         structures = self.structure_store.get_all_structures(kind)
-        matches = [
-            elem_id
-            for elem_id, struct in structures.items()
-            if struct.get("Name") == name
-        ]
-        if len(matches) == 1:
-            return matches[0]
-        return None
+        cached = self._name_ids.get(kind)
+        if cached is None or cached[0] is not structures:
+            # Each structure-store snapshot brings new dicts; rebuild per snapshot.
+            ids: Dict[str, Optional[int]] = {}
+            for elem_id, struct in structures.items():
+                elem_name = struct.get("Name")
+                ids[elem_name] = None if elem_name in ids else elem_id
+            cached = (structures, ids)
+            self._name_ids[kind] = cached
+        return cached[1].get(name)
@@ -0,0 +1,120 @@
+"""
+Line-offset index over one daily Events.txt file.
+
+Records the byte offset of the first entry line of every minute, plus the
+set of entry types that occur in the file. With it a time-bounded read can
+seek straight to its window instead of parsing the day from the top, and a
+type-filtered search can skip files that never log the requested types.
+
+Indexes are built with a bytes-level pass (no datetime parsing) and kept in
+memory, valid while the file's (size, mtime) is unchanged. A file that only
+grew — today's log — is extended from where the last build stopped rather
+than rebuilt. Indigo's Logs folder is never written to.
+"""
+
+import bisect
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+TIMESTAMP_BYTES_RE = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+# Length of the "YYYY-MM-DD HH:MM" prefix used as the checkpoint key. Keys
+# are fixed-width, so they compare correctly as plain strings.
+MINUTE_KEY_LENGTH = 16
+
+
+def minute_key(moment) -> str:
+    """Checkpoint key for a datetime."""
+    return moment.strftime("%Y-%m-%d %H:%M")
+
+
+@dataclass
+class DayIndex:
+    """Minute checkpoints and type vocabulary for one day-file."""
+
+    size: int = 0
+    mtime: float = 0.0
+    # Sorted minute keys and the byte offset where each minute's first entry starts
+    minutes: List[str] = field(default_factory=list)
+    offsets: List[int] = field(default_factory=list)
+    # Lower-cased entry types seen in the file
+    types: Set[str] = field(default_factory=set)
+    # Byte offset just past the last complete line indexed
+    indexed_through: int = 0
+    # False once a line's minute goes backwards (e.g. a clock change);
+    # such a file can't be seeked into and is read in full
+    monotonic: bool = True
+
+    @property
+    def complete(self) -> bool:
+        """Whether every byte of the file (as last stat'ed) was indexed."""
+        return self.indexed_through == self.size
+
+    def offset_for(self, start_minute: str) -> int:
+        """Byte offset of the first entry at or after `start_minute`."""
+        position = bisect.bisect_left(self.minutes, start_minute)
+        if position >= len(self.offsets):
+            return self.indexed_through
+        return self.offsets[position]
+
+    def extend(self, handle, until: int) -> None:
+        """Index complete lines from `indexed_through` up to byte `until`."""
+        handle.seek(self.indexed_through)
+        position = self.indexed_through
+        last_minute = self.minutes[-1] if self.minutes else ""
+        for line in handle:
+            if not line.endswith(b"\n") or position + len(line) > until:
+                break  # partial line still being written
+            if TIMESTAMP_BYTES_RE.match(line):
+                minute = line[:MINUTE_KEY_LENGTH].decode("ascii")
+                if minute > last_minute:
+                    self.minutes.append(minute)
+                    self.offsets.append(position)
+                    last_minute = minute
+                elif minute < last_minute:
+                    self.monotonic = False
+                parts = line.split(b"\t", 2)
+                if len(parts) == 3:
+                    self.types.add(parts[1].strip().decode("utf-8", errors="replace").lower())
+            position += len(line)
+        self.indexed_through = position
+
+
+def load_day_index(path: str, previous: Optional[DayIndex] = None) -> DayIndex:
+    """
+    Index `path`, reusing `previous` when the file is unchanged or only grew.
+
+    Raises:
+        OSError: the file can't be stat'ed or read
+    """
+    stat = os.stat(path)
+    if previous is not None and (previous.size, previous.mtime) == (stat.st_size, stat.st_mtime):
+        return previous
+
+    if previous is not None and stat.st_size >= previous.size and _still_prefix(path, previous):
+        index = DayIndex(
+            minutes=list(previous.minutes),
+            offsets=list(previous.offsets),
+            types=set(previous.types),
+            indexed_through=previous.indexed_through,
+            monotonic=previous.monotonic,
+        )
+    else:
+        index = DayIndex()
+    index.size = stat.st_size
+    index.mtime = stat.st_mtime
+
+    with open(path, "rb") as handle:
+        index.extend(handle, stat.st_size)
+    return index
+
+
+def _still_prefix(path: str, previous: DayIndex) -> bool:
+    """Cheap check that the file grew by appending rather than being replaced."""
+    if previous.indexed_through == 0:
+        return True
+    with open(path, "rb") as handle:
+        handle.seek(previous.indexed_through - 1)
+        return handle.read(1) == b"\n"
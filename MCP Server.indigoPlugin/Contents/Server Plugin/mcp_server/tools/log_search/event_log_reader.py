@@ -7,15 +7,33 @@ Indigo writes one file per day under its Logs folder, named
     2026-07-02 16:30:00.415\tAction Group\tTurn off all outdoor hue lights
 
 Continuation lines (multi-line messages, e.g. script tracebacks) do not
-start with a timestamp and are appended to the preceding entry.
+start with a timestamp and are appended to the preceding entry. A line's
+timestamp is only decoded when something reads it, so a text or type scan
+pays for the entries it returns rather than for every line. Plain-text
+searches of files not in the cache go further: the file is memory-mapped
+and searched as bytes, and only the entries around a hit are decoded.
+
+Parsed day-files are cached. A file that grew since it was cached (today's
+log, usually) is brought up to date by parsing only the appended bytes, and
+the least recently used files are evicted once the cache's estimated size
+passes its memory budget.
 """
 
 import datetime
+import functools
+import io
 import logging
+import mmap
+import multiprocessing
 import os
 import re
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .day_index import MINUTE_KEY_LENGTH, DayIndex, load_day_index, minute_key
 
 LOG_FILE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}) Events\.txt$")
 TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
@@ -25,15 +43,50 @@ TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
 MAX_FILES_PER_QUERY = 14
 MAX_LINES_SCANNED = 200_000
 
+# Default memory budget for parsed day-files kept between queries.
+DEFAULT_CACHE_BUDGET_BYTES = 64 * 1024 * 1024
+
+# With parallel_workers >= 2, a search runs across a process pool once it has
+# to read at least this many uncached day-files, or this many bytes of them.
+# Off by default: the pool spawns fresh interpreters, which the plugin only
+# does when the user opts in.
+PARALLEL_MIN_FILES = 8
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+DEFAULT_PARALLEL_WORKERS = 0
+
+# Rough per-entry overhead (objects, datetime, list slot) for the budget.
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+# Stands in for a timestamp that hasn't been decoded from the raw line yet.
+_UNPARSED: Any = object()
+
 
-@dataclass
 class LogEntry:
     """One event-log line (plus any continuation lines)."""
 
-    timestamp: Optional[datetime.datetime]
-    type: Optional[str]
-    message: str
-    raw: str = field(repr=False, default="")
+    __slots__ = ("_timestamp", "type", "message", "raw")
+
+    def __init__(
+        self,
+        timestamp: Optional[datetime.datetime],
+        type: Optional[str],
+        message: str,
+        raw: str = "",
+    ):
+        self._timestamp = timestamp
+        self.type = type
+        self.message = message
+        self.raw = raw
+
+    @property
+    def timestamp(self) -> Optional[datetime.datetime]:
+        if self._timestamp is _UNPARSED:
+            self._timestamp = _parse_timestamp(self.raw.split("\t", 1)[0].strip())
+        return self._timestamp
+
+    def copy(self) -> "LogEntry":
+        return LogEntry(self._timestamp, self.type, self.message, self.raw)
 
     def as_dict(self) -> Dict[str, Any]:
         return {
@@ -42,8 +95,38 @@ class LogEntry:
             "message": self.message,
         }
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LogEntry):
+            return NotImplemented
+        return (self.timestamp, self.type, self.message, self.raw) == (
+            other.timestamp, other.type, other.message, other.raw
+        )
+
+    def __repr__(self) -> str:
+        return f"LogEntry(timestamp={self.timestamp!r}, type={self.type!r}, message={self.message!r})"
+
+
+@dataclass
+class _CachedDay:
+    """Parsed entries of one day-file's complete lines."""
+
+    size: int
+    mtime: float
+    # Bytes parsed: through the last complete line. A half-written last
+    # line is parsed on each read but never cached.
+    consumed: int
+    entries: List[LogEntry]
+    cost: int
+
 
 def _parse_timestamp(text: str) -> Optional[datetime.datetime]:
+    # Indigo writes fixed-width "YYYY-MM-DD HH:MM:SS.fff", which fromisoformat
+    # decodes in C several times faster than strptime. Other shapes fall back.
+    if (len(text) == 23 and text[19] == ".") or len(text) == 19:
+        try:
+            return datetime.datetime.fromisoformat(text)
+        except ValueError:
+            pass
     for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
         try:
             return datetime.datetime.strptime(text, fmt)
@@ -57,12 +140,11 @@ def parse_log_line(line: str) -> Optional[LogEntry]:
     if not TIMESTAMP_RE.match(line):
         return None
     parts = line.rstrip("\n").split("\t", 2)
-    timestamp = _parse_timestamp(parts[0].strip())
     if len(parts) == 3:
-        return LogEntry(timestamp=timestamp, type=parts[1].strip(), message=parts[2], raw=line)
+        return LogEntry(timestamp=_UNPARSED, type=parts[1].strip(), message=parts[2], raw=line)
     if len(parts) == 2:
-        return LogEntry(timestamp=timestamp, type=None, message=parts[1], raw=line)
-    return LogEntry(timestamp=timestamp, type=None, message=line.rstrip("\n"), raw=line)
+        return LogEntry(timestamp=_UNPARSED, type=None, message=parts[1], raw=line)
+    return LogEntry(timestamp=_UNPARSED, type=None, message=line.rstrip("\n"), raw=line)
 
 
 class EventLogReader:
@@ -72,9 +154,31 @@ class EventLogReader:
         self,
         logs_folder_supplier: Callable[[], Optional[str]],
         logger: Optional[logging.Logger] = None,
+        cache_budget_bytes: int = DEFAULT_CACHE_BUDGET_BYTES,
+        parallel_workers: int = DEFAULT_PARALLEL_WORKERS,
     ):
+        """
+        Args:
+            logs_folder_supplier: Returns Indigo's Logs folder path (None
+                when unavailable).
+            logger: Optional logger instance.
+            cache_budget_bytes: Approximate memory allowed for parsed
+                day-files kept between queries; 0 disables the cache.
+            parallel_workers: Worker processes for large searches; fewer
+                than 2 keeps every search in-process.
+        """
         self._logs_folder_supplier = logs_folder_supplier
         self.logger = logger or logging.getLogger("Plugin")
+        # path -> offset index, revalidated against the file on every use
+        self._day_indexes: Dict[str, DayIndex] = {}
+        self._cache_budget_bytes = cache_budget_bytes
+        # path -> parsed entries, least recently used first
+        self._day_cache: "OrderedDict[str, _CachedDay]" = OrderedDict()
+        self._cache_cost = 0
+        self._cache_lock = threading.Lock()
+        self._parallel_workers = parallel_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
     # ------------------------------------------------------------------
 
@@ -102,24 +206,154 @@ class EventLogReader:
         return files
 
     def read_day(self, path: str) -> List[LogEntry]:
-        """All entries of one day-file, in file (chronological) order."""
-        entries: List[LogEntry] = []
+        """
+        All entries of one day-file, in file (chronological) order.
+
+        Served from the cache when the file is unchanged; a file that grew is
+        caught up by parsing just the new bytes. Entries are shared with the
+        cache, so callers must not modify them.
+        """
         try:
-            with open(path, "r", encoding="utf-8", errors="replace") as handle:
-                for line in handle:
-                    entry = parse_log_line(line)
-                    if entry is not None:
-                        entries.append(entry)
-                    elif entries:
-                        entries[-1].message += "\n" + line.rstrip("\n")
-                    elif line.strip():
-                        entries.append(
-                            LogEntry(timestamp=None, type=None, message=line.rstrip("\n"), raw=line)
-                        )
+            stat = os.stat(path)
+            with self._cache_lock:
+                cached = self._day_cache.get(path)
+            if cached is not None and (cached.size, cached.mtime) == (stat.st_size, stat.st_mtime):
+                if cached.consumed == cached.size:
+                    self._touch(path)
+                    return list(cached.entries)
+            updated, entries = self._read_tail(path, cached, stat)
         except OSError as e:
             self.logger.debug(f"Could not read log file {path}: {e}")
+            return []
+
+        self._store(path, updated)
         return entries
 
+    def _read_tail(
+        self, path: str, cached: Optional[_CachedDay], stat: os.stat_result
+    ) -> Tuple[_CachedDay, List[LogEntry]]:
+        """
+        Parse what `cached` hasn't seen yet (the whole file when it is stale).
+
+        Returns the updated cache record, which covers complete lines only,
+        and the day's full entry list, which also includes a trailing
+        half-written line if there is one.
+        """
+        with open(path, "rb") as handle:
+            start = 0
+            if cached is not None and 0 < cached.consumed <= stat.st_size:
+                # Only reuse the cache if the file grew by appending.
+                handle.seek(cached.consumed - 1)
+                if handle.read(1) == b"\n":
+                    start = cached.consumed
+            handle.seek(start)
+            data = handle.read(stat.st_size - start)
+
+        cut = data.rfind(b"\n") + 1
+        entries = list(cached.entries) if start else []
+        cost = cached.cost if start else 0
+        before = len(entries)
+        _collect_entries(_decode_lines(data[:cut]), entries=entries)
+        cost += _entries_cost(entries[before:])
+
+        record = _CachedDay(
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            consumed=start + cut,
+            entries=entries,
+            cost=cost,
+        )
+        if cut == len(data):
+            return record, list(entries)
+        with_partial = list(entries)
+        _collect_entries(_decode_lines(data[cut:]), entries=with_partial)
+        return record, with_partial
+
+    def _touch(self, path: str) -> None:
+        with self._cache_lock:
+            if path in self._day_cache:
+                self._day_cache.move_to_end(path)
+
+    def _store(self, path: str, record: _CachedDay) -> None:
+        """Cache `record`, evicting least recently used files over budget."""
+        with self._cache_lock:
+            previous = self._day_cache.pop(path, None)
+            if previous is not None:
+                self._cache_cost -= previous.cost
+            if record.cost > self._cache_budget_bytes:
+                return
+            self._day_cache[path] = record
+            self._cache_cost += record.cost
+            while self._cache_cost > self._cache_budget_bytes:
+                _, evicted = self._day_cache.popitem(last=False)
+                self._cache_cost -= evicted.cost
+
+    def read_range(
+        self,
+        path: str,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+    ) -> List[LogEntry]:
+        """
+        Entries of one day-file from the minute of `start_time` through the
+        minute of `end_time`, read by seeking to the first of them via the
+        file's offset index. Callers still filter to exact timestamps.
+
+        A day already in the cache is sliced from it instead.
+        """
+        with self._cache_lock:
+            cached = path in self._day_cache
+        if cached:
+            entries = self.read_day(path)
+            lower = start_time.replace(second=0, microsecond=0) if start_time else None
+            upper = (
+                end_time.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+                if end_time
+                else None
+            )
+            return [
+                entry
+                for entry in entries
+                if entry.timestamp is None
+                or ((lower is None or entry.timestamp >= lower)
+                    and (upper is None or entry.timestamp < upper))
+            ]
+
+        index = self.day_index(path)
+        if index is None or not index.monotonic:
+            return self.read_day(path)
+
+        offset = index.offset_for(minute_key(start_time)) if start_time else 0
+        until_minute = minute_key(end_time) if end_time else None
+        try:
+            with open(path, "rb") as raw:
+                raw.seek(offset)
+                handle = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+                return _collect_entries(handle, until_minute)
+        except OSError as e:
+            self.logger.debug(f"Could not read log file {path}: {e}")
+            return []
+
+    def day_index(self, path: str) -> Optional[DayIndex]:
+        """The offset index for `path`, built or extended as needed."""
+        try:
+            index = load_day_index(path, self._day_indexes.get(path))
+        except OSError as e:
+            self.logger.debug(f"Could not index log file {path}: {e}")
+            self._day_indexes.pop(path, None)
+            return None
+        self._day_indexes[path] = index
+        return index
+
+    def _may_contain_types(self, path: str, type_set: Optional[set]) -> bool:
+        """False only when the file is fully indexed and logs none of `type_set`."""
+        if type_set is None:
+            return True
+        index = self.day_index(path)
+        if index is None or not index.complete:
+            return True
+        return not index.types.isdisjoint(type_set)
+
     # ------------------------------------------------------------------
 
     def search(
@@ -134,18 +368,14 @@ class EventLogReader:
     ) -> Dict[str, Any]:
         """
         Search entries newest-first. Returns matches plus scan metadata.
+
+        Large scans fan the day-files out over a process pool; results are
+        merged newest-file-first, so they are identical to a sequential scan.
         """
-        matcher = None
-        if query:
-            if regex:
-                try:
-                    pattern = re.compile(query, re.IGNORECASE)
-                except re.error as e:
-                    return {"error": f"Invalid regex: {e}"}
-                matcher = lambda text: bool(pattern.search(text))  # noqa: E731
-            else:
-                needle = query.lower()
-                matcher = lambda text: needle in text.lower()  # noqa: E731
+        try:
+            _build_matcher(query, regex)
+        except re.error as e:
+            return {"error": f"Invalid regex: {e}"}
 
         type_set = {t.lower() for t in types} if types else None
 
@@ -159,37 +389,37 @@ class EventLogReader:
         # Newest files first; within the cap keep the most recent ones.
         files = files[-MAX_FILES_PER_QUERY:][::-1]
 
-        matches: List[LogEntry] = []
+        matches: List[Dict[str, Any]] = []
         lines_scanned = 0
         lines_truncated = False
         wanted = offset + limit
 
-        for _, path in files:
-            day_entries = self.read_day(path)
-            lines_scanned += len(day_entries)
-            for entry in reversed(day_entries):  # newest first within the day
-                if start_time and entry.timestamp and entry.timestamp < start_time:
-                    continue
-                if end_time and entry.timestamp and entry.timestamp > end_time:
-                    continue
-                if type_set is not None and (entry.type or "").lower() not in type_set:
-                    continue
-                if matcher is not None and not (
-                    matcher(entry.message) or (entry.type and matcher(entry.type))
-                ):
-                    continue
-                matches.append(entry)
+        if self._should_parallelize(files):
+            results = self._scan_files_parallel(
+                files, query, regex, type_set, start_time, end_time, wanted
+            )
+        else:
+            results = (
+                self._scan_file_dicts(
+                    file_date, path, query, regex, type_set, start_time, end_time, wanted
+                )
+                for file_date, path in files
+            )
+        try:
+            for day_matches, day_lines in results:
+                lines_scanned += day_lines
+                matches.extend(day_matches[:wanted - len(matches)])
                 if len(matches) >= wanted:
                     break
-            if len(matches) >= wanted:
-                break
-            if lines_scanned >= MAX_LINES_SCANNED:
-                lines_truncated = True
-                break
+                if lines_scanned >= MAX_LINES_SCANNED:
+                    lines_truncated = True
+                    break
+        finally:
+            results.close()
 
         page = matches[offset:offset + limit]
         return {
-            "entries": [entry.as_dict() for entry in page],
+            "entries": page,
             "count": len(page),
             "files_scanned": len(files),
             "truncated": lines_truncated
@@ -197,6 +427,239 @@ class EventLogReader:
             or len(matches) >= wanted,
         }
 
+    def search_many(self, queries: List[str], limit: int = 100) -> List[List[LogEntry]]:
+        """
+        Plain-text search() for several queries in one pass over the files.
+
+        Each day-file is read once and each entry is lower-cased once, then
+        tested against every query that still needs matches. Per query, the
+        result equals search(query=q, limit=limit)'s entries, as LogEntry
+        objects, newest first.
+        """
+        needles = [query.lower() for query in queries]
+        results: List[List[LogEntry]] = [[] for _ in queries]
+        pending = [position for position, needle in enumerate(needles) if needle]
+        if limit <= 0:
+            return results
+
+        files = self.list_log_files()[-MAX_FILES_PER_QUERY:][::-1]
+        lines_scanned = 0
+        for _, path in files:
+            if not pending:
+                break
+            day_entries = self.read_day(path)
+            lines_scanned += len(day_entries)
+            for entry in reversed(day_entries):
+                message = entry.message.lower()
+                entry_type = (entry.type or "").lower()
+                for position in pending:
+                    needle = needles[position]
+                    if needle in message or needle in entry_type:
+                        results[position].append(entry)
+                if any(len(results[position]) >= limit for position in pending):
+                    pending = [p for p in pending if len(results[p]) < limit]
+                    if not pending:
+                        break
+            if lines_scanned >= MAX_LINES_SCANNED:
+                break
+        return results
+
+    def _scan_file(
+        self,
+        file_date: datetime.date,
+        path: str,
+        query: Optional[str],
+        regex: bool,
+        type_set: Optional[set],
+        start_time: Optional[datetime.datetime],
+        end_time: Optional[datetime.datetime],
+        wanted: int,
+    ) -> Tuple[List[LogEntry], int]:
+        """
+        Up to `wanted` matches from one day-file, newest first, and the
+        number of lines read.
+        """
+        if not self._may_contain_types(path, type_set):
+            return [], 0
+        matcher = _build_matcher(query, regex)
+
+        def accept(entry: LogEntry) -> bool:
+            if start_time and entry.timestamp and entry.timestamp < start_time:
+                return False
+            if end_time and entry.timestamp and entry.timestamp > end_time:
+                return False
+            if type_set is not None and (entry.type or "").lower() not in type_set:
+                return False
+            return matcher is None or bool(
+                matcher(entry.message) or (entry.type and matcher(entry.type))
+            )
+
+        start_day = start_time.date() if start_time else None
+        end_day = end_time.date() if end_time else None
+        if file_date in (start_day, end_day):
+            # Only the boundary days are partial; seek to the window.
+            day_entries = self.read_range(
+                path,
+                start_time if file_date == start_day else None,
+                end_time if file_date == end_day else None,
+            )
+            return _take_newest(day_entries, accept, wanted), len(day_entries)
+
+        if not regex and query and not self._is_cached(path):
+            prefilter = _bytes_prefilter(query)
+            if prefilter is not None:
+                found = self._read_candidates(path, prefilter, accept, wanted)
+                if found is not None:
+                    return found
+
+        day_entries = self.read_day(path)
+        return _take_newest(day_entries, accept, wanted), len(day_entries)
+
+    def _is_cached(self, path: str) -> bool:
+        with self._cache_lock:
+            return path in self._day_cache
+
+    def _read_candidates(
+        self,
+        path: str,
+        prefilter: "re.Pattern[bytes]",
+        accept: Callable[[LogEntry], bool],
+        wanted: int,
+    ) -> Optional[Tuple[List[LogEntry], int]]:
+        """
+        Up to `wanted` accepted entries of one day-file, newest first, found
+        without parsing the whole file, plus the file's line count.
+
+        The file is memory-mapped and `prefilter` runs over its raw bytes in
+        C. Only entries with a candidate match (timestamp line plus any
+        continuation lines) are decoded, newest first, until `wanted` pass
+        `accept`. Returns None if the file can't be mapped, so the caller
+        can fall back to a full read.
+        """
+        try:
+            with open(path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return [], 0
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    spans: List[Tuple[int, int]] = []
+                    for match in prefilter.finditer(data):
+                        if spans and match.start() < spans[-1][1]:
+                            continue  # inside an entry we already took
+                        spans.append((_entry_start(data, match.start()), _entry_end(data, match.end())))
+
+                    matches: List[LogEntry] = []
+                    for start, end in reversed(spans):
+                        entries = _collect_entries(_decode_lines(data[start:end]))
+                        matches.extend(_take_newest(entries, accept, wanted - len(matches)))
+                        if len(matches) >= wanted:
+                            break
+                    return matches, _count_lines(data)
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Could not map log file {path}: {e}")
+            return None
+
+    def _scan_file_dicts(self, *args: Any) -> Tuple[List[Dict[str, Any]], int]:
+        """_scan_file with matches as result dicts (picklable, unlike lazy entries)."""
+        matches, lines = self._scan_file(*args)
+        return [entry.as_dict() for entry in matches], lines
+
+    # ------------------------------------------------------------------
+    # Parallel scan
+    # ------------------------------------------------------------------
+
+    def _should_parallelize(self, files: List[Any]) -> bool:
+        """Whether enough uncached data is involved to pay for the pool."""
+        if self._parallel_workers < 2 or len(files) < 2:
+            return False
+        with self._cache_lock:
+            pending = [path for _, path in files if path not in self._day_cache]
+        if len(pending) < 2:
+            return False
+        if len(pending) >= PARALLEL_MIN_FILES:
+            return True
+        pending_bytes = 0
+        for path in pending:
+            try:
+                pending_bytes += os.path.getsize(path)
+            except OSError:
+                continue
+        return pending_bytes >= PARALLEL_MIN_BYTES
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._pool_lock:
+            if self._pool is None and self._parallel_workers >= 2:
+                # spawn, not fork: the plugin process is heavily threaded.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._parallel_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _disable_parallel(self, error: Exception) -> None:
+        self.logger.debug(f"Event log parallel scan unavailable, scanning sequentially: {error}")
+        self._parallel_workers = 0
+        self.close()
+
+    def _scan_files_parallel(
+        self,
+        files: List[Any],
+        query: Optional[str],
+        regex: bool,
+        type_set: Optional[set],
+        start_time: Optional[datetime.datetime],
+        end_time: Optional[datetime.datetime],
+        wanted: int,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Per-file results in `files` order, computed by the process pool.
+
+        Every file is submitted up front and each worker stops at `wanted`
+        matches in its file; the caller consumes results in order and, once
+        it has enough, closing this generator cancels files not yet started.
+        If the pool fails, the remaining files are scanned in-process.
+        """
+        futures: List[Future] = []
+        try:
+            pool = self._process_pool()
+            if pool is not None:
+                futures = [
+                    pool.submit(
+                        _scan_file_in_worker,
+                        file_date, path, query, regex, type_set, start_time, end_time, wanted,
+                    )
+                    for file_date, path in files
+                ]
+        except Exception as e:
+            self._disable_parallel(e)
+            futures = []
+
+        try:
+            for position, (file_date, path) in enumerate(files):
+                if position < len(futures):
+                    try:
+                        result = futures[position].result()
+                    except Exception as e:
+                        for future in futures:
+                            future.cancel()
+                        futures = []
+                        self._disable_parallel(e)
+                    else:
+                        yield result
+                        continue
+                yield self._scan_file_dicts(
+                    file_date, path, query, regex, type_set, start_time, end_time, wanted
+                )
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut down the parallel-scan worker processes, if any were started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def entries_around(
         self,
         center: datetime.datetime,
@@ -215,7 +678,9 @@ class EventLogReader:
         for file_date, path in self.list_log_files():
             if file_date < window_start.date() or file_date > window_end.date():
                 continue
-            for entry in self.read_day(path):
+            if not self._may_contain_types(path, type_set):
+                continue
+            for entry in self.read_range(path, window_start, window_end):
                 if entry.timestamp is None:
                     continue
                 if not (window_start <= entry.timestamp <= window_end):
@@ -225,3 +690,160 @@ class EventLogReader:
                 results.append(entry)
         results.sort(key=lambda entry: entry.timestamp)
         return results
+
+
+def _build_matcher(query: Optional[str], regex: bool) -> Optional[Callable[[str], bool]]:
+    """
+    Text predicate for a search query (None when there is no query).
+
+    Raises:
+        re.error: `regex` is set and the query doesn't compile
+    """
+    if not query:
+        return None
+    if regex:
+        pattern = re.compile(query, re.IGNORECASE)
+        return lambda text: bool(pattern.search(text))
+    needle = query.lower()
+    return lambda text: needle in text.lower()
+
+
+# Non-ASCII characters whose str.lower() contains an ASCII letter; a bytes
+# search for an ASCII needle must accept them too to stay a superset.
+_NON_ASCII_FOLDS = {"i": "\u0130", "k": "\u212a"}
+
+_ENTRY_START_RE = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+
+@functools.lru_cache(maxsize=32)
+def _bytes_prefilter(query: str) -> "Optional[re.Pattern[bytes]]":
+    """
+    Case-insensitive bytes pattern matching every raw line whose decoded text
+    could contain `query` (str.lower() semantics). None for non-ASCII
+    queries, whose case folding a bytes search can't reproduce.
+    """
+    if not query.isascii():
+        return None
+    parts = []
+    for char in query.lower():
+        escaped = re.escape(char.encode("ascii"))
+        extra = _NON_ASCII_FOLDS.get(char)
+        parts.append(
+            b"(?:" + escaped + b"|" + extra.encode("utf-8") + b")" if extra else escaped
+        )
+    return re.compile(b"".join(parts), re.IGNORECASE)
+
+
+def _take_newest(
+    entries: List[LogEntry], accept: Callable[[LogEntry], bool], wanted: int
+) -> List[LogEntry]:
+    """Up to `wanted` accepted entries, newest (last) first."""
+    taken: List[LogEntry] = []
+    for entry in reversed(entries):
+        if len(taken) >= wanted:
+            break
+        if accept(entry):
+            taken.append(entry)
+    return taken
+
+
+def _count_lines(data: "mmap.mmap", chunk_size: int = 1 << 20) -> int:
+    """Line count of a mapped file (mmap has no count(); copy a chunk at a time)."""
+    size = len(data)
+    newlines = sum(
+        data[position:position + chunk_size].count(b"\n")
+        for position in range(0, size, chunk_size)
+    )
+    return newlines + (0 if data[size - 1:size] == b"\n" else 1)
+
+
+def _entry_start(data: "mmap.mmap", position: int) -> int:
+    """Offset of the timestamp line that begins the entry holding `position`."""
+    line_start = data.rfind(b"\n", 0, position) + 1
+    while line_start > 0 and not _ENTRY_START_RE.match(data, line_start):
+        line_start = data.rfind(b"\n", 0, line_start - 1) + 1
+    return line_start
+
+
+def _entry_end(data: "mmap.mmap", position: int) -> int:
+    """Offset just past the last continuation line of the entry holding `position`."""
+    size = len(data)
+    while True:
+        newline = data.find(b"\n", position)
+        if newline < 0:
+            return size
+        position = newline + 1
+        if position >= size or _ENTRY_START_RE.match(data, position):
+            return position
+
+
+# One reader per worker process, so day indexes survive between tasks.
+_worker_reader: Optional[EventLogReader] = None
+
+
+def _scan_file_in_worker(
+    file_date: datetime.date,
+    path: str,
+    query: Optional[str],
+    regex: bool,
+    type_set: Optional[set],
+    start_time: Optional[datetime.datetime],
+    end_time: Optional[datetime.datetime],
+    wanted: int,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Process-pool entry point: EventLogReader._scan_file for one day-file."""
+    global _worker_reader
+    if _worker_reader is None:
+        _worker_reader = EventLogReader(
+            logs_folder_supplier=lambda: None, cache_budget_bytes=0, parallel_workers=0
+        )
+    return _worker_reader._scan_file_dicts(
+        file_date, path, query, regex, type_set, start_time, end_time, wanted
+    )
+
+
+def _collect_entries(
+    lines: Iterable[str],
+    until_minute: Optional[str] = None,
+    entries: Optional[List[LogEntry]] = None,
+) -> List[LogEntry]:
+    """
+    Parse lines into entries, attaching continuation lines to the entry
+    before them. With `until_minute`, stops at the first entry logged after
+    that minute ("YYYY-MM-DD HH:MM").
+
+    Appends to `entries` when given. Its last entry may be shared (cached),
+    so it is copied before a continuation line extends it.
+    """
+    if entries is None:
+        entries = []
+    last_is_shared = bool(entries)
+    for line in lines:
+        entry = parse_log_line(line)
+        if entry is not None:
+            if until_minute is not None and line[:MINUTE_KEY_LENGTH] > until_minute:
+                break
+            entries.append(entry)
+            last_is_shared = False
+        elif entries:
+            if last_is_shared:
+                entries[-1] = entries[-1].copy()
+                last_is_shared = False
+            entries[-1].message += "\n" + line.rstrip("\n")
+        elif line.strip():
+            entries.append(
+                LogEntry(timestamp=None, type=None, message=line.rstrip("\n"), raw=line)
+            )
+    return entries
+
+
+def _decode_lines(data: bytes) -> Iterable[str]:
+    """Lines of `data` exactly as text-mode file iteration would yield them."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace")
+
+
+def _entries_cost(entries: List[LogEntry]) -> int:
+    """Approximate memory held by `entries`, for the cache budget."""
+    return sum(
+        len(entry.message) + len(entry.raw) + _ENTRY_OVERHEAD_BYTES for entry in entries
+    )
@@ -0,0 +1,394 @@
+"""
+Persistent full-text index over the daily event-log files.
+
+A file scan of query_event_log is capped at MAX_FILES_PER_QUERY day-files
+and MAX_LINES_SCANNED lines, so older history is out of reach. This module
+mirrors every retained day-file into a SQLite side file: one row per entry
+plus an FTS5 trigram index over message and type, which answers the same
+case-insensitive substring matches as the scan. A background thread keeps
+it current, indexing only the bytes appended since the last pass. Searches
+never index: day-files that changed since the last pass (today's, usually)
+are scanned directly and merged with what the index already holds.
+
+Text searches shorter than a trigram and regex searches still go through
+the scan. The index file is a cache: deleting it only costs a rebuild.
+"""
+
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .event_log_reader import EventLogReader, LogEntry, _collect_entries, _decode_lines
+
+# FTS5's trigram tokenizer can't match anything shorter.
+MIN_QUERY_LENGTH = 3
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    day TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    consumed INTEGER NOT NULL,
+    last_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    ts TEXT,
+    type TEXT,
+    type_key TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_day ON entries (day, id);
+CREATE INDEX IF NOT EXISTS entries_by_type ON entries (type_key, day, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    message, type, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, message, type) VALUES (new.id, new.message, new.type);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, message, type)
+    VALUES ('delete', old.id, old.message, old.type);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, message, type)
+    VALUES ('delete', old.id, old.message, old.type);
+    INSERT INTO entries_fts (rowid, message, type) VALUES (new.id, new.message, new.type);
+END;
+"""
+
+
+def event_log_index_enabled() -> bool:
+    """Whether the index is switched on in plugin config (checked per use)."""
+    return os.environ.get("EVENT_LOG_INDEX_ENABLED", "true").lower() == "true"
+
+
+def _format_ts(moment: Optional[datetime.datetime]) -> Optional[str]:
+    return moment.strftime(_TIMESTAMP_FORMAT) if moment else None
+
+
+def _match_phrase(query: str) -> str:
+    """An FTS5 phrase; with the trigram tokenizer it matches as a substring."""
+    return '"' + query.replace('"', '""') + '"'
+
+
+class EventLogIndex:
+    """SQLite/FTS5 mirror of the event-log files plus the thread that syncs it."""
+
+    def __init__(
+        self,
+        db_path: str,
+        reader: EventLogReader,
+        logger: Optional[logging.Logger] = None,
+        refresh_interval: int = 60,
+    ):
+        """
+        Args:
+            db_path: Path of the SQLite side file (created on first use)
+            reader: Reader whose logs folder is indexed
+            logger: Optional logger instance
+            refresh_interval: Seconds between background sync passes
+        """
+        self.db_path = db_path
+        self.reader = reader
+        self.logger = logger or logging.getLogger("Plugin")
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        # Serializes sync passes; self._lock is only held per day-file so
+        # searches can run between them.
+        self._sync_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Set once every day-file has been indexed; until then searches
+        # fall back to the file scan rather than return partial history.
+        self._ready = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background sync thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._sync_loop, daemon=True, name="EventLogIndex-Thread"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sync thread and close the side file."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self._thread = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (and migrate) the side file lazily. Caller holds self._lock."""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _sync_loop(self) -> None:
+        while not self._stop_event.is_set():
+            if event_log_index_enabled():
+                try:
+                    self.sync()
+                except Exception as e:
+                    self.logger.debug(f"Event log index: sync failed: {e}")
+            self._stop_event.wait(self.refresh_interval)
+
+    def sync(self) -> int:
+        """
+        Bring the index up to date with the log files on disk.
+
+        Returns:
+            Number of day-files that were (re)indexed
+        """
+        with self._sync_lock:
+            files = self.reader.list_log_files()
+            updated = 0
+            known = self._indexed_files()
+            present = set()
+            for file_date, path in files:
+                if self._stop_event.is_set():
+                    return updated
+                day = file_date.isoformat()
+                present.add(day)
+                try:
+                    stat = os.stat(path)
+                except OSError as e:
+                    self.logger.debug(f"Event log index: could not index {path}: {e}")
+                    continue
+                previous = known.get(day)
+                if previous is not None and previous[:2] == (stat.st_size, stat.st_mtime):
+                    continue
+                with self._lock:
+                    conn = self._connection()
+                    try:
+                        self._index_file(conn, day, path, previous, stat)
+                        conn.commit()
+                        updated += 1
+                    except (OSError, sqlite3.Error) as e:
+                        conn.rollback()
+                        self.logger.debug(f"Event log index: could not index {path}: {e}")
+
+            # Day-files Indigo has since deleted drop out of the index too.
+            with self._lock:
+                conn = self._connection()
+                for day in set(known) - present:
+                    conn.execute("DELETE FROM entries WHERE day = ?", (day,))
+                    conn.execute("DELETE FROM files WHERE day = ?", (day,))
+                conn.commit()
+        self._ready.set()
+        return updated
+
+    def _indexed_files(self) -> Dict[str, Tuple[int, float, int, Optional[int]]]:
+        """day -> (size, mtime, consumed, last_id) of every indexed day-file."""
+        with self._lock:
+            return {
+                row[0]: row[1:]
+                for row in self._connection().execute(
+                    "SELECT day, size, mtime, consumed, last_id FROM files"
+                )
+            }
+
+    def _index_file(
+        self,
+        conn: sqlite3.Connection,
+        day: str,
+        path: str,
+        previous: Optional[Tuple[int, float, int, Optional[int]]],
+        stat: os.stat_result,
+    ) -> None:
+        """Index the complete lines of `path` the index hasn't seen yet."""
+        start = 0
+        last_id = None
+        with open(path, "rb") as handle:
+            if previous is not None and 0 < previous[2] <= stat.st_size:
+                # Only continue where we left off if the file was appended to.
+                handle.seek(previous[2] - 1)
+                if handle.read(1) == b"\n":
+                    start = previous[2]
+                    last_id = previous[3]
+            handle.seek(start)
+            data = handle.read(stat.st_size - start)
+        if start == 0:
+            conn.execute("DELETE FROM entries WHERE day = ?", (day,))
+
+        cut = data.rfind(b"\n") + 1
+        seed: List[LogEntry] = []
+        if last_id is not None:
+            row = conn.execute(
+                "SELECT type, message FROM entries WHERE id = ?", (last_id,)
+            ).fetchone()
+            if row is not None:
+                seed = [LogEntry(timestamp=None, type=row[0], message=row[1])]
+        entries = _collect_entries(_decode_lines(data[:cut]), entries=list(seed))
+
+        if seed:
+            # Continuation lines may have extended the last indexed entry.
+            if entries[0].message != seed[0].message:
+                conn.execute(
+                    "UPDATE entries SET message = ? WHERE id = ?",
+                    (entries[0].message, last_id),
+                )
+            entries = entries[1:]
+
+        conn.executemany(
+            "INSERT INTO entries (day, ts, type, type_key, message) VALUES (?, ?, ?, ?, ?)",
+            [
+                (day, _format_ts(e.timestamp), e.type, (e.type or "").lower(), e.message)
+                for e in entries
+            ],
+        )
+        if entries:
+            last_id = conn.execute(
+                "SELECT MAX(id) FROM entries WHERE day = ?", (day,)
+            ).fetchone()[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO files (day, size, mtime, consumed, last_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (day, stat.st_size, stat.st_mtime, start + cut, last_id),
+        )
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def can_search(self, query: Optional[str], regex: bool) -> bool:
+        """Whether search() would answer this query (else use the file scan)."""
+        if not self.ready or not event_log_index_enabled() or regex:
+            return False
+        return not query or len(query) >= MIN_QUERY_LENGTH
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        types: Optional[List[str]] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Same matching, ordering and result shape as EventLogReader.search
+        (plain-text queries), over every indexed day and without its caps.
+        Day-files the background sync hasn't caught up with are scanned.
+        """
+        start_date = start_time.date() if start_time else datetime.date.min
+        end_date = end_time.date() if end_time else datetime.date.max
+        indexed = self._indexed_files()
+        on_disk = set()
+        stale: List[Tuple[datetime.date, str]] = []
+        for file_date, path in self.reader.list_log_files():
+            day = file_date.isoformat()
+            on_disk.add(day)
+            if not start_date <= file_date <= end_date:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            previous = indexed.get(day)
+            if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                stale.append((file_date, path))
+        stale_days = {file_date.isoformat() for file_date, _ in stale}
+        # Days that changed are scanned below; days deleted since the last
+        # sync are gone from the scan too.
+        skipped = sorted(stale_days | (set(indexed) - on_disk))
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        needle = query.lower() if query else None
+        if skipped:
+            clauses.append(f"day NOT IN ({', '.join('?' * len(skipped))})")
+            params.extend(skipped)
+        if query:
+            clauses.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append(_match_phrase(query))
+        if types:
+            keys = sorted({t.lower() for t in types})
+            clauses.append(f"type_key IN ({', '.join('?' * len(keys))})")
+            params.extend(keys)
+        if start_time:
+            clauses.append("day >= ? AND (ts IS NULL OR ts >= ?)")
+            params.extend([start_time.date().isoformat(), _format_ts(start_time)])
+        if end_time:
+            clauses.append("day <= ? AND (ts IS NULL OR ts <= ?)")
+            params.extend([end_time.date().isoformat(), _format_ts(end_time)])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        wanted = offset + limit
+        # (day, match) pairs, newest day first
+        matches: List[Tuple[str, Dict[str, Any]]] = []
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                f"SELECT day, ts, type, message FROM entries {where} ORDER BY day DESC, id DESC",
+                params,
+            )
+            for day, ts, entry_type, message in cursor:
+                # Trigram case folding isn't str.lower(); re-check with the
+                # scan's own test so both paths agree on edge cases.
+                if needle is not None and not (
+                    needle in message.lower() or (entry_type and needle in entry_type.lower())
+                ):
+                    continue
+                matches.append((day, {
+                    "timestamp": datetime.datetime.strptime(ts, _TIMESTAMP_FORMAT).isoformat()
+                    if ts
+                    else None,
+                    "type": entry_type,
+                    "message": message,
+                }))
+                if len(matches) >= wanted:
+                    break
+            cursor.close()
+
+        if stale:
+            type_set = {t.lower() for t in types} if types else None
+            for file_date, path in stale:
+                day_matches, _ = self.reader._scan_file_dicts(
+                    file_date, path, query, False, type_set, start_time, end_time, wanted
+                )
+                matches.extend((file_date.isoformat(), match) for match in day_matches)
+            # Stable: each day's matches stay newest first
+            matches.sort(key=lambda pair: pair[0], reverse=True)
+            del matches[wanted:]
+
+        page = [match for _, match in matches[offset:offset + limit]]
+        return {
+            "entries": page,
+            "count": len(page),
+            "files_scanned": len((set(indexed) & on_disk) | stale_days),
+            "truncated": len(matches) >= wanted,
+            "indexed": True,
+        }
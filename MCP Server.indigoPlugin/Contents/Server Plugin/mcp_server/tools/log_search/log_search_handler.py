@@ -12,6 +12,16 @@ from ...adapters.indidb import IndiDbStructureStore
 from ..base_handler import BaseToolHandler
 from .correlation import CauseCorrelator
 from .event_log_reader import EventLogReader
+from .log_index import EventLogIndex
+
+# Upper bound on targets in one batched investigate_event call.
+MAX_INVESTIGATE_TARGETS = 50
+
+_DETAILS_HINT = (
+    "Use the matching get_*_details tool (get_trigger_details / "
+    "get_schedule_details / get_action_group_details) on the top "
+    "candidate to see exactly what it executes."
+)
 
 
 def _parse_iso(value: Optional[str], field_name: str):
@@ -35,12 +45,21 @@ class LogSearchHandler(BaseToolHandler):
         data_provider: DataProvider,
         structure_store: IndiDbStructureStore,
         logger: Optional[logging.Logger] = None,
+        log_index_path: Optional[str] = None,
+        parallel_workers: int = 0,
     ):
         super().__init__(tool_name="log_search", logger=logger)
         self.data_provider = data_provider
         self.structure_store = structure_store
         self.reader = EventLogReader(
-            logs_folder_supplier=data_provider.get_logs_folder_path, logger=logger
+            logs_folder_supplier=data_provider.get_logs_folder_path,
+            logger=logger,
+            parallel_workers=parallel_workers,
+        )
+        # Full-text index over every retained day-file; the owner starts it.
+        self.log_index = (
+            EventLogIndex(log_index_path, self.reader, logger=logger)
+            if log_index_path else None
         )
         self.correlator = CauseCorrelator(self.reader, structure_store, data_provider)
 
@@ -62,7 +81,9 @@ class LogSearchHandler(BaseToolHandler):
         cheap and independent of the log files on disk. Supplying any filter
         switches to a scan of the daily "YYYY-MM-DD Events.txt" files, which
         reaches full history and supports text/regex matching, type filters,
-        and time ranges. Either way the output shape is identical.
+        and time ranges. Either way the output shape is identical. Plain-text
+        and type/time filters are answered from the full-text index over all
+        retained history once it is built; regex and very short queries scan.
         """
         try:
             start, error = _parse_iso(start_time, "start_time")
@@ -73,7 +94,17 @@ class LogSearchHandler(BaseToolHandler):
                 return error
 
             has_filter = bool(query or types or start or end)
-            if has_filter:
+            if has_filter and self.log_index is not None and self.log_index.can_search(query, regex):
+                result = self.log_index.search(
+                    query=query,
+                    types=types,
+                    start_time=start,
+                    end_time=end,
+                    limit=limit,
+                    offset=offset,
+                )
+                result["source"] = "log_files"
+            elif has_filter:
                 result = self.reader.search(
                     query=query,
                     regex=regex,
@@ -148,7 +179,15 @@ class LogSearchHandler(BaseToolHandler):
         occurrence: int = 1,
         lookback_seconds: int = 60,
         lookahead_seconds: int = 5,
+        targets: Optional[List[Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
+        """
+        Rank candidate causes for one device change, or with `targets` for
+        many at once (each a dict of device_id or search_text, around_time
+        and occurrence) sharing a single log scan.
+        """
+        if targets is not None:
+            return self._investigate_many(targets, lookback_seconds, lookahead_seconds)
         try:
             if device_id is None and not search_text:
                 return {
@@ -173,14 +212,78 @@ class LogSearchHandler(BaseToolHandler):
                 lookahead_seconds=lookahead_seconds,
             )
             if "error" not in result:
-                result["hint"] = (
-                    "Use the matching get_*_details tool (get_trigger_details / "
-                    "get_schedule_details / get_action_group_details) on the top "
-                    "candidate to see exactly what it executes."
-                )
+                result["hint"] = _DETAILS_HINT
                 self.log_tool_outcome(
                     "investigate_event", True, count=len(result.get("candidates", []))
                 )
             return result
         except Exception as e:
             return self.handle_exception(e, "investigating event")
+
+    def _investigate_many(
+        self,
+        targets: List[Dict[str, Any]],
+        lookback_seconds: int,
+        lookahead_seconds: int,
+    ) -> Dict[str, Any]:
+        try:
+            if not isinstance(targets, list) or not targets:
+                return {"error": "targets must be a non-empty list", "success": False}
+            if len(targets) > MAX_INVESTIGATE_TARGETS:
+                return {
+                    "error": f"At most {MAX_INVESTIGATE_TARGETS} targets per call",
+                    "success": False,
+                }
+            if not 1 <= lookback_seconds <= 3600:
+                return {
+                    "error": "lookback_seconds must be between 1 and 3600",
+                    "success": False,
+                }
+
+            # Validate each target on its own; bad ones get an error in place.
+            results: List[Optional[Dict[str, Any]]] = [None] * len(targets)
+            valid: List[int] = []
+            parsed: List[Dict[str, Any]] = []
+            for position, target in enumerate(targets):
+                if not isinstance(target, dict):
+                    results[position] = {"error": "Each target must be an object"}
+                    continue
+                if target.get("device_id") is None and not target.get("search_text"):
+                    results[position] = {"error": "Provide device_id or search_text"}
+                    continue
+                center, error = _parse_iso(target.get("around_time"), "around_time")
+                if error:
+                    results[position] = {"error": error["error"]}
+                    continue
+                occurrence = target.get("occurrence")
+                if occurrence is None:
+                    occurrence = 1
+                elif isinstance(occurrence, bool) or not isinstance(occurrence, int) or occurrence < 1:
+                    results[position] = {"error": "occurrence must be an integer of at least 1"}
+                    continue
+                valid.append(position)
+                parsed.append(
+                    {
+                        "device_id": target.get("device_id"),
+                        "search_text": target.get("search_text"),
+                        "around_time": center,
+                        "occurrence": occurrence,
+                    }
+                )
+
+            for position, result in zip(
+                valid,
+                self.correlator.investigate_many(parsed, lookback_seconds, lookahead_seconds),
+            ):
+                results[position] = result
+
+            located = sum(1 for result in results if "error" not in result)
+            self.log_tool_outcome("investigate_event", True, count=located)
+            return {
+                "results": results,
+                "count": len(results),
+                "located": located,
+                "hint": _DETAILS_HINT,
+            }
+        except Exception as e:
+            return self.handle_exception(e, "investigating events")
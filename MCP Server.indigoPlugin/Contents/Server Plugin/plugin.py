@@ -13,6 +13,7 @@ import logging
 import os
 import platform
 import socket
+from typing import Optional
 
 import openai
 
@@ -67,6 +68,11 @@ class Plugin(indigo.PluginBase):
         self.influx_login = plugin_prefs.get("influx_login", "")
         self.influx_password = plugin_prefs.get("influx_password", "")
         self.influx_database = plugin_prefs.get("influx_database", "indigo")
+        self.enable_history_rollups = plugin_prefs.get("enable_history_rollups", False)
+
+        # Event log full-text index
+        self.enable_event_log_index = plugin_prefs.get("enable_event_log_index", True)
+        self.enable_parallel_log_search = plugin_prefs.get("enable_parallel_log_search", False)
 
         # Webhook configuration
         self.enable_webhooks = plugin_prefs.get("enable_webhooks", False)
@@ -372,6 +378,26 @@ class Plugin(indigo.PluginBase):
             os.environ["INFLUXDB_ENABLED"] = "true"
         else:
             os.environ["INFLUXDB_ENABLED"] = "false"
+        os.environ["HISTORY_ROLLUPS_ENABLED"] = (
+            "true" if self.enable_influxdb and self.enable_history_rollups else "false"
+        )
+        os.environ["HISTORY_ROLLUPS_FILE"] = os.path.join(
+            indigo.server.getInstallFolderPath(),
+            "Preferences/Plugins/com.vtmikel.mcp_server/history_rollups.sqlite",
+        )
+        os.environ["INDIDB_SNAPSHOT_FILE"] = os.path.join(
+            indigo.server.getInstallFolderPath(),
+            "Preferences/Plugins/com.vtmikel.mcp_server/indidb_snapshot.pickle",
+        )
+        os.environ["EVENT_LOG_INDEX_ENABLED"] = "true" if self.enable_event_log_index else "false"
+        os.environ["EVENT_LOG_INDEX_FILE"] = os.path.join(
+            indigo.server.getInstallFolderPath(),
+            "Preferences/Plugins/com.vtmikel.mcp_server/event_log_index.sqlite",
+        )
+        # Worker processes for large event-log scans (0 = scan in-process)
+        os.environ["EVENT_LOG_PARALLEL_WORKERS"] = (
+            str(min(4, (os.cpu_count() or 1) - 1)) if self.enable_parallel_log_search else "0"
+        )
 
         self.langsmith_config = get_langsmith_config()
 
@@ -429,9 +455,22 @@ class Plugin(indigo.PluginBase):
                     subscriptions_path, logger=self.logger
                 )
                 self.subscription_manager = SubscriptionManager(
-                    logger=self.logger, store=subscription_store
+                    logger=self.logger,
+                    store=subscription_store,
+                    dwell_state_path=os.path.join(
+                        os.path.dirname(subscriptions_path), "dwell_timers.json"
+                    ),
+                    # Coalesce bursts of creates/deletes; stats (in their
+                    # own file) change on every delivery
+                    save_interval=2.0,
+                    stats_save_interval=30.0,
+                )
+                self.webhook_dispatcher = WebhookDispatcher(
+                    logger=self.logger,
+                    outbox_path=os.path.join(
+                        os.path.dirname(subscriptions_path), "webhook_outbox.db"
+                    ),
                 )
-                self.webhook_dispatcher = WebhookDispatcher(logger=self.logger)
                 self.webhook_dispatcher.start()
                 # Wire dwell timer callback to dispatcher
                 self.subscription_manager.set_dispatch_callback(
@@ -441,10 +480,23 @@ class Plugin(indigo.PluginBase):
                 self.webhook_dispatcher.set_on_expired(
                     lambda sub: self.subscription_manager.delete(sub.subscription_id)
                 )
+                self.webhook_dispatcher.set_on_stats_changed(
+                    self.subscription_manager.stats_changed
+                )
                 # Restore subscriptions persisted from a previous run
                 restored = self.subscription_manager.load_from_store()
                 if restored:
                     self.logger.info(f"🔔 Restored {restored} event subscription(s)")
+                rearmed = self.subscription_manager.restore_dwells(
+                    current_state=self._current_entity_state
+                )
+                if rearmed:
+                    self.logger.debug(f"Re-armed {rearmed} pending dwell timer(s)")
+                replayed = self.webhook_dispatcher.replay_outbox(
+                    self.subscription_manager.get
+                )
+                if replayed:
+                    self.logger.info(f"🔔 Resuming {replayed} undelivered webhook(s) from the last run")
                 subscription_handler = SubscriptionHandler(
                     subscription_manager=self.subscription_manager,
                     webhook_dispatcher=self.webhook_dispatcher,
@@ -599,10 +651,12 @@ class Plugin(indigo.PluginBase):
                     # delete() is idempotent and thread-safe.
                     self.subscription_manager.delete(sub_id)
 
-            subscriptions = [
-                s.to_dict(include_token=False)
-                for s in self.subscription_manager.list_all()
-            ]
+            subscriptions = []
+            for s in self.subscription_manager.list_all():
+                sub_dict = s.to_dict(include_token=False)
+                if self.webhook_dispatcher:
+                    sub_dict["circuit"] = self.webhook_dispatcher.circuit_state(s.webhook_url)
+                subscriptions.append(sub_dict)
             dispatcher_stats = (
                 self.webhook_dispatcher.get_stats() if self.webhook_dispatcher else None
             )
@@ -951,14 +1005,21 @@ class Plugin(indigo.PluginBase):
         # Evaluate event subscriptions for all non-plugin devices
         if self.subscription_manager and self.webhook_dispatcher:
             try:
-                matches = self.subscription_manager.evaluate_device_change(
-                    dict(origDev), dict(newDev)
-                )
+                matches = self.subscription_manager.evaluate_device_update(origDev, newDev)
                 for subscription, event in matches:
                     self.webhook_dispatcher.dispatch(subscription, event)
             except Exception as e:
                 self.logger.warning(f"⚠️ Event subscription check failed for a device change: {e}")
 
+    @staticmethod
+    def _current_entity_state(entity_type: str, entity_id: int) -> Optional[dict]:
+        """A device's or variable's current state as a dict, or None if it's gone."""
+        collection = indigo.devices if entity_type == "device" else indigo.variables
+        try:
+            return dict(collection[entity_id])
+        except (KeyError, TypeError):
+            return None
+
     def variableUpdated(self, origVar: indigo.Variable, newVar: indigo.Variable) -> None:
         """
         Called when any variable is updated (after subscribeToChanges).
@@ -1060,6 +1121,11 @@ class Plugin(indigo.PluginBase):
             self.influx_login = values_dict.get("influx_login", "")
             self.influx_password = values_dict.get("influx_password", "")
             self.influx_database = values_dict.get("influx_database", "indigo")
+            self.enable_history_rollups = values_dict.get("enable_history_rollups", False)
+
+            # Event log full-text index
+            self.enable_event_log_index = values_dict.get("enable_event_log_index", True)
+            self.enable_parallel_log_search = values_dict.get("enable_parallel_log_search", False)
 
             # Webhook configuration
             new_enable_webhooks = values_dict.get("enable_webhooks", False)
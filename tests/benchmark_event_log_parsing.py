@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark event-log line parsing over synthetic day-files.
+
+Scales the lines of tests/fixtures/event_logs up to the requested line counts
+(timestamps spread across the day, continuation lines kept), then times:
+
+  strptime   the previous parser: regex, split and strptime on every line
+  deferred   _collect_entries as the reader runs it, timestamps left encoded
+  decoded    the same, then every timestamp decoded (the time-filter worst case)
+
+Usage:
+    python tests/benchmark_event_log_parsing.py [--lines 50000 200000] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import sys
+import time
+from pathlib import Path
+
+# Add plugin to path
+plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
+sys.path.insert(0, str(plugin_path))
+
+from mcp_server.tools.log_search.event_log_reader import (  # noqa: E402
+    TIMESTAMP_RE,
+    _collect_entries,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "event_logs"
+
+
+def build_synthetic_lines(count: int) -> list:
+    """`count` log lines cycling through the fixture lines, one second apart."""
+    templates = []
+    for path in sorted(FIXTURES.glob("* Events.txt")):
+        for line in path.read_text().splitlines(keepends=True):
+            body = line.split("\t", 1)[1] if TIMESTAMP_RE.match(line) else None
+            templates.append((body, line))
+
+    moment = datetime.datetime(2026, 7, 1)
+    lines = []
+    while len(lines) < count:
+        for body, line in templates:
+            if body is None:
+                lines.append(line)
+                continue
+            moment += datetime.timedelta(milliseconds=1001)
+            lines.append(f"{moment:%Y-%m-%d %H:%M:%S}.{moment.microsecond // 1000:03d}\t{body}")
+    return lines[:count]
+
+
+def parse_with_strptime(lines: list) -> list:
+    """The parser before the fast path, kept here as the baseline."""
+    entries = []
+    for line in lines:
+        if not TIMESTAMP_RE.match(line):
+            if entries:
+                entries[-1][2] += "\n" + line.rstrip("\n")
+            continue
+        parts = line.rstrip("\n").split("\t", 2)
+        timestamp = None
+        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+            try:
+                timestamp = datetime.datetime.strptime(parts[0].strip(), fmt)
+                break
+            except ValueError:
+                continue
+        entries.append([timestamp, parts[1].strip() if len(parts) == 3 else None, parts[-1]])
+    return entries
+
+
+def parse_deferred(lines: list) -> list:
+    return _collect_entries(lines)
+
+
+def parse_decoded(lines: list) -> list:
+    entries = _collect_entries(lines)
+    for entry in entries:
+        entry.timestamp
+    return entries
+
+
+def best_of(func, lines: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(lines)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[50_000, 200_000],
+                        help="synthetic day-file sizes in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser (best is kept)")
+    args = parser.parse_args()
+
+    for count in args.lines:
+        lines = build_synthetic_lines(count)
+        reference = parse_with_strptime(lines)
+        decoded = parse_decoded(lines)
+        if [e[0] for e in reference] != [e.timestamp for e in decoded]:
+            print("MISMATCH: fast-path timestamps differ from strptime")
+            return 1
+
+        baseline = best_of(parse_with_strptime, lines, args.repeat)
+        timings = {
+            "strptime": baseline,
+            "deferred": best_of(parse_deferred, lines, args.repeat),
+            "decoded": best_of(parse_decoded, lines, args.repeat),
+        }
+        line = ", ".join(
+            f"{name} {seconds:.3f}s ({baseline / seconds:.1f}x)" for name, seconds in timings.items()
+        )
+        print(f"{count:>8} lines: {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the .indiDb parser backends over synthetic databases.
+
+Scales tests/fixtures/sample_indidb.xml up by repeating each top-level list's
+items with fresh IDs, then times parse_indidb with every available backend
+and checks that they produce identical ParsedDb contents.
+
+Usage:
+    python tests/benchmark_indidb_parser.py [--sizes 5 20 50] [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add plugin to path
+plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
+sys.path.insert(0, str(plugin_path))
+
+from mcp_server.adapters.indidb.incremental import _element_span, _iter_children, _next_child  # noqa: E402
+from mcp_server.adapters.indidb.parser import available_backends, parse_indidb  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "sample_indidb.xml"
+
+_ID = re.compile(rb'(<ID type="integer">)(\d+)(</ID>)')
+
+
+def build_synthetic_db(target_mb: float) -> bytes:
+    """
+    Return the fixture with every list item repeated until the file is
+    roughly `target_mb` megabytes. Each copy's own IDs are offset so items
+    stay distinct; references between items keep pointing at the originals.
+    """
+    data = FIXTURE.read_bytes()
+    root_start = _next_child(data, 0)
+    _, root_content, _ = _element_span(data, root_start)
+    lists = [
+        (list_content, list_end)
+        for _, _, list_content, list_end in _iter_children(data, root_content)
+    ]
+    items = b"".join(
+        data[start:end]
+        for list_content, _ in lists
+        for _, start, _, end in _iter_children(data, list_content)
+    )
+    copies = max(1, int(target_mb * 1024 * 1024 / max(len(items), 1)))
+
+    out = []
+    pos = 0
+    for list_content, list_end in lists:
+        children = _iter_children(data, list_content)
+        close_at = data.rfind(b"</", list_content, list_end)
+        out.append(data[pos:close_at])
+        for copy in range(1, copies):
+            offset = copy * 10_000_000
+            for _, start, _, end in children:
+                out.append(b"\n\t\t")
+                out.append(_ID.sub(
+                    lambda m: m.group(1) + str(int(m.group(2)) + offset).encode() + m.group(3),
+                    data[start:end],
+                ))
+        pos = close_at
+    out.append(data[pos:])
+    return b"".join(out)
+
+
+def time_backend(path: str, backend: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_indidb(path, backend=backend)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[5, 20, 50],
+                        help="synthetic database sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per backend (best is kept)")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = Path(tmp) / f"synthetic-{size_mb:g}mb.indiDb"
+            path.write_bytes(build_synthetic_db(size_mb))
+            actual_mb = path.stat().st_size / (1024 * 1024)
+
+            results = {backend: parse_indidb(str(path), backend=backend) for backend in backends}
+            reference = results[backends[0]]
+            for backend, parsed in results.items():
+                if parsed != reference:
+                    print(f"MISMATCH: {backend} differs from {backends[0]}")
+                    return 1
+
+            timings = {backend: time_backend(str(path), backend, args.repeat) for backend in backends}
+            baseline = timings["etree"]
+            line = ", ".join(
+                f"{backend} {seconds:.2f}s ({baseline / seconds:.1f}x)"
+                for backend, seconds in timings.items()
+            )
+            print(f"{actual_mb:6.1f} MB {reference.counts()}: {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
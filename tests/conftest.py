@@ -73,6 +73,9 @@ def _setup_events_modules():
     _load_module_from_file("mcp_server.events.subscription_store", events_dir / "subscription_store.py")
     _load_module_from_file("mcp_server.events.dwell_timer", events_dir / "dwell_timer.py")
     _load_module_from_file("mcp_server.events.subscription_manager", events_dir / "subscription_manager.py")
+    _load_module_from_file("mcp_server.events.http_pool", events_dir / "http_pool.py")
+    _load_module_from_file("mcp_server.events.outbox", events_dir / "outbox.py")
+    _load_module_from_file("mcp_server.events.flow_control", events_dir / "flow_control.py")
     _load_module_from_file("mcp_server.events.webhook_dispatcher", events_dir / "webhook_dispatcher.py")
     _load_module_from_file("mcp_server.events.subscription_handler", events_dir / "subscription_handler.py")
     _load_module_from_file("mcp_server.events.web_ui", events_dir / "web_ui.py")
@@ -19,6 +19,8 @@ plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/S
 sys.path.insert(0, str(plugin_path))
 
 from mcp_server.adapters.indidb.store import IndiDbStructureStore  # noqa: E402
+from mcp_server.tools.log_search.activity_index import ActivityIndex  # noqa: E402
+from mcp_server.tools.log_search.event_log_reader import EventLogReader  # noqa: E402
 from mcp_server.tools.log_search.log_search_handler import LogSearchHandler  # noqa: E402
 
 LOGS_DIR = Path(__file__).parent / "fixtures" / "event_logs"
@@ -155,3 +157,112 @@ class TestOccurrence:
             datetime.datetime(2026, 7, 1, 6, 0, 1), 60, 5
         )
         assert entries
+
+
+class TestBatchInvestigate:
+    TARGETS = [
+        {"device_id": 1000111},
+        {"device_id": 1000111, "around_time": "2026-06-30T21:59:33"},
+        {"device_id": 1000111, "occurrence": 2},
+        {"search_text": "Porch Light"},
+    ]
+
+    def test_results_match_single_calls(self, handler):
+        batch = handler.investigate_event(targets=self.TARGETS)
+        assert batch["count"] == 4
+        assert batch["located"] == 4
+        for target, result in zip(self.TARGETS, batch["results"]):
+            single = handler.investigate_event(**target)
+            single.pop("hint")
+            assert result == single
+
+    def test_one_log_scan_for_all_targets(self, handler, monkeypatch):
+        search_many = Mock(wraps=handler.reader.search_many)
+        monkeypatch.setattr(handler.reader, "search_many", search_many)
+        monkeypatch.setattr(handler.reader, "search", Mock(side_effect=AssertionError("scan")))
+        handler.investigate_event(targets=self.TARGETS)
+        search_many.assert_called_once()
+        # Device and text needles are deduplicated
+        assert len(search_many.call_args.args[0]) == 2
+
+    def test_bad_targets_fail_in_place(self, handler):
+        batch = handler.investigate_event(
+            targets=[
+                {"device_id": 1000111},
+                {"around_time": "2026-06-30T21:59:33"},
+                {"device_id": 1000111, "around_time": "last night"},
+                {"search_text": "zzz-not-in-any-log"},
+            ]
+        )
+        results = batch["results"]
+        assert "candidates" in results[0]
+        assert results[1]["error"] == "Provide device_id or search_text"
+        assert "Invalid around_time" in results[2]["error"]
+        assert results[3]["error"] == "No matching log line found"
+        assert batch["located"] == 1
+
+    def test_bad_occurrence_fails_in_place(self, handler):
+        batch = handler.investigate_event(
+            targets=[
+                {"device_id": 1000111, "occurrence": "2"},
+                {"device_id": 1000111, "occurrence": 0},
+                {"device_id": 1000111, "occurrence": None},
+            ]
+        )
+        results = batch["results"]
+        assert results[0]["error"] == "occurrence must be an integer of at least 1"
+        assert results[1]["error"] == "occurrence must be an integer of at least 1"
+        assert "candidates" in results[2]
+        assert batch["located"] == 1
+
+    def test_target_list_is_validated(self, handler):
+        assert "error" in handler.investigate_event(targets=[])
+        too_many = [{"device_id": 1000111}] * 51
+        assert "error" in handler.investigate_event(targets=too_many)
+
+
+class TestActivityIndex:
+    WINDOWS = [
+        (datetime.datetime(2026, 7, 1, 6, 0, 0), datetime.datetime(2026, 7, 1, 6, 0, 6)),
+        (datetime.datetime(2026, 6, 30, 21, 59), datetime.datetime(2026, 6, 30, 22, 0)),
+        (datetime.datetime(2026, 6, 30, 20, 0), datetime.datetime(2026, 7, 1, 12, 0)),
+        (datetime.datetime(2026, 6, 1), datetime.datetime(2026, 6, 2)),
+    ]
+
+    @pytest.mark.parametrize("window", WINDOWS)
+    def test_matches_window_scan(self, handler, window):
+        start, end = window
+        center = start + (end - start) / 2
+        half = (end - start).total_seconds() / 2
+        scanned = handler.reader.entries_around(
+            center, half, half, types=["Trigger", "Schedule", "Action Group"]
+        )
+        assert handler.correlator.activity.firings_between(start, end) == scanned
+
+    def test_batch_matches_single_windows(self, handler):
+        activity = handler.correlator.activity
+        assert activity.firings_for_windows(self.WINDOWS) == [
+            activity.firings_between(start, end) for start, end in self.WINDOWS
+        ]
+
+    def test_unchanged_day_is_not_reread(self, handler, monkeypatch):
+        handler.investigate_event(device_id=1000111)
+        monkeypatch.setattr(
+            handler.reader, "read_day", Mock(side_effect=AssertionError("re-read"))
+        )
+        result = handler.correlator.activity.firings_between(
+            datetime.datetime(2026, 7, 1, 6, 0), datetime.datetime(2026, 7, 1, 6, 1)
+        )
+        assert result
+
+    def test_grown_day_is_rebuilt(self, tmp_path):
+        day = tmp_path / "2026-07-02 Events.txt"
+        day.write_text("2026-07-02 10:00:00.000\tTrigger\tA\n")
+        activity = ActivityIndex(
+            EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+        )
+        window = (datetime.datetime(2026, 7, 2, 9), datetime.datetime(2026, 7, 2, 11))
+        assert [e.message for e in activity.firings_between(*window)] == ["A"]
+        with open(day, "a") as handle:
+            handle.write("2026-07-02 10:30:00.000\tSchedule\tB\n")
+        assert [e.message for e in activity.firings_between(*window)] == ["A", "B"]
@@ -13,9 +13,14 @@ plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/S
 sys.path.insert(0, str(plugin_path))
 
 from mcp_server.tools.log_search.event_log_reader import (  # noqa: E402
+    _UNPARSED,
     EventLogReader,
+    _bytes_prefilter,
+    _parse_timestamp,
     parse_log_line,
 )
+from mcp_server.tools.log_search import event_log_reader  # noqa: E402
+from mcp_server.tools.log_search.log_index import EventLogIndex  # noqa: E402
 
 LOGS_DIR = Path(__file__).parent / "fixtures" / "event_logs"
 
@@ -44,6 +49,26 @@ class TestParseLogLine:
         assert entry.type is None
         assert entry.message == "just a message"
 
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2026-07-01 06:00:00.415", datetime.datetime(2026, 7, 1, 6, 0, 0, 415000)),
+            ("2026-07-01 06:00:00", datetime.datetime(2026, 7, 1, 6, 0, 0)),
+            ("2026-07-01 06:00:00.5", datetime.datetime(2026, 7, 1, 6, 0, 0, 500000)),
+            ("2026-07-01 06:00:00.123456", datetime.datetime(2026, 7, 1, 6, 0, 0, 123456)),
+            ("2026-07-01 06:00:00,415", None),
+            ("2026-13-01 06:00:00.000", None),
+        ],
+    )
+    def test_timestamp_formats(self, text, expected):
+        assert _parse_timestamp(text) == expected
+
+    def test_timestamp_is_decoded_on_first_access(self):
+        entry = parse_log_line("2026-07-01 06:00:00.000\tTrigger\tA\n")
+        assert entry._timestamp is _UNPARSED
+        assert entry.timestamp == datetime.datetime(2026, 7, 1, 6, 0, 0)
+        assert entry._timestamp == entry.timestamp
+
 
 class TestReadDay:
     def test_continuation_lines_attach_to_previous(self, reader):
@@ -97,6 +122,13 @@ class TestSearch:
         assert result["files_scanned"] == 0
 
 
+    def test_search_many_matches_individual_searches(self, reader):
+        queries = ["porch light", "TRIGGER", "traceback", "zzz-nothing"]
+        batch = reader.search_many(queries, limit=3)
+        for query, entries in zip(queries, batch):
+            assert [e.as_dict() for e in entries] == reader.search(query=query, limit=3)["entries"]
+
+
 class TestEntriesAround:
     def test_window_and_types(self, reader):
         center = datetime.datetime(2026, 6, 30, 21, 59, 33, 400000)
@@ -111,3 +143,352 @@ class TestEntriesAround:
         center = datetime.datetime(2026, 7, 1, 0, 0, 30)
         entries = reader.entries_around(center, lookback_seconds=7200, lookahead_seconds=0)
         assert any(e.timestamp.date() == datetime.date(2026, 6, 30) for e in entries)
+
+
+class TestDayIndex:
+    def test_checkpoints_and_types(self, reader):
+        index = reader.day_index(str(LOGS_DIR / "2026-06-30 Events.txt"))
+        assert index.minutes == [
+            "2026-06-30 21:59", "2026-06-30 22:10", "2026-06-30 22:30", "2026-06-30 23:00"
+        ]
+        assert index.offsets[0] == 0
+        assert index.types == {"schedule", "action group", "z-wave", "trigger", "example plugin error"}
+        assert index.complete and index.monotonic
+
+    def test_read_range_seeks_to_window(self, reader):
+        path = str(LOGS_DIR / "2026-06-30 Events.txt")
+        entries = reader.read_range(
+            path,
+            datetime.datetime(2026, 6, 30, 22, 30, 15),
+            datetime.datetime(2026, 6, 30, 22, 45),
+        )
+        assert [e.type for e in entries] == ["Example Plugin Error"]
+        assert "Traceback" in entries[0].message
+
+    def test_growing_file_extends_index(self, tmp_path):
+        day = tmp_path / "2026-07-02 Events.txt"
+        day.write_text("2026-07-02 10:00:00.000\tTrigger\tA\n")
+        reader = EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+        first = reader.day_index(str(day))
+        assert reader.day_index(str(day)) is first
+
+        with open(day, "a") as handle:
+            handle.write("2026-07-02 10:05:00.000\tSchedule\tB\n2026-07-02 10:0")
+        grown = reader.day_index(str(day))
+        assert grown.minutes == ["2026-07-02 10:00", "2026-07-02 10:05"]
+        assert grown.types == {"trigger", "schedule"}
+        assert not grown.complete  # the half-written line isn't indexed yet
+
+        with open(day, "a") as handle:
+            handle.write("6:00.000\tAction Group\tC\n")
+        finished = reader.day_index(str(day))
+        assert finished.minutes[-1] == "2026-07-02 10:06"
+        assert finished.complete
+        assert reader.read_range(str(day), datetime.datetime(2026, 7, 2, 10, 6))[0].message == "C"
+
+    def test_type_filter_skips_files_without_the_type(self, reader, monkeypatch):
+        read = []
+        original = reader.read_day
+        monkeypatch.setattr(reader, "read_day", lambda path: read.append(path) or original(path))
+        result = reader.search(types=["Schedule"])
+        assert result["count"] == 2
+        assert len(read) == 2
+        read.clear()
+        assert reader.search(types=["Example Plugin Error"])["count"] == 1
+        assert [Path(p).name for p in read] == ["2026-06-30 Events.txt"]
+
+    def test_clock_going_backwards_reads_whole_file(self, tmp_path):
+        day = tmp_path / "2026-07-02 Events.txt"
+        day.write_text(
+            "2026-07-02 02:30:00.000\tTrigger\tbefore change\n"
+            "2026-07-02 02:00:00.000\tTrigger\tafter change\n"
+        )
+        reader = EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+        assert not reader.day_index(str(day)).monotonic
+        entries = reader.entries_around(
+            datetime.datetime(2026, 7, 2, 2, 0, 30), lookback_seconds=60, lookahead_seconds=0
+        )
+        assert [e.message for e in entries] == ["after change"]
+
+
+class TestDayCache:
+    def _fresh(self, path):
+        return EventLogReader(logs_folder_supplier=lambda: None, logger=Mock()).read_day(str(path))
+
+    def test_unchanged_file_is_not_reparsed(self, reader, monkeypatch):
+        path = str(LOGS_DIR / "2026-06-30 Events.txt")
+        first = reader.read_day(path)
+        monkeypatch.setattr(reader, "_read_tail", Mock(side_effect=AssertionError("reparsed")))
+        assert reader.read_day(path) == first
+
+    def test_appended_tail_matches_a_full_read(self, tmp_path):
+        day = tmp_path / "2026-07-02 Events.txt"
+        day.write_text("2026-07-02 10:00:00.000\tScript Error\tfailed\nTraceback (most")
+        reader = EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+
+        first = reader.read_day(str(day))
+        assert first == self._fresh(day)
+        assert first[0].message == "failed\nTraceback (most"
+
+        with open(day, "a") as handle:
+            handle.write(" recent call last):\n  File x\n2026-07-02 10:00:01.000\tTrigger\tB\n")
+        second = reader.read_day(str(day))
+        assert second == self._fresh(day)
+        assert second[0].message == "failed\nTraceback (most recent call last):\n  File x"
+        assert [e.message for e in second[1:]] == ["B"]
+        # Entries handed out earlier are never modified in place
+        assert first[0].message == "failed\nTraceback (most"
+
+        with open(day, "a") as handle:
+            handle.write("  continued\n")
+        third = reader.read_day(str(day))
+        assert third == self._fresh(day)
+        assert second[1].message == "B"
+
+    def test_rewritten_file_is_reparsed(self, tmp_path):
+        day = tmp_path / "2026-07-02 Events.txt"
+        day.write_text("2026-07-02 10:00:00.000\tTrigger\tA\n")
+        reader = EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+        reader.read_day(str(day))
+        day.write_text("2026-07-02 11:00:00.000\tTrigger\tBB\n2026-07-02 11:00:01.000\tTrigger\tC\n")
+        assert [e.message for e in reader.read_day(str(day))] == ["BB", "C"]
+
+    def test_least_recently_used_day_is_evicted(self):
+        reader = EventLogReader(
+            logs_folder_supplier=lambda: str(LOGS_DIR), logger=Mock(), cache_budget_bytes=2500
+        )
+        older = str(LOGS_DIR / "2026-06-30 Events.txt")
+        newer = str(LOGS_DIR / "2026-07-01 Events.txt")
+        reader.read_day(older)
+        reader.read_day(newer)
+        assert list(reader._day_cache) == [newer]
+        assert reader._cache_cost <= 2500
+
+    def test_cached_day_serves_window_reads(self, reader):
+        path = str(LOGS_DIR / "2026-06-30 Events.txt")
+        reader.read_day(path)
+        entries = reader.read_range(
+            path,
+            datetime.datetime(2026, 6, 30, 22, 30, 15),
+            datetime.datetime(2026, 6, 30, 22, 45),
+        )
+        assert [e.type for e in entries] == ["Example Plugin Error"]
+
+
+class TestEventLogIndex:
+    @pytest.fixture
+    def index(self, reader, tmp_path):
+        index = EventLogIndex(str(tmp_path / "index.sqlite"), reader, logger=Mock())
+        index.sync()
+        yield index
+        index.stop()
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {"query": "front door"},
+            {"query": "TRACEBACK"},
+            {"types": ["trigger"]},
+            {"query": "door", "types": ["Trigger", "Schedule"]},
+            {
+                "start_time": datetime.datetime(2026, 6, 30, 22, 30),
+                "end_time": datetime.datetime(2026, 7, 1, 6, 0),
+            },
+            {"types": ["Trigger"], "limit": 2, "offset": 1},
+        ],
+    )
+    def test_matches_the_file_scan(self, reader, index, filters):
+        scanned = reader.search(**filters)
+        indexed = index.search(**filters)
+        assert indexed["entries"] == scanned["entries"]
+        assert indexed["truncated"] == scanned["truncated"]
+
+    def test_short_and_regex_queries_use_the_scan(self, index):
+        assert index.can_search("door", regex=False)
+        assert index.can_search(None, regex=False)
+        assert not index.can_search("do", regex=False)
+        assert not index.can_search("door", regex=True)
+
+    def test_not_searchable_before_first_sync(self, reader, tmp_path):
+        index = EventLogIndex(str(tmp_path / "index.sqlite"), reader, logger=Mock())
+        assert not index.can_search("door", regex=False)
+
+    def test_appended_lines_and_removed_days(self, tmp_path):
+        logs = tmp_path / "logs"
+        logs.mkdir()
+        day = logs / "2026-07-02 Events.txt"
+        day.write_text("2026-07-02 10:00:00.000\tScript Error\tfailed\n")
+        old = logs / "2026-07-01 Events.txt"
+        old.write_text("2026-07-01 09:00:00.000\tTrigger\tfailed earlier\n")
+        reader = EventLogReader(logs_folder_supplier=lambda: str(logs), logger=Mock())
+        index = EventLogIndex(str(tmp_path / "index.sqlite"), reader, logger=Mock())
+        index.sync()
+
+        with open(day, "a") as handle:
+            handle.write("Traceback (most recent call last)\n2026-07-02 10:00:01.000\tTrigger\tB\n")
+        old.unlink()
+        result = index.search(query="failed")
+        assert [e["message"] for e in result["entries"]] == [
+            "failed\nTraceback (most recent call last)"
+        ]
+        assert index.search(query="most recent")["count"] == 1
+        assert [e["message"] for e in index.search(types=["trigger"])["entries"]] == ["B"]
+        index.stop()
+
+    def test_search_scans_what_the_sync_has_not_reached(self, tmp_path, monkeypatch):
+        logs = tmp_path / "logs"
+        logs.mkdir()
+        day = logs / "2026-07-01 Events.txt"
+        day.write_text("2026-07-01 09:00:00.000\tTrigger\tdoor opened\n")
+        reader = EventLogReader(logs_folder_supplier=lambda: str(logs), logger=Mock())
+        index = EventLogIndex(str(tmp_path / "index.sqlite"), reader, logger=Mock())
+        index.sync()
+
+        monkeypatch.setattr(index, "_index_file", Mock(side_effect=AssertionError("indexed")))
+        with open(day, "a") as handle:
+            handle.write("2026-07-01 10:00:00.000\tTrigger\tdoor closed\n")
+        (logs / "2026-07-02 Events.txt").write_text(
+            "2026-07-02 08:00:00.000\tSchedule\tdoor locked\n"
+        )
+        result = index.search(query="door")
+        assert [e["message"] for e in result["entries"]] == [
+            "door locked", "door closed", "door opened"
+        ]
+        assert result == {**reader.search(query="door"), "indexed": True}
+        assert index.search(query="door", limit=1, offset=1)["entries"][0]["message"] == "door closed"
+        index.stop()
+
+    def test_reaches_past_the_scan_file_cap(self, tmp_path):
+        logs = tmp_path / "logs"
+        logs.mkdir()
+        first = datetime.date(2026, 6, 1)
+        for n in range(30):
+            stamp = first + datetime.timedelta(days=n)
+            (logs / f"{stamp.isoformat()} Events.txt").write_text(
+                f"{stamp.isoformat()} 12:00:00.000\tTrigger\tday {n} fired\n"
+            )
+        reader = EventLogReader(logs_folder_supplier=lambda: str(logs), logger=Mock())
+        index = EventLogIndex(str(tmp_path / "index.sqlite"), reader, logger=Mock())
+        index.sync()
+        result = index.search(query="fired", limit=100)
+        assert result["count"] == 30
+        assert result["entries"][-1]["message"] == "day 0 fired"
+        assert reader.search(query="fired", limit=100)["count"] < 30
+        index.stop()
+
+
+class TestBytesPrefilter:
+    def test_non_ascii_queries_are_not_prefiltered(self):
+        assert _bytes_prefilter("café") is None
+        assert _bytes_prefilter("Front Door") is not None
+
+    @pytest.mark.parametrize(
+        "query",
+        ["front door", "TRACEBACK", 'file "plugin.py"', "Example Plugin Error", "2026-06-30 22"],
+    )
+    def test_matches_a_full_parse(self, query):
+        path = str(LOGS_DIR / "2026-06-30 Events.txt")
+        mapped = EventLogReader(logs_folder_supplier=lambda: str(LOGS_DIR), logger=Mock())
+        parsed = EventLogReader(logs_folder_supplier=lambda: str(LOGS_DIR), logger=Mock())
+        parsed.read_day(path)  # cached days skip the prefilter
+        assert mapped.search(query=query) == parsed.search(query=query)
+
+    def test_only_matching_entries_are_parsed(self, reader, monkeypatch):
+        monkeypatch.setattr(reader, "read_day", Mock(side_effect=AssertionError("full read")))
+        result = reader.search(query="traceback")
+        assert [e["type"] for e in result["entries"]] == ["Example Plugin Error"]
+        assert "Traceback" in result["entries"][0]["message"]
+
+    def test_unicode_case_folding_is_preserved(self, tmp_path):
+        (tmp_path / "2026-07-02 Events.txt").write_text(
+            "2026-07-02 10:00:00.000\tSensor\tReading 300\u212a\n"
+            "2026-07-02 10:00:01.000\tSensor\tReading 300k\n",
+            encoding="utf-8",
+        )
+        reader = EventLogReader(logs_folder_supplier=lambda: str(tmp_path), logger=Mock())
+        assert reader.search(query="300K")["count"] == 2
+
+
+@pytest.fixture(scope="module")
+def parallel_logs(tmp_path_factory):
+    logs = tmp_path_factory.mktemp("logs")
+    for n in range(6):
+        day = datetime.date(2026, 7, 1) + datetime.timedelta(days=n)
+        lines = [
+            f"{day.isoformat()} {hour:02d}:00:00.000\t{kind}\t{kind} {n}-{hour} ran\n"
+            for hour in range(24)
+            for kind in ("Trigger", "Schedule", "Action Group")
+        ]
+        (logs / f"{day.isoformat()} Events.txt").write_text("".join(lines))
+    return logs
+
+
+@pytest.fixture(scope="module")
+def parallel_reader(parallel_logs):
+    reader = EventLogReader(
+        logs_folder_supplier=lambda: str(parallel_logs), logger=Mock(), parallel_workers=2,
+        cache_budget_bytes=0,
+    )
+    yield reader
+    reader.close()
+
+
+class TestParallelSearch:
+    @pytest.fixture(autouse=True)
+    def low_threshold(self, monkeypatch):
+        monkeypatch.setattr(event_log_reader, "PARALLEL_MIN_FILES", 2)
+
+    def _sequential(self, logs):
+        return EventLogReader(
+            logs_folder_supplier=lambda: str(logs), logger=Mock(), parallel_workers=0
+        )
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {"query": "ran", "limit": 30},
+            {"query": "ran", "limit": 10, "offset": 70},
+            {"query": r"schedule \d-1\d", "regex": True, "limit": 500},
+            {"types": ["Action Group"], "limit": 5, "offset": 24},
+            {
+                "query": "trigger",
+                "start_time": datetime.datetime(2026, 7, 2, 12, 0),
+                "end_time": datetime.datetime(2026, 7, 5, 6, 30),
+                "limit": 1000,
+            },
+        ],
+    )
+    def test_matches_sequential_scan(self, parallel_logs, parallel_reader, filters):
+        assert parallel_reader._should_parallelize(parallel_reader.list_log_files())
+        assert parallel_reader.search(**filters) == self._sequential(parallel_logs).search(**filters)
+
+    def test_line_cap_applies_in_file_order(self, parallel_logs, parallel_reader, monkeypatch):
+        monkeypatch.setattr(event_log_reader, "MAX_LINES_SCANNED", 100)
+        result = parallel_reader.search(query="ran", limit=1000)
+        assert result == self._sequential(parallel_logs).search(query="ran", limit=1000)
+        assert result["truncated"] is True
+        assert result["count"] == 144
+
+    def test_small_searches_stay_in_process(self, parallel_logs, monkeypatch):
+        monkeypatch.setattr(event_log_reader, "PARALLEL_MIN_FILES", 8)
+        reader = EventLogReader(
+            logs_folder_supplier=lambda: str(parallel_logs), logger=Mock(), parallel_workers=2
+        )
+        assert not reader._should_parallelize(reader.list_log_files())
+
+    def test_parallel_scan_is_opt_in(self, parallel_logs):
+        reader = EventLogReader(logs_folder_supplier=lambda: str(parallel_logs), logger=Mock())
+        assert not reader._should_parallelize(reader.list_log_files())
+        reader.search(query="ran", limit=10)
+        assert reader._pool is None
+
+    def test_pool_failure_falls_back_to_sequential(self, parallel_logs, monkeypatch):
+        reader = EventLogReader(
+            logs_folder_supplier=lambda: str(parallel_logs), logger=Mock(), parallel_workers=2
+        )
+        broken = Mock()
+        broken.submit.side_effect = OSError("no processes")
+        monkeypatch.setattr(reader, "_process_pool", lambda: broken)
+        result = reader.search(query="ran", limit=100)
+        assert result == self._sequential(parallel_logs).search(query="ran", limit=100)
+        assert reader._parallel_workers == 0
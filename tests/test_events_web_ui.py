@@ -72,6 +72,56 @@ class TestRenderSubscription:
         assert "any change" in html
         assert "badge" in html
 
+    def test_batching_rendered(self):
+        sub = _make_sub(batch_window_ms=250, batch_max_events=10, batch_coalesce=True)
+        html = render_subscriptions_page([sub])
+        assert "250 ms" in html
+        assert "max 10 events" in html
+        assert "coalesce" in html
+
+    def test_queue_rendered(self):
+        sub = _make_sub(queue_max_events=50, queue_overflow="drop_newest")
+        sub["stats"]["dropped"] = 12
+        html = render_subscriptions_page([sub])
+        assert "max 50 events, drop newest when full" in html
+        assert "dropped (queue full): 12" in html
+
+    def test_rate_limit_and_circuit_rendered(self):
+        sub = _make_sub(rate_limit_per_minute=30, rate_limit_burst=5)
+        sub["circuit"] = {"state": "open", "consecutive_failures": 3, "retry_in_seconds": 12.4}
+        html = render_subscriptions_page([sub])
+        assert "30 per minute, bursts of 5" in html
+        assert "not responding — deliveries paused" in html
+        assert "retry in 12s" in html
+
+        sub["circuit"] = {"state": "closed"}
+        assert "reachable" in render_subscriptions_page([sub])
+
+    def test_dispatcher_queue_stats_rendered(self):
+        stats = {
+            "running": True,
+            "events_sent": 40,
+            "events_failed": 0,
+            "queue_depth": 5,
+            "oldest_queued_seconds": 42.4,
+            "events_dropped": 3,
+            "deliveries_on_disk": 2,
+            "delivery_latency_ms": {"le_100": 30, "le_250": 8, "le_500": 2, "gt_60000": 0},
+        }
+        html = render_subscriptions_page([], dispatcher_stats=stats)
+        assert "queue 5 (oldest 42s)" in html
+        assert "2 spilled to disk" in html
+        assert "dropped 3" in html
+        assert "latency p50 ≤100 ms, p95 ≤250 ms" in html
+
+    def test_dispatcher_open_circuits_rendered(self):
+        stats = {
+            "running": True,
+            "circuits": {"hooks.example.com": {"state": "open", "retry_in_seconds": 20.0}},
+        }
+        html = render_subscriptions_page([], dispatcher_stats=stats)
+        assert "paused: hooks.example.com" in html
+
     def test_stats_rendered(self):
         sub = _make_sub()
         sub["stats"]["fires"] = 7
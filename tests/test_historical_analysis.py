@@ -1,6 +1,6 @@
 """
 Tests for mcp_server.tools.historical_analysis — window resolution, numeric
-summaries, frozen-sensor detection, and the change-log cap.
+summaries, frozen-sensor detection, the change-log cap, and the rollup store.
 """
 
 import importlib.util
@@ -68,12 +68,17 @@ _load_module_from_file(
     "mcp_server.common.influxdb", BASE / "common" / "influxdb" / "__init__.py"
 )
 
+rollups_mod = _load_module_from_file(
+    "mcp_server.tools.historical_analysis.rollups",
+    BASE / "tools" / "historical_analysis" / "rollups.py",
+)
 historical_mod = _load_module_from_file(
     "mcp_server.tools.historical_analysis.main",
     BASE / "tools" / "historical_analysis" / "main.py",
 )
 
 HistoricalAnalysisHandler = historical_mod.HistoricalAnalysisHandler
+HistoryRollups = rollups_mod.HistoryRollups
 InfluxDBQueryBuilder = queries_mod.InfluxDBQueryBuilder
 
 
@@ -492,3 +497,208 @@ class TestQueryBuilders:
         builder = InfluxDBQueryBuilder()
         query = builder.build_last_different_value_query("Front Door", "state", "closed")
         assert "\"state\" != 'closed'" in query
+
+    def test_aggregation_query_single_function_unchanged(self):
+        builder = InfluxDBQueryBuilder()
+        query = builder.build_aggregation_query("Thermostat", "temperatureInput1", "MEAN")
+        assert query.startswith('SELECT MEAN("temperatureInput1") FROM "device_changes"')
+
+    def test_aggregation_query_multiple_functions(self):
+        builder = InfluxDBQueryBuilder()
+        query = builder.build_aggregation_query(
+            "Thermostat", "temperatureInput1", ("MIN", "MAX"), group_by_time="1h"
+        )
+        assert 'MIN("temperatureInput1") AS "min", MAX("temperatureInput1") AS "max"' in query
+        assert "GROUP BY time(1h)" in query
+
+
+# 2026-08-10 00:00:00 UTC, on an hour and day boundary
+_NOW = 1786320000.0
+
+
+def _bucket(epoch, mn, mx, mean, count):
+    stamp = datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {"time": stamp, "min": mn, "max": mx, "mean": mean, "count": count}
+
+
+@pytest.fixture
+def rollups(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORY_ROLLUPS_ENABLED", "true")
+    client = MagicMock()
+    store = HistoryRollups(str(tmp_path / "rollups.sqlite"), client=client)
+    yield store
+    store.stop()
+
+
+def _make_hot(store, entity="Thermostat", prop="temperatureInput1"):
+    for _ in range(rollups_mod._HOT_MIN_CALLS):
+        store.record_call(entity, prop, now=_NOW - 60)
+
+
+class TestHistoryRollups:
+    def test_entities_become_hot_after_repeated_calls(self, rollups):
+        rollups.record_call("Thermostat", "temperatureInput1", now=_NOW)
+        assert rollups.hot_entities(_NOW) == []
+
+        _make_hot(rollups)
+        assert rollups.hot_entities(_NOW) == [("Thermostat", "temperatureInput1")]
+
+    def test_old_calls_do_not_count(self, rollups):
+        for _ in range(rollups_mod._HOT_MIN_CALLS):
+            rollups.record_call(
+                "Thermostat", "temperatureInput1",
+                now=_NOW - rollups_mod._HOT_WINDOW_SECONDS - 60,
+            )
+        assert rollups.hot_entities(_NOW) == []
+
+    def test_refresh_stores_complete_buckets_and_summarizes(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.return_value = [
+            _bucket(_NOW - 7200, 68.0, 70.0, 69.0, 10),
+            _bucket(_NOW - 3600, 70.0, 74.0, 72.0, 30),
+            _bucket(_NOW, 90.0, 90.0, 90.0, 1),  # still filling — excluded
+            _bucket(_NOW - 10800, None, None, None, None),  # empty bucket
+        ]
+
+        assert rollups.refresh(now=_NOW) == 1
+
+        summary = rollups.summarize("Thermostat", "temperatureInput1", _NOW - 7200)
+        assert summary["granularity"] == "hourly"
+        assert summary["min"] == 68.0
+        assert summary["max"] == 74.0
+        assert summary["count"] == 40
+        assert summary["mean"] == pytest.approx((69.0 * 10 + 72.0 * 30) / 40)
+        assert summary["first"] == 69.0
+        assert summary["covered_through"] == int(_NOW)
+
+        query = rollups._client.execute_query.call_args_list[0].args[0]
+        assert 'MIN("temperatureInput1") AS "min"' in query
+        assert "GROUP BY time(1h)" in query
+
+    def test_window_older_than_hourly_coverage_uses_daily(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.return_value = [
+            _bucket(_NOW - 40 * 86400, 60.0, 80.0, 70.0, 100),
+        ]
+        rollups.refresh(now=_NOW)
+
+        summary = rollups.summarize("Thermostat", "temperatureInput1", _NOW - 45 * 86400)
+        assert summary["granularity"] == "daily"
+        assert summary["count"] == 100
+
+    def test_refresh_after_downtime_rereads_the_gap(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.return_value = []
+        rollups.refresh(now=_NOW)
+
+        builder = rollups._query_builder
+        rollups._query_builder = MagicMock(wraps=builder)
+        rollups.refresh(now=_NOW + 5 * 86400)
+        hourly, daily = rollups._query_builder.build_aggregation_query.call_args_list
+        assert hourly.kwargs["time_range_days"] == 5
+        assert daily.kwargs["time_range_days"] == 5
+        covered_from = rollups._coverage("Thermostat", "temperatureInput1", "hourly")[0]
+        assert covered_from < _NOW
+
+    def test_refresh_after_long_downtime_restarts_coverage(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.return_value = []
+        rollups.refresh(now=_NOW)
+
+        later = _NOW + 40 * 86400
+        for _ in range(rollups_mod._HOT_MIN_CALLS):
+            rollups.record_call("Thermostat", "temperatureInput1", now=later - 60)
+        builder = rollups._query_builder
+        rollups._query_builder = MagicMock(wraps=builder)
+        rollups.refresh(now=later)
+        hourly, daily = rollups._query_builder.build_aggregation_query.call_args_list
+        assert hourly.kwargs["time_range_days"] == 31  # the full hourly backfill
+        assert daily.kwargs["time_range_days"] == 40
+        covered_from, covered_through = rollups._coverage("Thermostat", "temperatureInput1", "hourly")
+        assert covered_from > _NOW
+        assert covered_through == int(later)
+
+    def test_uncovered_entity_has_no_summary(self, rollups):
+        assert rollups.summarize("Thermostat", "temperatureInput1", _NOW - 86400) is None
+
+    def test_cold_entities_are_pruned(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.return_value = [
+            _bucket(_NOW - 3600, 68.0, 70.0, 69.0, 10),
+        ]
+        rollups.refresh(now=_NOW)
+
+        later = _NOW + rollups_mod._HOT_WINDOW_SECONDS + 60
+        rollups.refresh(now=later)
+        assert rollups.summarize("Thermostat", "temperatureInput1", _NOW - 7200) is None
+
+    def test_failed_entity_is_skipped(self, rollups):
+        _make_hot(rollups)
+        rollups._client.execute_query.side_effect = RuntimeError("mean of bool")
+        assert rollups.refresh(now=_NOW) == 0
+
+
+class TestRollupReports:
+    def _rollup(self, covered_through):
+        return {
+            "min": 60.0, "max": 75.0, "mean": 70.0, "count": 100, "buckets": 24,
+            "first": 66.0, "granularity": "hourly", "covered_through": covered_through,
+        }
+
+    def test_stats_span_rollup_and_tail(self, handler):
+        report = handler._build_entity_report(
+            label="Thermostat.temperatureInput1",
+            entity_name="Thermostat",
+            property_name="temperatureInput1",
+            records=_records([80.0, 70.0], key="temperatureInput1"),
+            value_key="temperatureInput1",
+            window=timedelta(days=7),
+            rollup=self._rollup(_NOW),
+        )
+        stats = report["stats"]
+        assert stats["min"] == 60.0
+        assert stats["max"] == 80.0
+        assert stats["sample_count"] == 102
+        assert stats["mean"] == pytest.approx((70.0 * 100 + 150.0) / 102)
+        assert stats["first"] == 66.0
+        assert stats["trend"] == "rising"
+        assert report["rollup"]["granularity"] == "hourly"
+
+    def test_rollup_path_queries_only_the_tail(self, handler, monkeypatch):
+        monkeypatch.setenv("HISTORY_ROLLUPS_ENABLED", "true")
+        end = datetime.now()
+        covered_through = int(end.timestamp()) // 3600 * 3600
+        handler.rollups = MagicMock()
+        handler.rollups.summarize.return_value = self._rollup(covered_through)
+        client = MagicMock()
+        client.execute_query.return_value = _records([71.0, 72.0], key="temperatureInput1")
+
+        report = handler._get_rollup_device_data(
+            "Thermostat", "temperatureInput1", timedelta(days=7),
+            end - timedelta(days=7), end, client, InfluxDBQueryBuilder(),
+        )
+
+        assert report["stats"]["sample_count"] == 102
+        query = client.execute_query.call_args.args[0]
+        assert f"time >= {covered_through * 1000}ms" in query
+        handler.rollups.record_call.assert_called_once_with("Thermostat", "temperatureInput1")
+
+    def test_short_windows_skip_rollups(self, handler, monkeypatch):
+        monkeypatch.setenv("HISTORY_ROLLUPS_ENABLED", "true")
+        handler.rollups = MagicMock()
+        end = datetime.now()
+        assert handler._get_rollup_device_data(
+            "Thermostat", "temperatureInput1", timedelta(hours=4),
+            end - timedelta(hours=4), end, MagicMock(), InfluxDBQueryBuilder(),
+        ) is None
+        handler.rollups.summarize.assert_not_called()
+
+    def test_disabled_rollups_skip_lookup(self, handler, monkeypatch):
+        monkeypatch.setenv("HISTORY_ROLLUPS_ENABLED", "false")
+        handler.rollups = MagicMock()
+        end = datetime.now()
+        assert handler._get_rollup_device_data(
+            "Thermostat", "temperatureInput1", timedelta(days=7),
+            end - timedelta(days=7), end, MagicMock(), InfluxDBQueryBuilder(),
+        ) is None
+        handler.rollups.summarize.assert_not_called()
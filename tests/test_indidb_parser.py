@@ -10,6 +10,8 @@ import pytest
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
 
+from mcp_server.adapters.indidb.incremental import parse_indidb_incremental  # noqa: E402
+import mcp_server.adapters.indidb.parser as parser_module  # noqa: E402
 from mcp_server.adapters.indidb.parser import parse_indidb, decode_element  # noqa: E402
 
 FIXTURE = Path(__file__).parent / "fixtures" / "sample_indidb.xml"
@@ -109,3 +111,131 @@ class TestMalformedFile:
         bad.write_text("<?xml version='1.0'?><Database type='dict'><TriggerList type='vec")
         with pytest.raises(Exception):
             parse_indidb(str(bad))
+
+
+class TestBackends:
+    @pytest.mark.skipif(parser_module.lxml_etree is None, reason="lxml not installed")
+    def test_lxml_matches_etree(self, parsed, tmp_path):
+        assert parse_indidb(str(FIXTURE), backend="lxml") == parsed
+
+        nested = tmp_path / "nested.indiDb"
+        nested.write_text(
+            "<?xml version='1.0'?><Database type='dict'><TriggerList type='vector'>"
+            "<Trigger type='dict'><ID type='integer'>1</ID><!-- note -->"
+            "<TriggerList type='vector'><Trigger type='dict'><ID type='integer'>9</ID>"
+            "</Trigger></TriggerList></Trigger></TriggerList></Database>"
+        )
+        assert parse_indidb(str(nested), backend="lxml") == parse_indidb(str(nested))
+
+    def test_missing_lxml_falls_back_to_etree(self, parsed, monkeypatch):
+        monkeypatch.setattr(parser_module, "lxml_etree", None)
+        assert parser_module.available_backends() == ["etree"]
+        assert parse_indidb(str(FIXTURE), backend="lxml") == parsed
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            parse_indidb(str(FIXTURE), backend="sax")
+
+    def test_gc_state_is_restored(self):
+        import gc
+
+        assert gc.isenabled()
+        parse_indidb(str(FIXTURE))
+        assert gc.isenabled()
+
+    def test_overlapping_pauses_share_one_disable(self):
+        import gc
+
+        first = parser_module._gc_paused()
+        second = parser_module._gc_paused()
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)
+        assert not gc.isenabled()
+        second.__exit__(None, None, None)
+        assert gc.isenabled()
+
+    def test_pause_leaves_disabled_gc_disabled(self):
+        import gc
+
+        gc.disable()
+        try:
+            with parser_module._gc_paused():
+                pass
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+
+def _contents(parsed):
+    return (
+        parsed.triggers,
+        parsed.schedules,
+        parsed.action_groups,
+        parsed.device_names,
+        parsed.variable_names,
+    )
+
+
+class TestIncrementalParse:
+    def test_warm_reparse_leaves_gc_running(self, monkeypatch):
+        previous, _ = parse_indidb_incremental(str(FIXTURE))
+        pauses = []
+        monkeypatch.setattr(parser_module.gc, "disable", lambda: pauses.append(True))
+        parse_indidb_incremental(str(FIXTURE), previous)
+        assert pauses == []
+        parse_indidb_incremental(str(FIXTURE))
+        assert pauses == [True]
+
+    def test_cold_parse_matches_full_parse(self, parsed):
+        incremental, changed = parse_indidb_incremental(str(FIXTURE))
+        assert _contents(incremental) == _contents(parsed)
+        assert len(changed) == 6
+
+    def test_only_edited_items_are_decoded(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        db.write_text(FIXTURE.read_text())
+        previous, _ = parse_indidb_incremental(str(db))
+
+        db.write_text(FIXTURE.read_text().replace("Camera sees a person", "Camera sees a cat"))
+        current, changed = parse_indidb_incremental(str(db), previous)
+
+        assert changed == {("trigger", 4000002)}
+        assert current.triggers[4000002]["Name"] == "Camera sees a cat"
+        assert current.triggers[4000001] is previous.triggers[4000001]
+        assert current.action_groups[3000001] is previous.action_groups[3000001]
+        assert _contents(current) == _contents(parse_indidb(str(db)))
+
+    def test_removed_container_is_reported(self, tmp_path):
+        text = FIXTURE.read_text()
+        start = text.index("<Trigger type=\"dict\">", text.index("Camera sees a person"))
+        end = text.index("</Trigger>", start) + len("</Trigger>")
+        db = tmp_path / "db.indiDb"
+        db.write_text(text)
+        previous, _ = parse_indidb_incremental(str(db))
+
+        db.write_text(text[:start] + text[end:])
+        current, changed = parse_indidb_incremental(str(db), previous)
+
+        assert changed == {("trigger", 4000003)}
+        assert 4000003 not in current.triggers
+
+    def test_same_named_nested_element(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        db.write_text(
+            "<?xml version='1.0'?><Database type='dict'><ActionGroupList type='vector'>"
+            "<ActionGroup type='dict'><ID type='integer'>1</ID>"
+            "<ActionGroup type='dict'><ID type='integer'>99</ID></ActionGroup>"
+            "<Empty/></ActionGroup>"
+            "<ActionGroup type='dict'><ID type='integer'>2</ID></ActionGroup>"
+            "</ActionGroupList></Database>"
+        )
+        current, _ = parse_indidb_incremental(str(db))
+        assert _contents(current) == _contents(parse_indidb(str(db)))
+        assert set(current.action_groups) == {1, 2}
+
+    def test_torn_file_raises(self, tmp_path):
+        torn = tmp_path / "torn.indiDb"
+        torn.write_text(FIXTURE.read_text()[:-200])
+        with pytest.raises(ValueError):
+            parse_indidb_incremental(str(torn))
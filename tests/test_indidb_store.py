@@ -6,6 +6,8 @@ reverse-reference index built over the fixture database.
 import os
 import shutil
 import sys
+import threading
+import time
 from pathlib import Path
 from unittest.mock import Mock
 
@@ -14,6 +16,7 @@ import pytest
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
 
+from mcp_server.adapters.indidb.reverse_index import Reference, ReverseIndex  # noqa: E402
 from mcp_server.adapters.indidb.store import IndiDbStructureStore  # noqa: E402
 
 FIXTURE = Path(__file__).parent / "fixtures" / "sample_indidb.xml"
@@ -143,3 +146,354 @@ class TestReverseIndex:
         assert ("action_group", 3000001) in keys
         assert ("trigger", 4000002) in keys
         assert all(r["confidence"] == "heuristic" for r in heuristic)
+
+    def test_lookups_are_served_from_the_precomputed_closure(self, store, monkeypatch):
+        index = store._ensure_fresh().reverse_index
+        expected = store.find_references("device", 1000111)
+
+        def no_walk(ag_id):
+            raise AssertionError("closure should be precomputed")
+
+        monkeypatch.setattr(index, "_walk_exec_parents", no_walk)
+        assert store.find_references("device", 1000111) == expected
+        assert store.find_references("variable", 2000999)
+
+    def test_callers_can_modify_results_without_touching_the_cache(self, store):
+        first = store.find_references("device", 1000111)
+        chained = next(r for r in first if r.get("via_action_groups"))
+        chained["name"] = "decorated"
+        chained["via_action_groups"].append(0)
+
+        again = store.find_references("device", 1000111)
+        assert all("name" not in r for r in again)
+        assert all(0 not in r.get("via_action_groups", []) for r in again)
+
+    def test_execution_cycle_terminates(self):
+        index = ReverseIndex()
+        index.add(("device", 1), Reference("action_group", 10, "acts_on"))
+        index.add_exec_parent(10, "action_group", 11)
+        index.add_exec_parent(11, "action_group", 10)
+        index.add_exec_parent(11, "trigger", 20)
+        index.freeze()
+
+        refs = {
+            (r["entity_type"], r["id"]): r.get("via_action_groups")
+            for r in index.references_to("device", 1)
+        }
+        assert refs == {
+            ("action_group", 10): [11, 10],
+            ("action_group", 11): [10],
+            ("trigger", 20): [11, 10],
+        }
+
+    def test_mutation_drops_cached_results(self):
+        index = ReverseIndex()
+        index.add(("device", 1), Reference("action_group", 10, "acts_on"))
+        index.freeze()
+        assert len(index.references_to("device", 1)) == 1
+
+        index.add_exec_parent(10, "trigger", 20)
+        index.freeze()
+        assert {r["id"] for r in index.references_to("device", 1)} == {10, 20}
+
+    def _chain_index(self):
+        # trigger 20 -> AG 10 -> AG 11 -> device 1; trigger 21 -> AG 12 -> device 2
+        index = ReverseIndex()
+        index.add(("device", 1), Reference("action_group", 11, "acts_on"))
+        index.add(("action_group", 11), Reference("action_group", 10, "executes"))
+        index.add_exec_parent(11, "action_group", 10)
+        index.add(("action_group", 10), Reference("trigger", 20, "executes"))
+        index.add_exec_parent(10, "trigger", 20)
+        index.add(("device", 2), Reference("action_group", 12, "acts_on"))
+        index.add(("action_group", 12), Reference("trigger", 21, "executes"))
+        index.add_exec_parent(12, "trigger", 21)
+        index.freeze()
+        return index
+
+    def test_patched_copy_shares_untouched_buckets(self):
+        source = self._chain_index()
+        before = _index_snapshot(source)
+
+        patched = source.copy()
+        patched.remove_container("trigger", 20)
+        patched.add(("action_group", 10), Reference("trigger", 22, "executes"))
+        patched.add_exec_parent(10, "trigger", 22)
+        patched.freeze()
+
+        assert _index_snapshot(source) == before
+        assert patched.direct[("device", 2)] is source.direct[("device", 2)]
+        assert patched.exec_parents[12] is source.exec_parents[12]
+        assert patched.direct[("action_group", 10)] is not source.direct[("action_group", 10)]
+        assert {r["id"] for r in source.references_to("device", 1)} == {11, 10, 20}
+        assert {r["id"] for r in patched.references_to("device", 1)} == {11, 10, 22}
+
+    def test_freeze_recomputes_only_reachable_closures(self, monkeypatch):
+        patched = self._chain_index().copy()
+        patched.add(("action_group", 10), Reference("trigger", 22, "executes"))
+        patched.add_exec_parent(10, "trigger", 22)
+
+        walked = []
+        walk = ReverseIndex._walk_exec_parents
+        monkeypatch.setattr(
+            ReverseIndex,
+            "_walk_exec_parents",
+            lambda self, ag_id: walked.append(ag_id) or walk(self, ag_id),
+        )
+        patched.freeze()
+        assert sorted(walked) == [10, 11]
+
+        rebuilt = ReverseIndex(
+            direct=patched.direct,
+            exec_parents=patched.exec_parents,
+            container_targets=patched.container_targets,
+        )
+        rebuilt.freeze()
+        assert patched._exec_closure == rebuilt._exec_closure
+
+    def test_lookups_before_freeze_see_graph_changes(self):
+        index = self._chain_index()
+        index.add_exec_parent(10, "trigger", 22)
+        assert {r["id"] for r in index.references_to("device", 1)} == {11, 10, 20, 22}
+
+
+def _index_snapshot(index):
+    direct = {
+        target: sorted(
+            (r.container_kind, r.container_id, r.role, r.detail, r.confidence) for r in refs
+        )
+        for target, refs in index.direct.items()
+    }
+    parents = {ag: sorted(p) for ag, p in index.exec_parents.items()}
+    return direct, parents
+
+
+class TestIncrementalRefresh:
+    def _refresh(self, store, db, text, stamp):
+        db.write_text(text)
+        os.utime(db, (stamp, stamp))
+        return store._ensure_fresh()
+
+    def test_patched_index_matches_full_build(self, tmp_path):
+        from mcp_server.adapters.indidb.reverse_index import build_reverse_index
+
+        db = tmp_path / "db.indiDb"
+        text = FIXTURE.read_text()
+        store = make_store(db)
+        first = self._refresh(store, db, text, 1)
+
+        # Repoint the camera trigger's plugin config from the Sonos to the door sensor
+        edited = text.replace(
+            '<cameraDevice type="string">1000333</cameraDevice>',
+            '<cameraDevice type="string">1000222</cameraDevice>',
+        )
+        second = self._refresh(store, db, edited, 2)
+
+        assert second is not first
+        assert _index_snapshot(second.reverse_index) == _index_snapshot(build_reverse_index(second))
+        # The previous snapshot's index is left as it was for readers still holding it
+        assert _index_snapshot(first.reverse_index) == _index_snapshot(build_reverse_index(first))
+        sonos = {(r["entity_type"], r["id"]) for r in store.find_references("device", 1000333)}
+        assert ("trigger", 4000002) not in sonos
+
+    def test_removed_action_group_matches_full_build(self, tmp_path):
+        from mcp_server.adapters.indidb.reverse_index import build_reverse_index
+
+        db = tmp_path / "db.indiDb"
+        text = FIXTURE.read_text()
+        store = make_store(db)
+        self._refresh(store, db, text, 1)
+
+        # Delete the Goodnight action group (it executes Evening Scene)
+        start = text.index("<ActionGroup type=\"dict\">", text.index("</ActionGroup>"))
+        end = text.index("</ActionGroup>", text.index("Goodnight")) + len("</ActionGroup>")
+        parsed = self._refresh(store, db, text[:start] + text[end:], 2)
+
+        assert 3000002 not in parsed.action_groups
+        assert _index_snapshot(parsed.reverse_index) == _index_snapshot(build_reverse_index(parsed))
+
+    def test_full_mode_still_available(self, tmp_path):
+        store = IndiDbStructureStore(
+            db_path_supplier=lambda: str(FIXTURE), logger=Mock(), incremental=False
+        )
+        parsed = store._ensure_fresh()
+        assert parsed.fingerprints == {}
+        assert parsed.counts() == {"triggers": 3, "schedules": 1, "action_groups": 2}
+
+
+class TestBackgroundRefresh:
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_watcher_swaps_in_new_snapshot(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        shutil.copy(FIXTURE, db)
+        store = make_store(db, throttle=0.01)
+        store.start()
+        try:
+            first = store._ensure_fresh()
+            db.write_text(FIXTURE.read_text().replace("Camera sees a person", "Camera sees a cat"))
+            os.utime(db, (5, 5))
+            assert self._wait_for(lambda: store._ensure_fresh() is not first)
+            assert store.lookup_name("trigger", 4000002) == "Camera sees a cat"
+        finally:
+            store.stop()
+
+    def test_readers_do_not_wait_for_a_parse_in_progress(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        shutil.copy(FIXTURE, db)
+        store = make_store(db)
+        first = store._ensure_fresh()
+
+        release = threading.Event()
+        real_parse = store._parse
+
+        def slow_parse(path):
+            release.wait(5)
+            return real_parse(path)
+
+        store._parse = slow_parse
+        os.utime(db, (5, 5))
+        refresher = threading.Thread(target=store._ensure_fresh)
+        refresher.start()
+        try:
+            assert self._wait_for(store._lock.locked)
+            started = time.monotonic()
+            assert store._ensure_fresh() is first
+            assert time.monotonic() - started < 1.0
+        finally:
+            release.set()
+            refresher.join(5)
+        assert store._ensure_fresh() is not first
+
+    def test_freshness_reports_lag_when_snapshot_is_behind(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        shutil.copy(FIXTURE, db)
+        store = make_store(db)
+        assert store.freshness()["lag_seconds"] == 0
+
+        stamp = time.time() - 100
+        db.write_text("<?xml version='1.0'?><Database type='dict'><Trigg")
+        os.utime(db, (stamp, stamp))
+        fresh = store.freshness()
+        assert fresh["available"] is True
+        assert 99 <= fresh["lag_seconds"] <= 110
+
+    def test_path_is_resolved_again_only_when_stat_fails(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        shutil.copy(FIXTURE, db)
+        paths = [str(db)]
+        supplier = Mock(side_effect=lambda: paths[0])
+        store = IndiDbStructureStore(
+            db_path_supplier=supplier, logger=Mock(), stat_throttle_seconds=0.0
+        )
+        first = store._ensure_fresh()
+        for stamp in (5, 6):
+            os.utime(db, (stamp, stamp))
+            store._ensure_fresh()
+        assert supplier.call_count == 1
+
+        moved = tmp_path / "moved.indiDb"
+        db.rename(moved)
+        paths[0] = str(moved)
+        os.utime(moved, (7, 7))
+        assert store._ensure_fresh() is not first
+        assert supplier.call_count == 2
+
+    def test_idle_watcher_backs_off_until_read(self, tmp_path):
+        store = IndiDbStructureStore(
+            db_path_supplier=lambda: str(FIXTURE),
+            logger=Mock(),
+            stat_throttle_seconds=2.0,
+            idle_after_seconds=300.0,
+        )
+        assert store._next_poll_interval(2.0) == 2.0
+
+        store._last_read -= 301
+        intervals = [2.0]
+        for _ in range(8):
+            intervals.append(store._next_poll_interval(intervals[-1]))
+        assert intervals[1:4] == [4.0, 8.0, 16.0]
+        assert intervals[-1] == 60.0
+
+        assert not store._wake.is_set()
+        store._ensure_fresh()
+        assert store._wake.is_set()
+        assert store._next_poll_interval(60.0) == 2.0
+
+
+class TestSnapshot:
+    def _store(self, db, snapshot):
+        return IndiDbStructureStore(
+            db_path_supplier=lambda: str(db),
+            logger=Mock(),
+            stat_throttle_seconds=0.0,
+            snapshot_path=str(snapshot),
+        )
+
+    def _fail_parse(self, path):
+        raise AssertionError("should have loaded the snapshot")
+
+    def test_restart_loads_snapshot_without_parsing(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        snapshot = tmp_path / "snapshot.pickle"
+        shutil.copy(FIXTURE, db)
+        first = self._store(db, snapshot)._ensure_fresh()
+        assert snapshot.exists()
+
+        restarted = self._store(db, snapshot)
+        restarted._parse = self._fail_parse
+        loaded = restarted._ensure_fresh()
+        assert loaded.counts() == first.counts()
+        assert loaded.fingerprints == first.fingerprints
+        assert _index_snapshot(loaded.reverse_index) == _index_snapshot(first.reverse_index)
+        assert restarted.lookup_name("trigger", 4000002) == "Camera sees a person"
+
+    def test_changed_file_ignores_snapshot(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        snapshot = tmp_path / "snapshot.pickle"
+        shutil.copy(FIXTURE, db)
+        self._store(db, snapshot)._ensure_fresh()
+
+        db.write_text(FIXTURE.read_text().replace("Camera sees a person", "Camera sees a cat"))
+        restarted = self._store(db, snapshot)
+        assert restarted.lookup_name("trigger", 4000002) == "Camera sees a cat"
+
+    def test_same_mtime_and_size_but_new_content_ignores_snapshot(self, tmp_path):
+        db = tmp_path / "db.indiDb"
+        snapshot = tmp_path / "snapshot.pickle"
+        shutil.copy(FIXTURE, db)
+        self._store(db, snapshot)._ensure_fresh()
+
+        stat = db.stat()
+        db.write_text(FIXTURE.read_text().replace("Camera sees a person", "Camera sees a nobody"))
+        os.utime(db, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert db.stat().st_size == stat.st_size
+        restarted = self._store(db, snapshot)
+        assert restarted.lookup_name("trigger", 4000002) == "Camera sees a nobody"
+
+    def test_schema_mismatch_and_garbage_are_ignored(self, tmp_path, monkeypatch):
+        from mcp_server.adapters.indidb import snapshot as snapshot_module
+
+        db = tmp_path / "db.indiDb"
+        snapshot = tmp_path / "snapshot.pickle"
+        shutil.copy(FIXTURE, db)
+        self._store(db, snapshot)._ensure_fresh()
+
+        monkeypatch.setattr(snapshot_module, "SNAPSHOT_SCHEMA_VERSION", 999)
+        assert snapshot_module.load_snapshot(str(snapshot), str(db), *_stat_key(db)) is None
+        monkeypatch.undo()
+        assert snapshot_module.load_snapshot(str(snapshot), str(db), *_stat_key(db)) is not None
+
+        snapshot.write_bytes(b"not a pickle")
+        assert snapshot_module.load_snapshot(str(snapshot), str(db), *_stat_key(db)) is None
+        assert self._store(db, snapshot).lookup_name("trigger", 4000002) == "Camera sees a person"
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
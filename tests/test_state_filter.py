@@ -7,9 +7,12 @@ cover the coercion that makes comparisons type-tolerant, plus regression
 guards proving already-typed device states still behave.
 """
 
+import re
 import sys
 from pathlib import Path
 
+import pytest
+
 
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
@@ -136,3 +139,46 @@ class TestCoercionHelpers:
         assert StateFilter._values_equal("75", 75) is True
         assert StateFilter._values_equal("open", "open") is True
         assert StateFilter._values_equal("open", "closed") is False
+
+
+class TestCompile:
+    """compile() predicates agree with matches_state and reuse their operands."""
+
+    ENTITIES = [
+        {"value": "true"}, {"value": "75"}, {"value": "open"}, {"value": ""},
+        {"onState": True, "states": {"temperature": 81.5, "mode": "heat"}},
+        {"onState": False, "states": {"temperature": "n/a"}},
+        {"brightnessLevel": 50},
+    ]
+    CONDITIONS = [
+        {"value": True}, {"value": 75}, {"value": "open"},
+        {"value": {"ne": ""}}, {"value": {"contains": "pe"}},
+        {"value": {"regex": r"\d+"}}, {"value": {"gt": 70, "lte": 75}},
+        {"onState": True, "temperature": {"gt": 80}}, {"mode": {"eq": "heat"}},
+        {"brightnessLevel": {"gte": 50, "unknown": 1}}, {"temperature": {"lt": "x"}},
+    ]
+
+    def test_agrees_with_matches_state(self):
+        for conditions in self.CONDITIONS:
+            matches = StateFilter.compile(conditions)
+            for entity in self.ENTITIES:
+                assert matches(entity) is StateFilter.matches_state(entity, conditions), (
+                    conditions, entity,
+                )
+
+    def test_regex_compiled_once(self, monkeypatch):
+        matches = StateFilter.compile({"value": {"regex": r"ABC\d+"}})
+        monkeypatch.setattr(re, "compile", None)
+        monkeypatch.setattr(re, "match", None)
+        assert matches({"value": "ABC123"}) is True
+        assert matches({"value": "XYZ"}) is False
+
+    def test_invalid_regex_fails_when_tested(self):
+        matches = StateFilter.compile({"value": {"regex": "("}})
+        with pytest.raises(re.error):
+            matches({"value": "x"})
+
+    def test_filter_by_state_uses_compiled_predicate(self):
+        entities = [{"brightnessLevel": level} for level in (10, 60, 90)]
+        filtered = StateFilter.filter_by_state(entities, {"brightnessLevel": {"gt": 50}})
+        assert filtered == entities[1:]
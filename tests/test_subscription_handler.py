@@ -156,6 +156,70 @@ class TestCreateSubscription:
         )
         assert result["success"] is False
 
+    def test_create_with_batch(self, handler):
+        result = handler.create_subscription(
+            webhook_url="https://example.com/hook",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            batch={"window_ms": 500, "max_events": 20, "coalesce": True},
+        )
+        assert result["success"] is True
+        assert result["data"]["batch_window_ms"] == 500
+        assert result["data"]["batch_max_events"] == 20
+        assert result["data"]["batch_coalesce"] is True
+
+    def test_create_invalid_batch(self, handler):
+        for batch in ({"max_events": 5}, {"window_ms": 0}, {"window_ms": 100, "max_events": 0}, "fast"):
+            result = handler.create_subscription(
+                webhook_url="https://example.com/hook",
+                entity_type="device",
+                conditions={"onState": False},
+                batch=batch,
+            )
+            assert result["success"] is False, batch
+
+    def test_create_with_queue(self, handler):
+        result = handler.create_subscription(
+            webhook_url="https://example.com/hook",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            queue={"max_events": 50, "overflow": "coalesce"},
+        )
+        assert result["success"] is True
+        assert result["data"]["queue_max_events"] == 50
+        assert result["data"]["queue_overflow"] == "coalesce"
+
+    def test_create_invalid_queue(self, handler):
+        for queue in ({"max_events": 0}, {"overflow": "block"}, "small"):
+            result = handler.create_subscription(
+                webhook_url="https://example.com/hook",
+                entity_type="device",
+                conditions={"onState": False},
+                queue=queue,
+            )
+            assert result["success"] is False, queue
+
+    def test_create_with_rate_limit(self, handler):
+        result = handler.create_subscription(
+            webhook_url="https://example.com/hook",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            rate_limit={"per_minute": 30, "burst": 5},
+        )
+        assert result["success"] is True
+        assert result["data"]["rate_limit_per_minute"] == 30
+        assert result["data"]["rate_limit_burst"] == 5
+
+    def test_create_invalid_rate_limit(self, handler):
+        for rate_limit in ({"burst": 5}, {"per_minute": 0}, {"per_minute": 10, "burst": 0}, 10):
+            result = handler.create_subscription(
+                webhook_url="https://example.com/hook",
+                entity_type="device",
+                conditions={"onState": False},
+                rate_limit=rate_limit,
+            )
+            assert result["success"] is False, rate_limit
+
     def test_create_any_change_variable_ok(self, handler):
         result = handler.create_subscription(
             webhook_url="https://example.com/hook",
@@ -214,6 +278,17 @@ class TestListSubscriptions:
         assert result["success"] is True
         assert result["data"]["subscription_id"] == sub_id
 
+    def test_list_includes_circuit_state(self, handler):
+        create_result = handler.create_subscription(
+            webhook_url="https://a.com", entity_type="device", conditions={"onState": True}
+        )
+        sub_id = create_result["data"]["subscription_id"]
+
+        listed = handler.list_subscriptions()["data"]["subscriptions"][0]
+        assert listed["circuit"] == {"state": "closed"}
+        single = handler.list_subscriptions(subscription_id=sub_id)["data"]
+        assert single["circuit"] == {"state": "closed"}
+
     def test_list_nonexistent_id(self, handler):
         result = handler.list_subscriptions(subscription_id="nonexistent")
         assert result["success"] is False
@@ -223,6 +298,10 @@ class TestListSubscriptions:
         assert "dispatcher" in result["data"]
         assert "events_sent" in result["data"]["dispatcher"]
 
+    def test_list_includes_dwell_timer_stats(self, handler):
+        result = handler.list_subscriptions()
+        assert result["data"]["dwell_timers"]["pending"] == 0
+
     def test_list_redacts_auth_token(self, handler):
         """Auth tokens should be redacted in list output."""
         handler.create_subscription(
@@ -2,10 +2,12 @@
 Tests for subscription manager — CRUD and state change evaluation.
 """
 
+import json
 import sys
+import threading
 import time
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -13,6 +15,9 @@ import pytest
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
 
+from mcp_server.events import subscription_manager
+from mcp_server.events.dwell_timer import DwellTimerQueue
+from mcp_server.events.event_model import Event
 from mcp_server.events.subscription_manager import SubscriptionManager
 from mcp_server.events.subscription_store import SubscriptionStore
 
@@ -396,6 +401,270 @@ class TestDwellTimerIntegration:
         manager.shutdown()
 
 
+class TestDwellTimerQueue:
+    """One scheduler thread, heap ordered; persistence and metrics."""
+
+    @staticmethod
+    def _sub(subscription_id):
+        return Mock(subscription_id=subscription_id)
+
+    def test_single_thread_for_many_dwells(self):
+        fired = []
+        queue = DwellTimerQueue(callback=lambda sub, event: fired.append(event), logger=Mock())
+        threads_before = threading.active_count()
+        for entity_id in range(200):
+            queue.start_dwell(self._sub("s"), entity_id, 0.2, entity_id)
+        assert threading.active_count() == threads_before + 1
+        assert queue.get_pending_count() == 200
+        deadline = time.time() + 3
+        while len(fired) < 200 and time.time() < deadline:
+            time.sleep(0.05)
+        assert sorted(fired) == list(range(200))
+        queue.cancel_all()
+
+    def test_fires_in_deadline_order_and_cancel(self):
+        fired = []
+        queue = DwellTimerQueue(callback=lambda sub, event: fired.append(event), logger=Mock())
+        queue.start_dwell(self._sub("late"), "late", 0.4, 1)
+        queue.start_dwell(self._sub("early"), "early", 0.1, 1)
+        queue.start_dwell(self._sub("gone"), "gone", 0.2, 1)
+        queue.cancel_dwell("gone", 1)
+        time.sleep(0.7)
+        assert fired == ["early", "late"]
+        stats = queue.get_stats()
+        assert stats["pending"] == 0
+        assert stats["fired"] == 2
+        assert stats["cancelled"] == 1
+        assert stats["max_lateness_seconds"] >= 0
+        queue.cancel_all()
+
+    def test_stale_entries_compacted(self):
+        queue = DwellTimerQueue(callback=Mock(), logger=Mock())
+        for entity_id in range(500):
+            queue.start_dwell(self._sub("s"), None, 3600, entity_id)
+            queue.cancel_dwell("s", entity_id)
+        assert len(queue._heap) <= 65
+        queue.cancel_all()
+
+    def test_wall_clock_jump_does_not_fire_dwells(self, monkeypatch):
+        fired = []
+        queue = DwellTimerQueue(callback=lambda sub, event: fired.append(event), logger=Mock())
+        queue.start_dwell(self._sub("s"), "held", 3600, 1)
+        wall_clock = time.time
+        monkeypatch.setattr(time, "time", lambda: wall_clock() + 7200)
+        queue.start_dwell(self._sub("s"), "wake", 0.05, 2)
+        time.sleep(0.3)
+        assert fired == ["wake"]
+        assert queue.get_pending_count() == 1
+        queue.cancel_all()
+
+    def test_persist_and_restore(self, tmp_path):
+        path = str(tmp_path / "dwell_timers.json")
+        sub = self._sub("s1")
+        queue = DwellTimerQueue(callback=Mock(), logger=Mock(), state_path=path)
+        queue.start_dwell(sub, Event(event_type="device.state_changed"), 3600, 7)
+        assert queue.persist() == 1
+        queue.cancel_all()
+
+        record = json.loads(open(path).read())["dwells"][0]
+        assert record["subscription_id"] == "s1"
+        assert record["deadline"] > time.time() + 3500
+
+        restored = DwellTimerQueue(callback=Mock(), logger=Mock(), state_path=path)
+        assert restored.restore(lambda subscription_id, entity_id: sub) == 1
+        assert restored.get_pending_count() == 1
+        # Consumed, so a second restore (or a crash) can't replay it
+        assert restored.restore(lambda subscription_id, entity_id: sub) == 0
+        restored.cancel_all()
+
+    def test_overdue_restored_dwell_fires_immediately(self, tmp_path):
+        path = str(tmp_path / "dwell_timers.json")
+        event = Event(event_type="device.state_changed").to_dict()
+        with open(path, "w") as f:
+            json.dump({"dwells": [
+                {"subscription_id": "s1", "entity_id": 7, "deadline": time.time() - 30, "event": event},
+            ]}, f)
+        callback = Mock()
+        queue = DwellTimerQueue(callback=callback, logger=Mock(), state_path=path)
+        sub = self._sub("s1")
+        assert queue.restore(lambda subscription_id, entity_id: sub) == 1
+        time.sleep(0.3)
+        assert callback.call_count == 1
+        assert callback.call_args[0][1].event_id == event["event_id"]
+        assert queue.get_stats()["last_lateness_seconds"] >= 30
+        queue.cancel_all()
+
+
+class TestRouting:
+    """evaluate_* only evaluates subscriptions the change can affect."""
+
+    @pytest.fixture
+    def manager(self):
+        return SubscriptionManager(logger=Mock())
+
+    def _evaluated(self, manager, orig, new):
+        subscription = subscription_manager.Subscription
+        with patch.object(subscription, "matches", autospec=True,
+                          side_effect=subscription.matches) as spy:
+            matches = manager.evaluate_device_change(orig, new)
+        return matches, spy.call_count
+
+    def test_other_devices_not_evaluated(self, manager):
+        for device_id in range(1, 200):
+            manager.create(webhook_url="https://a.com", entity_type="device",
+                           entity_id=device_id, conditions={"onState": True})
+        orig = {"id": 7, "name": "Lamp", "onState": False}
+        new = {"id": 7, "name": "Lamp", "onState": True}
+        matches, calls = self._evaluated(manager, orig, new)
+        assert [sub.entity_id for sub, _ in matches] == [7]
+        assert calls == 2  # old and new state of the one routed subscription
+
+    def test_unwatched_key_change_not_evaluated(self, manager):
+        manager.create(webhook_url="https://a.com", entity_type="device",
+                       conditions={"temperature": {"gt": 80}})
+        orig = {"id": 1, "name": "Sensor", "states": {"temperature": 70, "humidity": 40}}
+        new = {"id": 1, "name": "Sensor", "states": {"temperature": 70, "humidity": 45}}
+        matches, calls = self._evaluated(manager, orig, new)
+        assert matches == []
+        assert calls == 0
+
+    def test_top_level_key_outside_standard_states(self, manager):
+        """A condition on any top-level property is routed, like StateFilter reads it."""
+        manager.create(webhook_url="https://a.com", entity_type="device",
+                       conditions={"errorState": "timeout"})
+        orig = {"id": 1, "name": "Dimmer", "errorState": "", "states": {"level": 1}}
+        new = {"id": 1, "name": "Dimmer", "errorState": "timeout", "states": {"level": 2}}
+        matches, _ = self._evaluated(manager, orig, new)
+        assert len(matches) == 1
+
+    def test_matches_keep_creation_order(self, manager):
+        first = manager.create(webhook_url="https://a.com", entity_type="device",
+                               conditions={"onState": True})
+        second = manager.create(webhook_url="https://b.com", entity_type="device",
+                                entity_id=5, conditions={"brightness": {"gt": 10}, "onState": True})
+        third = manager.create(webhook_url="https://c.com", entity_type="device",
+                               conditions={"brightness": {"gt": 10}})
+        orig = {"id": 5, "name": "Lamp", "onState": False, "brightness": 0}
+        new = {"id": 5, "name": "Lamp", "onState": True, "brightness": 50}
+        matches = manager.evaluate_device_change(orig, new)
+        assert [sub for sub, _ in matches] == [first, second, third]
+
+    def test_deleted_and_restored_subscriptions_are_routed(self, tmp_path):
+        store = SubscriptionStore(str(tmp_path / "subs.json"), logger=Mock())
+        manager = SubscriptionManager(logger=Mock(), store=store)
+        sub = manager.create(webhook_url="https://a.com", entity_type="variable",
+                             entity_id=3, conditions={"value": "on"})
+        orig = {"id": 3, "name": "mode", "value": "off"}
+        new = {"id": 3, "name": "mode", "value": "on"}
+
+        restored = SubscriptionManager(logger=Mock(), store=store)
+        restored.load_from_store()
+        assert len(restored.evaluate_variable_change(orig, new)) == 1
+
+        manager.delete(sub.subscription_id)
+        assert manager.evaluate_variable_change(orig, new) == []
+
+
+class FakeDevice:
+    """Stands in for indigo.Device: attribute access, and dict() counted."""
+
+    conversions = 0
+
+    def __init__(self, **props):
+        self._props = props
+        for key, value in props.items():
+            setattr(self, key, value)
+
+    def keys(self):
+        FakeDevice.conversions += 1
+        return self._props.keys()
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+
+class TestDeviceObjectUpdates:
+    """evaluate_device_update converts device objects only when needed."""
+
+    @pytest.fixture
+    def manager(self):
+        FakeDevice.conversions = 0
+        return SubscriptionManager(logger=Mock())
+
+    def test_unsubscribed_device_not_converted(self, manager):
+        manager.create(webhook_url="https://a.com", entity_type="device",
+                       entity_id=1, conditions={"onState": True})
+        orig = FakeDevice(id=2, name="Other", onState=False, states={})
+        new = FakeDevice(id=2, name="Other", onState=True, states={})
+        assert manager.evaluate_device_update(orig, new) == []
+        assert FakeDevice.conversions == 0
+
+    def test_unwatched_change_not_converted(self, manager):
+        manager.create(webhook_url="https://a.com", entity_type="device",
+                       conditions={"temperature": {"gt": 80}})
+        orig = FakeDevice(id=1, name="Sensor", states={"temperature": 70, "humidity": 40})
+        new = FakeDevice(id=1, name="Sensor", states={"temperature": 70, "humidity": 41})
+        assert manager.evaluate_device_update(orig, new) == []
+        assert FakeDevice.conversions == 0
+
+    def test_watched_change_evaluated(self, manager):
+        manager.create(webhook_url="https://a.com", entity_type="device",
+                       conditions={"temperature": {"gt": 80}})
+        orig = FakeDevice(id=1, name="Sensor", states={"temperature": 70})
+        new = FakeDevice(id=1, name="Sensor", states={"temperature": 85})
+        matches = manager.evaluate_device_update(orig, new)
+        assert len(matches) == 1
+        assert matches[0][1].state["new"] == {"states.temperature": 85}
+        assert FakeDevice.conversions == 2
+
+
+class TestDwellPersistence:
+    """Pending dwells survive a manager restart."""
+
+    def _manager(self, tmp_path, callback):
+        return SubscriptionManager(
+            dispatch_callback=callback,
+            logger=Mock(),
+            store=SubscriptionStore(str(tmp_path / "subs.json"), logger=Mock()),
+            dwell_state_path=str(tmp_path / "dwell_timers.json"),
+        )
+
+    def _arm(self, tmp_path):
+        manager = self._manager(tmp_path, Mock())
+        sub = manager.create(webhook_url="https://a.com", entity_type="device", entity_id=100,
+                             conditions={"onState": False}, duration_seconds=600)
+        orig = {"id": 100, "name": "Door", "onState": True}
+        new = {"id": 100, "name": "Door", "onState": False}
+        manager.evaluate_device_change(orig, new)
+        assert manager.get_dwell_stats()["pending"] == 1
+        manager.shutdown()
+        return sub
+
+    def test_restored_after_restart(self, tmp_path):
+        sub = self._arm(tmp_path)
+        manager = self._manager(tmp_path, Mock())
+        manager.load_from_store()
+        assert manager.restore_dwells() == 1
+        assert manager.get_dwell_stats()["pending"] == 1
+        manager.delete(sub.subscription_id)
+        assert manager.get_dwell_stats()["pending"] == 0
+        manager.shutdown()
+
+    def test_dropped_when_condition_no_longer_holds(self, tmp_path):
+        self._arm(tmp_path)
+        manager = self._manager(tmp_path, Mock())
+        manager.load_from_store()
+        current = {"id": 100, "name": "Door", "onState": True}
+        assert manager.restore_dwells(current_state=lambda kind, entity_id: current) == 0
+        manager.shutdown()
+
+    def test_dropped_when_subscription_deleted(self, tmp_path):
+        self._arm(tmp_path)
+        manager = self._manager(tmp_path, Mock())
+        assert manager.restore_dwells() == 0  # subscriptions not loaded
+        manager.shutdown()
+
+
 class TestPersistence:
     """Tests for store-backed persistence (create/delete save; load restores)."""
 
@@ -445,6 +714,36 @@ class TestPersistence:
         manager.delete(sub.subscription_id)
         assert store.load() == []
 
+    def test_bulk_create_coalesces_writes(self, store_path):
+        store = SubscriptionStore(store_path, logger=Mock())
+        store.save = Mock(wraps=store.save)
+        manager = SubscriptionManager(logger=Mock(), store=store, save_interval=60)
+        for number in range(20):
+            manager.create(
+                webhook_url="https://a.com", entity_type="device", entity_id=number,
+                conditions={"onState": True},
+            )
+        assert store.save.call_count == 1  # the first; the rest wait for the interval
+        manager.shutdown()
+        assert store.save.call_count == 2
+        assert len(store.load()) == 20
+
+    def test_stats_saved_without_rewriting_definitions(self, store_path):
+        store = SubscriptionStore(store_path, logger=Mock())
+        manager = SubscriptionManager(
+            logger=Mock(), store=store, save_interval=60, stats_save_interval=60
+        )
+        sub = manager.create(
+            webhook_url="https://a.com", entity_type="device", conditions={"onState": True}
+        )
+        store.save = Mock(wraps=store.save)
+        sub.record_success(200)
+        manager.stats_changed()
+        manager.stats_changed()
+        manager.save()
+        assert store.save.call_count == 1
+        assert store.load()[0].stats["fires"] == 1
+
     def test_no_store_is_noop(self):
         # store=None must behave exactly as before: no file, no error.
         manager = SubscriptionManager(logger=Mock())
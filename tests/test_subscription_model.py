@@ -59,3 +59,20 @@ class TestFromDict:
     def test_generated_id_when_absent(self):
         restored = Subscription.from_dict({"webhook_url": "https://x.example/h"})
         assert restored.subscription_id  # non-empty ULID generated
+
+
+class TestMatches:
+    def test_matches_uses_conditions(self):
+        sub = Subscription(entity_type="device", conditions={"brightness": {"gt": 50}})
+        assert sub.matches({"brightness": 75}) is True
+        assert sub.matches({"brightness": 25}) is False
+
+    def test_restored_subscription_matches(self):
+        sub = Subscription(entity_type="variable", conditions={"value": True})
+        restored = Subscription.from_dict(sub.to_dict(include_token=True))
+        assert restored.matches({"value": "true"}) is True
+
+    def test_matcher_not_serialized(self):
+        sub = Subscription(conditions={"onState": True})
+        assert "_matcher" not in sub.to_dict()
+        assert "_matcher" not in repr(sub)
@@ -8,14 +8,16 @@ import json
 import os
 import stat
 import sys
+import time
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
 
-from mcp_server.events.subscription_store import SubscriptionStore, SCHEMA_VERSION
+from mcp_server.events.subscription_store import SubscriptionStore, SCHEMA_VERSION, WriteBehind
 from mcp_server.events.subscription_model import Subscription
 
 
@@ -112,3 +114,76 @@ class TestAtomicAndPerms:
         loaded = store.load()
         assert len(loaded) == 1
         assert loaded[0].description == "second"
+
+
+class TestStatsFile:
+    def test_stats_kept_out_of_definitions_file(self, store_path, tmp_path):
+        sub = _make_sub()
+        SubscriptionStore(store_path).save([sub])
+        definitions = json.loads(Path(store_path).read_text())
+        assert "stats" not in definitions["subscriptions"][0]
+        stats = json.loads((tmp_path / "subscriptions_stats.json").read_text())
+        assert stats["stats"][sub.subscription_id]["fires"] == 4
+
+    def test_save_stats_leaves_definitions_alone(self, store_path):
+        store = SubscriptionStore(store_path)
+        sub = _make_sub()
+        store.save([sub])
+        before = os.stat(store_path).st_mtime_ns
+        sub.stats["fires"] = 9
+        store.save_stats([sub])
+        assert os.stat(store_path).st_mtime_ns == before
+        assert store.load()[0].stats["fires"] == 9
+
+    def test_inline_stats_from_older_files_still_load(self, store_path):
+        record = _make_sub().to_dict(include_token=True)
+        Path(store_path).write_text(json.dumps({"version": SCHEMA_VERSION, "subscriptions": [record]}))
+        assert SubscriptionStore(store_path).load()[0].stats["fires"] == 4
+
+    def test_unreadable_stats_file_only_resets_counters(self, store_path, tmp_path):
+        logger = Mock()
+        store = SubscriptionStore(store_path, logger=logger)
+        store.save([_make_sub()])
+        (tmp_path / "subscriptions_stats.json").write_text("not json")
+        loaded = store.load()
+        assert len(loaded) == 1
+        assert loaded[0].auth_token == "secret-token-abc"
+        assert loaded[0].stats["fires"] == 0
+        logger.warning.assert_called_once()
+
+
+class TestWriteBehind:
+    def test_burst_coalesced(self):
+        writes = []
+        writer = WriteBehind(lambda: writes.append(time.monotonic()), interval=0.3)
+        for _ in range(50):
+            writer.mark_dirty()
+        assert len(writes) == 1  # the first mark writes straight away
+        time.sleep(0.5)
+        assert len(writes) == 2  # the rest in one write when the interval is up
+        assert writes[1] - writes[0] >= 0.29
+
+    def test_flush_writes_pending_now(self):
+        writes = []
+        writer = WriteBehind(lambda: writes.append(1), interval=60)
+        writer.mark_dirty()
+        writer.mark_dirty()
+        writer.flush()
+        assert len(writes) == 2
+        writer.flush()
+        assert len(writes) == 2  # nothing pending
+
+    def test_stop_writes_synchronously_after(self):
+        writes = []
+        writer = WriteBehind(lambda: writes.append(1), interval=60)
+        writer.mark_dirty()
+        writer.mark_dirty()
+        writer.stop()
+        writer.mark_dirty()
+        assert len(writes) == 3
+
+    def test_write_errors_logged(self):
+        logger = Mock()
+        writer = WriteBehind(Mock(side_effect=OSError("disk full")), interval=0, logger=logger)
+        writer.mark_dirty()
+        logger.exception.assert_called_once()
@@ -5,19 +5,25 @@ Tests for webhook dispatcher — delivery, auth, retry.
 import hashlib
 import hmac
 import json
+import sqlite3
 import sys
 import threading
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import Mock
 
+import pytest
+
 
 # Add plugin to path
 plugin_path = Path(__file__).parent.parent / "MCP Server.indigoPlugin/Contents/Server Plugin"
 sys.path.insert(0, str(plugin_path))
 
 from mcp_server.events.event_model import Event
+from mcp_server.events.flow_control import CircuitBreaker, TokenBucket
+from mcp_server.events.http_pool import ConnectionPool
+from mcp_server.events.outbox import WebhookOutbox
 from mcp_server.events.subscription_model import Subscription
 from mcp_server.events.webhook_dispatcher import WebhookDispatcher
 
@@ -353,3 +359,813 @@ class TestWebhookDispatcher:
             assert expired_subs[0].subscription_id == sub.subscription_id
         finally:
             server.shutdown()
+
+    def test_stats_changed_after_each_attempt(self):
+        """on_stats_changed fires after every attempt, failed ones included."""
+        FailingHandler.request_count = 0
+        server = _start_server(FailingHandler, 19896)
+        try:
+            changed = []
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=1, retry_base_delay=0.05
+            )
+            dispatcher.set_on_stats_changed(lambda: changed.append(1))
+            dispatcher.start()
+            sub = Subscription(
+                webhook_url="http://127.0.0.1:19896/events",
+                entity_type="device",
+                conditions={"onState": False},
+            )
+            dispatcher.dispatch(sub, Event(event_type="test"))
+            assert _wait_for(lambda: dispatcher.get_stats()["events_failed"] == 1)
+            dispatcher.stop()
+            assert len(changed) == 2
+        finally:
+            server.shutdown()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """HTTP handler that takes a while to answer."""
+    delay = 1.5
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.__class__.delay)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestDeliveryConcurrency:
+    """Per-destination lanes: ordered per host, parallel across hosts."""
+
+    @staticmethod
+    def _sub(port):
+        return Subscription(
+            webhook_url=f"http://127.0.0.1:{port}/events",
+            entity_type="device",
+            conditions={"onState": False},
+        )
+
+    def test_slow_host_does_not_block_other_hosts(self):
+        RecordingHandler.requests = []
+        slow = _start_server(SlowHandler, 19885)
+        fast = _start_server(RecordingHandler, 19886)
+        try:
+            dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0, workers=2)
+            dispatcher.start()
+            started = time.time()
+            dispatcher.dispatch(self._sub(19885), Event(event_type="slow"))
+            dispatcher.dispatch(self._sub(19886), Event(event_type="fast"))
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 1)
+            assert time.time() - started < SlowHandler.delay
+            dispatcher.stop()
+        finally:
+            slow.shutdown()
+            fast.shutdown()
+
+    def test_events_to_one_host_arrive_in_order(self):
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, 19887)
+        try:
+            dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0, workers=4)
+            dispatcher.start()
+            subs = [self._sub(19887) for _ in range(3)]
+            for number in range(12):
+                dispatcher.dispatch(subs[number % 3], Event(event_type=f"e{number}"))
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 12)
+            dispatcher.stop()
+            assert [r["body"]["event_type"] for r in RecordingHandler.requests] == [
+                f"e{number}" for number in range(12)
+            ]
+        finally:
+            server.shutdown()
+
+    def test_backoff_does_not_hold_a_worker(self):
+        """With one worker, a receiver in retry backoff still lets others through."""
+        FailingHandler.request_count = 0
+        RecordingHandler.requests = []
+        failing = _start_server(FailingHandler, 19888)
+        healthy = _start_server(RecordingHandler, 19889)
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=2, retry_base_delay=1.0, workers=1,
+                circuit_failure_threshold=5,
+            )
+            dispatcher.start()
+            dispatcher.dispatch(self._sub(19888), Event(event_type="failing"))
+            assert _wait_for(lambda: FailingHandler.request_count == 1)
+            started = time.time()
+            dispatcher.dispatch(self._sub(19889), Event(event_type="healthy"))
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 1)
+            assert time.time() - started < 0.9
+            assert dispatcher.get_stats()["destinations_backing_off"] == 1
+
+            assert _wait_for(lambda: FailingHandler.request_count == 3)
+            dispatcher.stop()
+            assert dispatcher.get_stats()["events_failed"] == 1
+        finally:
+            failing.shutdown()
+            healthy.shutdown()
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that keeps connections open, recording each peer port."""
+    protocol_version = "HTTP/1.1"
+    peers = []
+    drop_after_response = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.__class__.peers.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        # Close without a Connection: close header, like a receiver timing
+        # out an idle keep-alive connection
+        self.close_connection = self.__class__.drop_after_response
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_threaded_server(handler_class, port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestConnectionPool:
+    """Keep-alive reuse, idle eviction and recovery from dropped connections."""
+
+    URL = "http://127.0.0.1:19890/events"
+
+    @pytest.fixture
+    def server(self):
+        KeepAliveHandler.peers = []
+        KeepAliveHandler.drop_after_response = False
+        server = _start_threaded_server(KeepAliveHandler, 19890)
+        yield server
+        server.shutdown()
+
+    def test_connection_reused(self, server):
+        pool = ConnectionPool()
+        for _ in range(3):
+            assert pool.post(self.URL, b"{}", {"Content-Type": "application/json"}) == 200
+        assert len(set(KeepAliveHandler.peers)) == 1
+        assert pool.get_stats() == {
+            "connections_opened": 1, "connections_reused": 2, "idle_connections": 1,
+        }
+        pool.close_all()
+        assert pool.get_stats()["idle_connections"] == 0
+
+    def test_idle_connection_evicted(self, server):
+        pool = ConnectionPool(idle_timeout=0.1)
+        pool.post(self.URL, b"{}", {})
+        time.sleep(0.2)
+        pool.post(self.URL, b"{}", {})
+        assert len(set(KeepAliveHandler.peers)) == 2
+        assert pool.get_stats()["connections_reused"] == 0
+        pool.close_all()
+
+    def test_dropped_connection_retried_on_a_new_one(self, server):
+        KeepAliveHandler.drop_after_response = True
+        pool = ConnectionPool()
+        assert pool.post(self.URL, b"{}", {}) == 200
+        time.sleep(0.1)
+        assert pool.post(self.URL, b"{}", {}) == 200
+        assert len(KeepAliveHandler.peers) == 2
+        assert pool.get_stats()["connections_opened"] == 2
+        pool.close_all()
+
+    def test_idle_cap(self):
+        pool = ConnectionPool(max_idle_per_destination=1, max_idle=1)
+        servers = [_start_threaded_server(KeepAliveHandler, port) for port in (19891, 19892)]
+        try:
+            pool.post("http://127.0.0.1:19891/", b"{}", {})
+            pool.post("http://127.0.0.1:19892/", b"{}", {})
+            assert pool.get_stats()["idle_connections"] == 1
+        finally:
+            pool.close_all()
+            for server in servers:
+                server.shutdown()
+
+    def test_dispatcher_reuses_connections(self, server):
+        dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+        dispatcher.start()
+        sub = Subscription(webhook_url=self.URL, entity_type="device", conditions={"onState": False})
+        for number in range(5):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        assert _wait_for(lambda: dispatcher.get_stats()["events_sent"] == 5)
+        stats = dispatcher.get_stats()
+        dispatcher.stop()
+        assert stats["connections_opened"] == 1
+        assert len(set(KeepAliveHandler.peers)) == 1
+
+
+class TestBatching:
+    """Opt-in per-subscription batching and coalescing."""
+
+    @staticmethod
+    def _sub(port, **batch):
+        return Subscription(
+            webhook_url=f"http://127.0.0.1:{port}/events",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            **batch,
+        )
+
+    @pytest.fixture
+    def server(self):
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, 19893)
+        yield server
+        server.shutdown()
+
+    def test_window_sends_one_array(self, server):
+        dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+        dispatcher.start()
+        sub = self._sub(19893, batch_window_ms=300, auth_mode="hmac", auth_token="secret")
+        for level in range(5):
+            dispatcher.dispatch(sub, Event(event_type="device.state_changed", dedupe_key=f"k{level}"))
+        assert dispatcher.get_stats()["events_batching"] == 5
+        assert _wait_for(lambda: len(RecordingHandler.requests) == 1)
+        time.sleep(0.2)
+        dispatcher.stop()
+
+        assert len(RecordingHandler.requests) == 1
+        request = RecordingHandler.requests[0]
+        assert [e["dedupe_key"] for e in request["body"]] == [f"k{level}" for level in range(5)]
+        assert request["headers"]["X-Event-Type"] == "batch"
+        assert request["headers"]["X-Event-Count"] == "5"
+        body = json.dumps(request["body"]).encode("utf-8")
+        expected = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+        assert request["headers"]["X-Webhook-Signature"] == f"sha256={expected}"
+        assert sub.stats["fires"] == 5
+        assert dispatcher.get_stats()["events_sent"] == 5
+
+    def test_max_events_flushes_early(self, server):
+        dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+        dispatcher.start()
+        sub = self._sub(19893, batch_window_ms=60_000, batch_max_events=3)
+        for number in range(7):
+            dispatcher.dispatch(sub, Event(event_type="device.state_changed", dedupe_key=f"k{number}"))
+        assert _wait_for(lambda: len(RecordingHandler.requests) == 2)
+        assert [len(r["body"]) for r in RecordingHandler.requests] == [3, 3]
+        # stop() sends the open batch instead of waiting out its window
+        dispatcher.stop()
+        assert [len(r["body"]) for r in RecordingHandler.requests] == [3, 3, 1]
+
+    def test_coalesce_keeps_latest_per_dedupe_key(self, server):
+        dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+        dispatcher.start()
+        sub = self._sub(19893, batch_window_ms=200, batch_coalesce=True)
+        for key, title in [("a", "a1"), ("b", "b1"), ("a", "a2"), ("a", "a3")]:
+            dispatcher.dispatch(sub, Event(dedupe_key=key, human={"title": title}))
+        assert _wait_for(lambda: len(RecordingHandler.requests) == 1)
+        dispatcher.stop()
+        assert [e["human"]["title"] for e in RecordingHandler.requests[0]["body"]] == ["b1", "a3"]
+
+    def test_unbatched_subscription_unaffected(self, server):
+        dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+        dispatcher.start()
+        dispatcher.dispatch(self._sub(19893), Event(event_type="single"))
+        assert _wait_for(lambda: len(RecordingHandler.requests) == 1)
+        dispatcher.stop()
+        assert RecordingHandler.requests[0]["body"]["event_type"] == "single"
+
+
+class TestOutbox:
+    """Queued deliveries kept on disk across restarts."""
+
+    @staticmethod
+    def _sub(port):
+        return Subscription(
+            webhook_url=f"http://127.0.0.1:{port}/events",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+        )
+
+    def test_queued_events_survive_restart(self, tmp_path):
+        path = str(tmp_path / "outbox.db")
+        sub = self._sub(19894)  # nothing listening yet
+        dispatcher = WebhookDispatcher(
+            logger=Mock(), timeout=1, max_retries=5, retry_base_delay=30, outbox_path=path
+        )
+        dispatcher.start()
+        for number in range(3):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        assert _wait_for(lambda: dispatcher.get_stats()["destinations_backing_off"] == 1)
+        started = time.monotonic()
+        dispatcher.stop()
+        assert time.monotonic() - started < 2  # no waiting out the backoff
+
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, 19894)
+        try:
+            dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, outbox_path=path)
+            dispatcher.start()
+            assert dispatcher.replay_outbox(lambda sid: sub if sid == sub.subscription_id else None) == 3
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 3)
+            assert [r["body"]["event_type"] for r in RecordingHandler.requests] == ["e0", "e1", "e2"]
+            assert _wait_for(lambda: dispatcher.get_stats()["outbox_pending"] == 0)
+            dispatcher.stop()
+        finally:
+            server.shutdown()
+
+        dispatcher = WebhookDispatcher(logger=Mock(), outbox_path=path)
+        dispatcher.start()
+        assert dispatcher.replay_outbox(lambda sid: sub) == 0
+        dispatcher.stop()
+
+    def test_replay_beyond_bounds_keeps_the_rest_on_disk(self, tmp_path):
+        """A backlog larger than the queue bounds is replayed without drops."""
+        path = str(tmp_path / "outbox.db")
+        first, second = self._sub(19906), self._sub(19907)
+        outbox = WebhookOutbox(path)
+        for number in range(30):
+            outbox.add(first.subscription_id, [Event(event_type=f"a{number}").to_dict()], False)
+        for number in range(8):
+            outbox.add(second.subscription_id, [Event(event_type=f"b{number}").to_dict()], False)
+        outbox.stop()
+
+        RecordingHandler.requests = []
+        servers = [_start_server(RecordingHandler, port) for port in (19906, 19907)]
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, outbox_path=path,
+                max_queued_per_subscription=10, max_queued_events=12,
+            )
+            dispatcher.start()
+            subs = {first.subscription_id: first, second.subscription_id: second}
+            assert dispatcher.replay_outbox(subs.get) == 38
+            stats = dispatcher.get_stats()
+            assert stats["events_dropped"] == 0
+            assert stats["queue_depth"] <= 12
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 38, timeout=10)
+            received = [r["body"]["event_type"] for r in RecordingHandler.requests]
+            assert [e for e in received if e[0] == "a"] == [f"a{number}" for number in range(30)]
+            assert [e for e in received if e[0] == "b"] == [f"b{number}" for number in range(8)]
+            assert _wait_for(lambda: dispatcher.get_stats()["outbox_pending"] == 0)
+            dispatcher.stop()
+        finally:
+            for server in servers:
+                server.shutdown()
+
+    def test_deleted_subscription_not_replayed(self, tmp_path):
+        path = str(tmp_path / "outbox.db")
+        outbox = WebhookOutbox(path)
+        outbox.add("gone", [Event(event_type="e").to_dict()], False)
+        outbox.stop()
+
+        dispatcher = WebhookDispatcher(logger=Mock(), outbox_path=path)
+        dispatcher.start()
+        assert dispatcher.replay_outbox(lambda sid: None) == 0
+        assert dispatcher.get_stats()["outbox_pending"] == 0
+        dispatcher.stop()
+
+    def test_exhausted_delivery_dead_lettered(self, tmp_path):
+        path = str(tmp_path / "outbox.db")
+        FailingHandler.request_count = 0
+        server = _start_server(FailingHandler, 19895)
+        try:
+            dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0, outbox_path=path)
+            dispatcher.start()
+            dispatcher.dispatch(self._sub(19895), Event(event_type="doomed"))
+            assert _wait_for(lambda: dispatcher.get_stats()["dead_letters"] == 1)
+            assert dispatcher.get_stats()["outbox_pending"] == 0
+            dispatcher.stop()
+        finally:
+            server.shutdown()
+
+        conn = sqlite3.connect(path)
+        rows = conn.execute("SELECT events, error FROM dead_letter").fetchall()
+        assert conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 0
+        conn.close()
+        assert len(rows) == 1
+        assert json.loads(rows[0][0])[0]["event_type"] == "doomed"
+        assert rows[0][1] == "HTTP 500"
+
+    def test_ack_before_commit_skips_disk(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path / "outbox.db"))
+        outbox_id = outbox.add("sub", [{"event_type": "e"}], False)
+        outbox.ack(outbox_id)
+        outbox.flush()
+        assert outbox.pending() == []
+        assert outbox.get_stats() == {"outbox_pending": 0, "dead_letters": 0}
+        outbox.stop()
+
+    def test_replace_keeps_the_row(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path / "outbox.db"), logger=Mock())
+        first = outbox.add("sub", [{"event_type": "e1"}], False)
+        outbox.flush()
+        outbox.replace(first, "sub", [{"event_type": "e2"}], False)
+        assert [(r.outbox_id, r.events[0]["event_type"]) for r in outbox.pending()] == [(first, "e2")]
+        outbox.replace(first, "sub", [{"event_type": "e3"}], False)
+        outbox.ack(first)
+        outbox.flush()
+        assert outbox.pending() == []
+        assert outbox.get_stats()["outbox_pending"] == 0
+        outbox.stop()
+
+    def test_oldest_dropped_beyond_cap(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path / "outbox.db"), logger=Mock(), max_pending=3)
+        for number in range(5):
+            outbox.add("sub", [{"event_type": f"e{number}"}], False)
+        outbox.flush()
+        assert [r.events[0]["event_type"] for r in outbox.pending()] == ["e2", "e3", "e4"]
+        assert outbox.get_stats()["outbox_pending"] == 3
+        outbox.stop()
+
+    def test_acking_dropped_deliveries_keeps_the_count(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path / "outbox.db"), logger=Mock(), max_pending=3)
+        ids = [outbox.add("sub", [{"event_type": f"e{number}"}], False) for number in range(5)]
+        for outbox_id in ids[:3]:
+            outbox.hold(outbox_id)
+        outbox.flush()
+        # The two dropped ones were still queued in memory; they finish later
+        outbox.ack(ids[0])
+        outbox.dead_letter(ids[1], "HTTP 500")
+        outbox.ack(ids[2])
+        outbox.flush()
+        assert outbox.get_stats() == {"outbox_pending": 2, "dead_letters": 0}
+        assert len(outbox.pending()) == 2
+        assert not outbox._evicted
+        outbox.stop()
+
+    def test_dropping_unheld_deliveries_leaves_nothing_behind(self, tmp_path):
+        """Spilled deliveries are never acked, so dropping them isn't remembered."""
+        outbox = WebhookOutbox(str(tmp_path / "outbox.db"), logger=Mock(), max_pending=3)
+        for number in range(50):
+            outbox.add("sub", [{"event_type": f"e{number}"}], False)
+        outbox.flush()
+        assert outbox.get_stats()["outbox_pending"] == 3
+        assert not outbox._evicted
+        outbox.stop()
+
+
+class TestQueueBounds:
+    """Bounded queues and overflow policies, against a receiver that is down."""
+
+    @staticmethod
+    def _sub(port, **queue):
+        return Subscription(
+            webhook_url=f"http://127.0.0.1:{port}/events",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            **queue,
+        )
+
+    @staticmethod
+    def _stalled(port, sub, **kwargs):
+        """A dispatcher whose first event for `sub` is backing off."""
+        dispatcher = WebhookDispatcher(
+            logger=Mock(), timeout=1, max_retries=50, retry_base_delay=0.3,
+            circuit_failure_threshold=100, **kwargs
+        )
+        dispatcher.start()
+        dispatcher.dispatch(sub, Event(event_type="e0", dedupe_key="a"))
+        assert _wait_for(lambda: dispatcher.get_stats()["destinations_backing_off"] == 1)
+        return dispatcher
+
+    @staticmethod
+    def _receive(port, count):
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, port)
+        assert _wait_for(lambda: len(RecordingHandler.requests) == count, timeout=10)
+        return server, [r["body"]["event_type"] for r in RecordingHandler.requests]
+
+    def test_drop_oldest(self):
+        sub = self._sub(19897, queue_max_events=3)
+        dispatcher = self._stalled(19897, sub)
+        for number in range(1, 6):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        stats = dispatcher.get_stats()
+        assert stats["queue_depth"] == 3
+        assert stats["events_dropped"] == 3
+        assert stats["oldest_queued_seconds"] > 0
+        assert sub.stats["dropped"] == 3
+        server, received = self._receive(19897, 3)
+        try:
+            dispatcher.stop()
+            # The head was being retried and is kept; the oldest behind it go
+            assert received == ["e0", "e4", "e5"]
+            assert sum(dispatcher.get_stats()["delivery_latency_ms"].values()) == 3
+        finally:
+            server.shutdown()
+
+    def test_drop_newest(self):
+        sub = self._sub(19898, queue_max_events=3, queue_overflow="drop_newest")
+        dispatcher = self._stalled(19898, sub)
+        for number in range(1, 6):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        server, received = self._receive(19898, 3)
+        try:
+            dispatcher.stop()
+            assert received == ["e0", "e1", "e2"]
+            assert dispatcher.get_stats()["events_dropped"] == 3
+        finally:
+            server.shutdown()
+
+    def test_coalesce_replaces_queued_event_with_same_key(self):
+        sub = self._sub(19899, queue_max_events=3, queue_overflow="coalesce")
+        dispatcher = self._stalled(19899, sub)
+        dispatcher.dispatch(sub, Event(event_type="e1", dedupe_key="a"))
+        dispatcher.dispatch(sub, Event(event_type="e2", dedupe_key="b"))
+        dispatcher.dispatch(sub, Event(event_type="e3", dedupe_key="a"))
+        assert dispatcher.get_stats()["events_coalesced"] == 1
+        server, received = self._receive(19899, 3)
+        try:
+            dispatcher.stop()
+            assert received == ["e0", "e3", "e2"]
+            assert dispatcher.get_stats()["events_dropped"] == 0
+        finally:
+            server.shutdown()
+
+    def test_spill_keeps_order_without_loss(self, tmp_path):
+        sub = self._sub(19900, queue_max_events=2, queue_overflow="spill")
+        dispatcher = self._stalled(19900, sub, outbox_path=str(tmp_path / "outbox.db"))
+        for number in range(1, 8):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        stats = dispatcher.get_stats()
+        assert stats["queue_depth"] == 2
+        assert stats["deliveries_on_disk"] == 6
+        server, received = self._receive(19900, 8)
+        try:
+            stats = dispatcher.get_stats()
+            dispatcher.stop()
+            assert received == [f"e{number}" for number in range(8)]
+            assert stats["events_dropped"] == 0
+            assert stats["deliveries_on_disk"] == 0
+        finally:
+            server.shutdown()
+
+    def test_spilled_batches_read_back_within_bound(self, tmp_path):
+        sub = self._sub(
+            19909, queue_max_events=10, queue_overflow="spill",
+            batch_window_ms=60_000, batch_max_events=5,
+        )
+        dispatcher = WebhookDispatcher(
+            logger=Mock(), timeout=1, max_retries=50, retry_base_delay=0.3,
+            circuit_failure_threshold=100, outbox_path=str(tmp_path / "outbox.db"),
+        )
+        dispatcher.start()
+        depths = []
+        push = dispatcher._push
+
+        def recording_push(delivery):
+            push(delivery)
+            depths.append(dispatcher._queued_by_subscription[sub.subscription_id])
+
+        dispatcher._push = recording_push
+        for number in range(60):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        assert dispatcher.get_stats()["deliveries_on_disk"] == 10
+
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, 19909)
+        try:
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 12, timeout=10)
+            dispatcher.stop()
+            received = [e["event_type"] for r in RecordingHandler.requests for e in r["body"]]
+            assert received == [f"e{number}" for number in range(60)]
+            assert max(depths) <= 10
+        finally:
+            server.shutdown()
+
+    def test_failed_refill_read_is_retried(self, tmp_path):
+        sub = self._sub(19910, queue_max_events=2, queue_overflow="spill")
+        dispatcher = self._stalled(19910, sub, outbox_path=str(tmp_path / "outbox.db"))
+        for number in range(1, 6):
+            dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+        assert dispatcher.get_stats()["deliveries_on_disk"] == 4
+
+        pending_for = dispatcher._outbox.pending_for
+        failures = []
+
+        def flaky_pending_for(*args):
+            if not failures:
+                failures.append(args)
+                raise sqlite3.OperationalError("database is locked")
+            return pending_for(*args)
+
+        dispatcher._outbox.pending_for = flaky_pending_for
+        server, received = self._receive(19910, 6)
+        try:
+            dispatcher.dispatch(sub, Event(event_type="e6"))
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 7)
+            dispatcher.stop()
+            received = [r["body"]["event_type"] for r in RecordingHandler.requests]
+            assert failures
+            assert received == [f"e{number}" for number in range(7)]
+        finally:
+            server.shutdown()
+
+    def test_global_bound_drops_oldest_overall(self):
+        first, second = self._sub(19901), self._sub(19901)
+        dispatcher = self._stalled(19901, first, max_queued_events=3)
+        dispatcher.dispatch(first, Event(event_type="e1"))
+        dispatcher.dispatch(second, Event(event_type="f0"))
+        dispatcher.dispatch(second, Event(event_type="f1"))
+        server, received = self._receive(19901, 3)
+        try:
+            dispatcher.stop()
+            assert received == ["e0", "f0", "f1"]
+            assert first.stats["dropped"] == 1
+        finally:
+            server.shutdown()
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """HTTP handler that returns 503 until told to recover, recording bodies."""
+    healthy = False
+    request_count = 0
+    received = []
+
+    def do_POST(self):
+        self.__class__.request_count += 1
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.__class__.healthy:
+            self.__class__.received.append(json.loads(body)["event_type"])
+            self.send_response(200)
+        else:
+            self.send_response(503)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFlowControl:
+    """Per-destination circuit breaker and per-subscription rate limit."""
+
+    @staticmethod
+    def _sub(port, **kwargs):
+        return Subscription(
+            webhook_url=f"http://127.0.0.1:{port}/events",
+            entity_type="device",
+            conditions={"brightness": {"gt": 0}},
+            **kwargs,
+        )
+
+    @staticmethod
+    def _flaky(port):
+        FlakyHandler.healthy = False
+        FlakyHandler.request_count = 0
+        FlakyHandler.received = []
+        return _start_server(FlakyHandler, port)
+
+    def test_breaker_opens_after_threshold_and_probes_after_cooldown(self):
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=10.0, max_cooldown=15.0)
+        assert not breaker.record_failure(0.0)
+        assert breaker.record_failure(1.0)
+        assert breaker.is_open(5.0)
+        assert breaker.wait_time(5.0) == pytest.approx(6.0)
+        assert breaker.to_dict(5.0)["retry_in_seconds"] == 6.0
+        # Cooldown over: the next attempt is the probe
+        assert breaker.wait_time(11.0) == 0.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # A failed probe reopens it for longer (capped)
+        assert breaker.record_failure(11.0)
+        assert breaker.wait_time(11.0) == pytest.approx(15.0)
+        assert breaker.times_opened == 2
+        assert breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert not breaker.record_success()
+
+    def test_token_bucket_paces_after_burst(self):
+        bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0.0
+        assert bucket.take(0.5) == pytest.approx(0.5)
+
+    def test_open_circuit_holds_deliveries_without_network_calls(self):
+        server = self._flaky(19902)
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=5, retry_base_delay=0.05,
+                circuit_failure_threshold=2, circuit_cooldown=0.5,
+            )
+            dispatcher.start()
+            sub = self._sub(19902)
+            dispatcher.dispatch(sub, Event(event_type="e0"))
+            assert _wait_for(lambda: FlakyHandler.request_count == 2)
+            assert dispatcher.circuit_state(sub.webhook_url)["state"] == "open"
+            assert dispatcher.get_stats()["circuits"]["127.0.0.1:19902"]["state"] == "open"
+            time.sleep(0.3)
+            assert FlakyHandler.request_count == 2
+
+            # The probe after the cooldown gets through and closes the circuit
+            FlakyHandler.healthy = True
+            assert _wait_for(lambda: FlakyHandler.received == ["e0"])
+            assert dispatcher.circuit_state(sub.webhook_url) == {"state": "closed"}
+            assert dispatcher.get_stats()["circuits"] == {}
+            dispatcher.stop()
+            assert dispatcher.get_stats()["events_failed"] == 0
+        finally:
+            server.shutdown()
+
+    def test_failed_probe_keeps_retries(self):
+        """Waiting on an open circuit doesn't use up a delivery's retries."""
+        server = self._flaky(19903)
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=1, retry_base_delay=0.05,
+                circuit_failure_threshold=1, circuit_cooldown=0.1,
+            )
+            dispatcher.start()
+            sub = self._sub(19903)
+            dispatcher.dispatch(sub, Event(event_type="e0"))
+            assert _wait_for(lambda: FlakyHandler.request_count >= 4)
+            assert dispatcher.circuit_state(sub.webhook_url)["times_opened"] >= 2
+            FlakyHandler.healthy = True
+            assert _wait_for(lambda: FlakyHandler.received == ["e0"])
+            dispatcher.stop()
+        finally:
+            server.shutdown()
+
+    def test_open_circuit_spills_new_events_to_outbox(self, tmp_path):
+        server = self._flaky(19904)
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=5, retry_base_delay=0.05,
+                circuit_failure_threshold=1, circuit_cooldown=0.5,
+                outbox_path=str(tmp_path / "outbox.db"),
+            )
+            dispatcher.start()
+            sub = self._sub(19904)
+            dispatcher.dispatch(sub, Event(event_type="e0"))
+            assert _wait_for(lambda: dispatcher.circuit_state(sub.webhook_url)["state"] == "open")
+            for number in range(1, 4):
+                dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+            stats = dispatcher.get_stats()
+            assert stats["queue_depth"] == 1
+            assert stats["deliveries_on_disk"] == 3
+
+            FlakyHandler.healthy = True
+            assert _wait_for(lambda: len(FlakyHandler.received) == 4)
+            assert FlakyHandler.received == ["e0", "e1", "e2", "e3"]
+            assert dispatcher.get_stats()["deliveries_on_disk"] == 0
+            dispatcher.stop()
+        finally:
+            server.shutdown()
+
+    def test_coalesced_then_spilled_deliveries_go_out_once(self, tmp_path):
+        server = self._flaky(19908)
+        try:
+            dispatcher = WebhookDispatcher(
+                logger=Mock(), timeout=5, max_retries=5, retry_base_delay=0.5,
+                circuit_failure_threshold=2, circuit_cooldown=0.3,
+                outbox_path=str(tmp_path / "outbox.db"),
+            )
+            dispatcher.start()
+            sub = self._sub(19908, queue_max_events=2, queue_overflow="coalesce")
+            dispatcher.dispatch(sub, Event(event_type="k1", dedupe_key="a"))
+            assert _wait_for(lambda: FlakyHandler.request_count == 1)
+            dispatcher.dispatch(sub, Event(event_type="k2", dedupe_key="b"))
+            dispatcher.dispatch(sub, Event(event_type="k3", dedupe_key="b"))
+            assert dispatcher.get_stats()["events_coalesced"] == 1
+            assert _wait_for(lambda: dispatcher.circuit_state(sub.webhook_url)["state"] == "open")
+            dispatcher.dispatch(sub, Event(event_type="k4", dedupe_key="c"))
+            assert dispatcher.get_stats()["deliveries_on_disk"] == 1
+
+            FlakyHandler.healthy = True
+            assert _wait_for(lambda: len(FlakyHandler.received) >= 3)
+            time.sleep(0.3)
+            assert FlakyHandler.received == ["k1", "k3", "k4"]
+            assert _wait_for(lambda: dispatcher.get_stats()["outbox_pending"] == 0)
+            dispatcher.stop()
+        finally:
+            server.shutdown()
+
+    def test_rate_limit_paces_deliveries(self):
+        RecordingHandler.requests = []
+        server = _start_server(RecordingHandler, 19905)
+        try:
+            dispatcher = WebhookDispatcher(logger=Mock(), timeout=5, max_retries=0)
+            dispatcher.start()
+            sub = self._sub(19905, rate_limit_per_minute=300, rate_limit_burst=2)
+            started = time.time()
+            for number in range(4):
+                dispatcher.dispatch(sub, Event(event_type=f"e{number}"))
+            assert _wait_for(lambda: len(RecordingHandler.requests) == 4)
+            # Two go at once, then one every 0.2s
+            assert time.time() - started >= 0.35
+            assert dispatcher.get_stats()["rate_limit_waits"] >= 2
+            dispatcher.stop()
+            assert [r["body"]["event_type"] for r in RecordingHandler.requests] == [
+                f"e{number}" for number in range(4)
+            ]
+        finally:
+            server.shutdown()